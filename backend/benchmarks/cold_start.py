@@ -0,0 +1,174 @@
+"""
+Cold Start Benchmark
+
+Measures how quickly a fresh API process becomes useful:
+
+- import: time to `import main` in a new interpreter
+- ready: from process start until GET /health answers
+- first_check: from process start until the first POST /check succeeds
+
+Each run starts a new uvicorn process against the Ollama simulator, with and
+without the background service warm-up (SERVICE_WARMUP), and the medians are
+written as JSON so runs can be compared across commits (see --baseline).
+
+Usage:
+    python benchmarks/cold_start.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from load_test import BACKEND_DIR, _git_commit
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    """Seconds to import the application module in a fresh interpreter"""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env, stderr=subprocess.DEVNULL
+    )
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_start(env: Dict[str, str], port: int, claim: str, timeout: float, verbose: bool) -> Dict[str, float]:
+    """Start a server and time /health and the first successful /check"""
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=None if verbose else subprocess.DEVNULL,
+        stderr=None if verbose else subprocess.DEVNULL
+    )
+    timings = {}
+    try:
+        with httpx.Client(base_url=url, timeout=timeout) as client:
+            deadline = start + timeout
+            while "ready" not in timings:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"API did not answer /health within {timeout:.0f}s")
+                try:
+                    if client.get("/health").status_code == 200:
+                        timings["ready"] = time.perf_counter() - start
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+
+            while "first_check" not in timings:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"No successful /check within {timeout:.0f}s")
+                if client.post("/check", json={"claim": claim}).status_code == 200:
+                    timings["first_check"] = time.perf_counter() - start
+                    break
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return timings
+
+
+def median_ms(values: List[float]) -> Optional[float]:
+    return round(statistics.median(values) * 1000, 1) if values else None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    simulator = subprocess.Popen([
+        sys.executable, os.path.join(BACKEND_DIR, "tools", "ollama_simulator.py"),
+        "--port", str(args.sim_port), "--ttft-ms", str(args.sim_ttft_ms), "--tokens-per-sec", "0"
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    base_env = dict(os.environ)
+    base_env.update({
+        "DEMO_MODE": "false",
+        "OLLAMA_API_URL": f"http://127.0.0.1:{args.sim_port}",
+        "RATE_LIMIT_ENABLED": "false",
+        "VERDICT_CACHE_ENABLED": "false"
+    })
+
+    try:
+        imports = [measure_import(base_env) for _ in range(args.runs)]
+        profiles = {}
+        for warm_up in ("true", "false"):
+            env = dict(base_env, SERVICE_WARMUP=warm_up)
+            runs = [measure_start(env, args.port, args.claim, args.timeout, args.verbose) for _ in range(args.runs)]
+            profiles[f"warm_up_{'on' if warm_up == 'true' else 'off'}"] = {
+                "ready_ms": median_ms([run["ready"] for run in runs]),
+                "first_check_ms": median_ms([run["first_check"] for run in runs])
+            }
+    finally:
+        simulator.terminate()
+        simulator.wait(timeout=10)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "config": {"runs": args.runs, "sim_ttft_ms": args.sim_ttft_ms},
+        "import_ms": median_ms(imports),
+        "profiles": profiles
+    }
+
+
+def print_summary(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    """Print a human-readable summary, with deltas against a baseline run"""
+    def delta(current, previous):
+        if current is None or previous in (None, 0):
+            return ""
+        return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+    print(f"\n🧊 Cold start (commit {report['git_commit'] or 'unknown'}, median of {report['config']['runs']} runs)")
+    print(f"  import main  {report['import_ms']}ms{delta(report['import_ms'], (baseline or {}).get('import_ms'))}")
+    for name, profile in report["profiles"].items():
+        previous = (baseline or {}).get("profiles", {}).get(name, {})
+        print(f"  {name:12s} ready {profile['ready_ms']}ms{delta(profile['ready_ms'], previous.get('ready_ms'))}"
+              f"  first /check {profile['first_check_ms']}ms{delta(profile['first_check_ms'], previous.get('first_check_ms'))}")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fact Checker API cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="server starts per profile")
+    parser.add_argument("--port", type=int, default=8001, help="port for the API under test")
+    parser.add_argument("--claim", default="The Eiffel Tower is located in Paris", help="claim sent as the first /check")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for each milestone")
+    parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/cold-start-<timestamp>-<commit>.json)")
+    parser.add_argument("--baseline", default=None, help="previous JSON report to compare against")
+    parser.add_argument("--sim-port", type=int, default=11435)
+    parser.add_argument("--sim-ttft-ms", type=float, default=50.0)
+    parser.add_argument("--verbose", action="store_true", help="show server output")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    report = run(args)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(BACKEND_DIR, "benchmarks", "results", f"cold-start-{stamp}-{report['git_commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    print_summary(report, baseline)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Event Loop Concurrency Check
+
+Verifies that the fact-checking path does not block the event loop: N
+concurrent POST /check calls must finish in roughly the latency of one call,
+and /health must keep answering quickly while they run. A blocking call on
+the path (a synchronous LLM client, time.sleep) serializes the requests and
+fails the check.
+
+The Ollama simulator gets one slot per concurrent call, so the LLM is never
+the bottleneck. Exits with status 1 when a check fails.
+
+Usage:
+    python benchmarks/concurrency_check.py --concurrency 16 --sim-ttft-ms 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from load_test import spawn_stack, wait_until_ready
+
+
+async def timed_check(client: httpx.AsyncClient, claim: str) -> float:
+    """Seconds taken by one successful /check"""
+    start = time.perf_counter()
+    response = await client.post("/check", json={"claim": claim})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def poll_health(client: httpx.AsyncClient, stop: asyncio.Event, latencies: List[float]):
+    """Time /health every 50ms until stopped"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=httpx.Limits(max_connections=None)) as client:
+        # Baseline: one call at a time (distinct claims, so nothing is coalesced or cached)
+        single = statistics.median([
+            await timed_check(client, f"Sequential claim {index} about the boiling point of water")
+            for index in range(3)
+        ])
+
+        stop = asyncio.Event()
+        health_latencies: List[float] = []
+        poller = asyncio.create_task(poll_health(client, stop, health_latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            timed_check(client, f"Concurrent claim {index} about the speed of light")
+            for index in range(args.concurrency)
+        ))
+        concurrent = time.perf_counter() - start
+        stop.set()
+        await poller
+
+    return {
+        "concurrency": args.concurrency,
+        "single_ms": round(single * 1000, 1),
+        "concurrent_ms": round(concurrent * 1000, 1),
+        "ratio": round(concurrent / single, 2),
+        "health_max_ms": round(max(health_latencies) * 1000, 1) if health_latencies else None
+    }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Check that concurrent /check calls do not block each other")
+    parser.add_argument("--url", default="http://127.0.0.1:8002", help="API base URL (a server is spawned on its port)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent /check calls")
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="fail if N concurrent calls take longer than this many single calls")
+    parser.add_argument("--max-health-ms", type=float, default=250.0, help="fail if /health takes longer than this during the burst")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--sim-port", type=int, default=11435)
+    parser.add_argument("--sim-ttft-ms", type=float, default=500.0)
+    parser.add_argument("--sim-tokens-per-sec", type=float, default=0.0)
+    parser.add_argument("--verbose", action="store_true", help="show spawned server output")
+    return parser
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    # Options spawn_stack expects: one simulator slot and one fair-queue slot per concurrent call
+    args.sim_slots = args.concurrency
+    args.workers = 1
+    args.with_cache = False
+    args.server_env = [f"LLM_MAX_CONCURRENCY={args.concurrency}"]
+
+    with tempfile.TemporaryDirectory(prefix="factcheck-concurrency-") as store_dir:
+        processes = spawn_stack(args, store_dir)
+        try:
+            await wait_until_ready(args.url)
+            return await run(args)
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=40)
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    result = asyncio.run(main_async(args))
+
+    failures = []
+    if result["ratio"] > args.max_ratio:
+        failures.append(f"{args.concurrency} concurrent calls took {result['ratio']}x a single call (max {args.max_ratio}x)")
+    if result["health_max_ms"] is not None and result["health_max_ms"] > args.max_health_ms:
+        failures.append(f"/health took {result['health_max_ms']}ms during the burst (max {args.max_health_ms:.0f}ms)")
+
+    print(f"\n⏱️  single /check {result['single_ms']}ms, {result['concurrency']} concurrent {result['concurrent_ms']}ms "
+          f"({result['ratio']}x), slowest /health {result['health_max_ms']}ms")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ The fact-checking path does not block the event loop")
+
+
+if __name__ == "__main__":
+    main()
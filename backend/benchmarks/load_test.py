@@ -0,0 +1,451 @@
+"""
+End-to-End Load Test
+
+Drives /check, /history and /stats at a configurable concurrency and request
+mix and reports throughput, latency percentiles, error rates and server-side
+event-loop lag. Results are written as JSON so runs can be compared across
+commits (see --baseline).
+
+Usage:
+    # Start the Ollama simulator and the API, then run the benchmark
+    python benchmarks/load_test.py --spawn --concurrency 32 --duration 30
+
+    # Benchmark an already running server
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --mix check=8,history=1,stats=1
+
+    # Multi-worker profile: 4 uvicorn workers sharing a SQLite result store
+    python benchmarks/load_test.py --spawn --workers 4 --concurrency 64 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmarked endpoints: name -> (method, path)
+ENDPOINTS = {
+    "check": ("POST", "/check"),
+    "history": ("GET", "/history"),
+    "stats": ("GET", "/stats")
+}
+
+
+DEFAULT_CLAIMS = [
+    "Water boils at 100 degrees Celsius at sea level",
+    "The Great Wall of China is visible from space with the naked eye",
+    "The Eiffel Tower is located in Paris",
+    "Humans only use 10 percent of their brains",
+    "2 + 2 equals 4",
+    "The population of India exceeded 1.4 billion in 2023",
+    "Vaccines cause autism",
+    "Mount Everest is the tallest mountain on Earth",
+    "The Berlin Wall fell in 1989",
+    "Unemployment in the United States was 3.5 percent in 2019",
+    "Lightning never strikes the same place twice",
+    "The speed of light is about 300,000 kilometers per second",
+    "Bitcoin will reach one million dollars by 2030",
+    "A tomato is a fruit",
+    "The current president has the highest approval rating in history",
+    "Drinking eight glasses of water a day is required for health",
+    "Goldfish have a three second memory",
+    "The Amazon rainforest produces 20 percent of the world's oxygen",
+    "The square root of 144 is 12",
+    "Napoleon Bonaparte was unusually short"
+]
+
+
+def parse_mix(raw: str) -> Dict[str, float]:
+    """Parse 'check=8,history=1,stats=1' into endpoint weights"""
+    mix = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' in mix (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Request mix must give at least one endpoint a positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[index], 2)
+
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, Optional[float]]:
+    """Mean, min, max and p50/p95/p99 of a list of latencies"""
+    values = sorted(latencies_ms)
+    return {
+        "mean_ms": round(sum(values) / len(values), 2) if values else None,
+        "min_ms": round(values[0], 2) if values else None,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": round(values[-1], 2) if values else None
+    }
+
+
+def diff_loop_stats(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Lag distribution between the event_loop sections of two /stats snapshots"""
+    if not before or not after or before.get("worker_pid") != after.get("worker_pid"):
+        # Snapshots from different uvicorn workers cannot be subtracted
+        return None
+    before, after = before.get("event_loop"), after.get("event_loop")
+    if not before or not after or "bucket_counts" not in after:
+        return None
+    counts = [a - b for a, b in zip(after["bucket_counts"], before["bucket_counts"])]
+    samples = sum(counts)
+    if samples <= 0:
+        return {"samples": 0}
+
+    def bucket_quantile(q: float) -> Optional[float]:
+        target, running = q / 100 * samples, 0
+        for bound, count in zip(after["buckets_ms"] + [None], counts):
+            running += count
+            if running >= target:
+                return bound
+        return None
+
+    return {
+        "samples": samples,
+        "mean_lag_ms": round((after["total_lag_ms"] - before["total_lag_ms"]) / samples, 3),
+        "p50_lag_ms_upper_bound": bucket_quantile(50),
+        "p99_lag_ms_upper_bound": bucket_quantile(99),
+        "max_lag_ms_since_start": after["max_lag_ms"]
+    }
+
+
+class LoadTest:
+    """Closed-loop load generator: each worker sends its next request as soon as the last completes"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.mix = parse_mix(args.mix)
+        self.claims = self._load_claims(args.claims)
+        self.random = random.Random(args.seed)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.mix}
+        self.statuses: Dict[str, Counter] = {name: Counter() for name in self.mix}
+        self.cache_hits = 0
+        self.client_lag_max_ms = 0.0
+        self._sent = 0
+
+    @staticmethod
+    def _load_claims(path: Optional[str]) -> List[str]:
+        """Claims from a file (one per line), or the built-in set"""
+        if not path:
+            return DEFAULT_CLAIMS
+        with open(path, "r", encoding="utf-8") as handle:
+            claims = [line.strip() for line in handle if line.strip()]
+        if not claims:
+            raise ValueError(f"No claims found in {path}")
+        return claims
+
+    async def run(self) -> Dict[str, Any]:
+        """Warm up, run the measured phase and build the report"""
+        args = self.args
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            if args.warmup > 0:
+                await self._phase(client, time.perf_counter() + args.warmup, None, record=False)
+
+            stats_before = await self._get_stats(client)
+            lag_task = asyncio.create_task(self._watch_client_lag())
+            start = time.perf_counter()
+            deadline = start + args.duration if args.requests is None else float("inf")
+            await self._phase(client, deadline, args.requests, record=True)
+            elapsed = time.perf_counter() - start
+            lag_task.cancel()
+            stats_after = await self._get_stats(client)
+
+        return self._report(elapsed, stats_before, stats_after)
+
+    async def _phase(self, client: httpx.AsyncClient, deadline: float, max_requests: Optional[int], record: bool):
+        """Run all workers until the deadline or request budget is reached"""
+        self._sent = 0
+        await asyncio.gather(*[
+            self._worker(client, worker_id, deadline, max_requests, record)
+            for worker_id in range(self.args.concurrency)
+        ])
+
+    async def _worker(self, client: httpx.AsyncClient, worker_id: int, deadline: float, max_requests: Optional[int], record: bool):
+        """Send requests back to back"""
+        names, weights = list(self.mix), list(self.mix.values())
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                if self._sent >= max_requests:
+                    return
+                self._sent += 1
+
+            name = self.random.choices(names, weights)[0]
+            status, latency_ms, cache_hit = await self._send(client, name, worker_id)
+            if record:
+                self.statuses[name][status] += 1
+                if status == "200":
+                    self.latencies[name].append(latency_ms)
+                self.cache_hits += cache_hit
+
+    async def _send(self, client: httpx.AsyncClient, name: str, worker_id: int) -> Tuple[str, float, bool]:
+        """Send one request; returns (status, latency ms, cache hit)"""
+        method, path = ENDPOINTS[name]
+        kwargs: Dict[str, Any] = {}
+        if name == "check":
+            # Spread requests across sessions so per-session rate limits do not dominate
+            kwargs["json"] = {
+                "claim": self.random.choice(self.claims),
+                "session_id": f"bench-{worker_id % self.args.sessions}"
+            }
+        elif name == "history":
+            kwargs["params"] = {"limit": self.args.history_limit}
+
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            latency_ms = (time.perf_counter() - start) * 1000
+        except httpx.TimeoutException:
+            return "timeout", 0.0, False
+        except httpx.HTTPError as e:
+            return type(e).__name__, 0.0, False
+
+        cache_hit = False
+        if name == "check" and response.status_code == 200:
+            cache_hit = bool(response.json().get("cache_hit"))
+        return str(response.status_code), latency_ms, cache_hit
+
+    async def _get_stats(self, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+        """Snapshot /stats (not counted in the results)"""
+        try:
+            response = await client.get("/stats")
+            return response.json() if response.status_code == 200 else None
+        except httpx.HTTPError:
+            return None
+
+    async def _watch_client_lag(self):
+        """Track the load generator's own loop lag to flag a saturated client"""
+        while True:
+            expected = time.perf_counter() + 0.05
+            await asyncio.sleep(0.05)
+            self.client_lag_max_ms = max(self.client_lag_max_ms, (time.perf_counter() - expected) * 1000)
+
+    def _report(self, elapsed: float, stats_before: Optional[Dict[str, Any]], stats_after: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the JSON report"""
+        endpoints = {}
+        all_latencies: List[float] = []
+        total_requests = total_errors = 0
+        for name in self.mix:
+            statuses = self.statuses[name]
+            requests = sum(statuses.values())
+            errors = requests - statuses.get("200", 0)
+            total_requests += requests
+            total_errors += errors
+            all_latencies.extend(self.latencies[name])
+            endpoints[name] = {
+                "requests": requests,
+                "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+                "statuses": dict(statuses),
+                "latency": summarize_latencies(self.latencies[name])
+            }
+
+        checks = sum(self.statuses["check"].values()) if "check" in self.statuses else 0
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": _git_commit(),
+            "config": {
+                "url": self.args.url,
+                "concurrency": self.args.concurrency,
+                "duration_s": self.args.duration if self.args.requests is None else None,
+                "requests": self.args.requests,
+                "warmup_s": self.args.warmup,
+                "mix": self.mix,
+                "sessions": self.args.sessions,
+                "claims": len(self.claims),
+                "seed": self.args.seed,
+                "spawned": self.args.spawn,
+                "workers": self.args.workers if self.args.spawn else None,
+                "simulator": {
+                    "ttft_ms": self.args.sim_ttft_ms,
+                    "tokens_per_sec": self.args.sim_tokens_per_sec,
+                    "slots": self.args.sim_slots
+                } if self.args.spawn else None
+            },
+            "elapsed_s": round(elapsed, 3),
+            "overall": {
+                "requests": total_requests,
+                "throughput_rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+                "latency": summarize_latencies(all_latencies)
+            },
+            "endpoints": endpoints,
+            "check_cache_hit_rate": round(self.cache_hits / checks, 4) if checks else None,
+            "server_event_loop": diff_loop_stats(stats_before, stats_after),
+            "client_max_loop_lag_ms": round(self.client_lag_max_ms, 2),
+            "server_stats": stats_after
+        }
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit of the working tree, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def spawn_stack(args: argparse.Namespace, store_dir: str) -> List[subprocess.Popen]:
+    """Start the Ollama simulator and the API server as subprocesses"""
+    sim_port, api_port = args.sim_port, int(args.url.rsplit(":", 1)[-1].split("/")[0])
+    simulator = subprocess.Popen([
+        sys.executable, os.path.join(BACKEND_DIR, "tools", "ollama_simulator.py"),
+        "--port", str(sim_port),
+        "--ttft-ms", str(args.sim_ttft_ms),
+        "--tokens-per-sec", str(args.sim_tokens_per_sec),
+        "--slots", str(args.sim_slots)
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    env = dict(os.environ)
+    env.update({
+        "DEMO_MODE": "false",
+        "OLLAMA_API_URL": f"http://127.0.0.1:{sim_port}",
+        "RATE_LIMIT_ENABLED": "false"
+    })
+    if not args.with_cache:
+        env.update({"VERDICT_CACHE_ENABLED": "false", "NEAR_DUP_ENABLED": "false"})
+    if args.workers > 1:
+        # Workers only share history, stats and IDs through the SQLite store
+        env.update({"RESULT_STORE": "sqlite", "RESULT_STORE_PATH": os.path.join(store_dir, "results.db")})
+    env.update(dict(item.split("=", 1) for item in args.server_env))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning",
+         "--workers", str(args.workers)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL if not args.verbose else None,
+        stderr=subprocess.DEVNULL if not args.verbose else None
+    )
+    return [server, simulator]
+
+
+async def wait_until_ready(url: str, timeout: float = 60.0):
+    """Poll /health until the API answers"""
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"API at {url} did not become ready within {timeout:.0f}s")
+
+
+def print_summary(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    """Print a human-readable summary, with deltas against a baseline run"""
+    def delta(current, previous):
+        if current is None or previous in (None, 0):
+            return ""
+        return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+    print(f"\n📊 {report['overall']['requests']} requests in {report['elapsed_s']}s "
+          f"(commit {report['git_commit'] or 'unknown'})")
+    rows = [("overall", report["overall"])] + list(report["endpoints"].items())
+    for name, data in rows:
+        previous = (baseline or {}).get("endpoints", {}).get(name) if name != "overall" else (baseline or {}).get("overall")
+        latency, prev_latency = data["latency"], (previous or {}).get("latency", {})
+        print(f"  {name:8s} {data['throughput_rps']:8.2f} req/s{delta(data['throughput_rps'], (previous or {}).get('throughput_rps'))}"
+              f"  p50 {latency['p50_ms']}ms{delta(latency['p50_ms'], prev_latency.get('p50_ms'))}"
+              f"  p95 {latency['p95_ms']}ms{delta(latency['p95_ms'], prev_latency.get('p95_ms'))}"
+              f"  p99 {latency['p99_ms']}ms{delta(latency['p99_ms'], prev_latency.get('p99_ms'))}"
+              f"  errors {data['error_rate'] * 100:.2f}%")
+    loop = report["server_event_loop"]
+    if loop and loop.get("samples"):
+        print(f"  server event loop lag: mean {loop['mean_lag_ms']}ms, p99 <= {loop['p99_lag_ms_upper_bound']}ms")
+    if report["client_max_loop_lag_ms"] > 100:
+        print(f"  ⚠️ load generator loop lagged {report['client_max_loop_lag_ms']}ms; results may be client-bound")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmark for the fact checker API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent closed-loop workers")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured phase length in seconds")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests instead of --duration")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured warm-up in seconds")
+    parser.add_argument("--mix", default="check=8,history=1,stats=1", help="endpoint weights, e.g. check=8,history=1,stats=1")
+    parser.add_argument("--claims", default=None, help="file with one claim per line (default: built-in set)")
+    parser.add_argument("--sessions", type=int, default=64, help="distinct session IDs used for /check")
+    parser.add_argument("--history-limit", type=int, default=50, help="limit parameter for /history")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request sequence")
+    parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--baseline", default=None, help="previous JSON report to compare against")
+    parser.add_argument("--spawn", action="store_true", help="start the Ollama simulator and API server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes when spawning (>1 uses the SQLite result store)")
+    parser.add_argument("--with-cache", action="store_true", help="keep the verdict cache and near-duplicate reuse enabled when spawning")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE", help="extra environment for the spawned server")
+    parser.add_argument("--sim-port", type=int, default=11435)
+    parser.add_argument("--sim-ttft-ms", type=float, default=300.0)
+    parser.add_argument("--sim-tokens-per-sec", type=float, default=40.0)
+    parser.add_argument("--sim-slots", type=int, default=4)
+    parser.add_argument("--verbose", action="store_true", help="show spawned server output")
+    return parser
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="factcheck-bench-") as store_dir:
+        processes = spawn_stack(args, store_dir) if args.spawn else []
+        try:
+            await wait_until_ready(args.url)
+            return await LoadTest(args).run()
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    report = asyncio.run(main_async(args))
+
+    output = args.output
+    if output is None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(BACKEND_DIR, "benchmarks", "results", f"{stamp}-{report['git_commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    print_summary(report, baseline)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
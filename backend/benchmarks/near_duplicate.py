@@ -0,0 +1,195 @@
+"""
+Near-Duplicate Index Benchmark
+
+Fills the MinHash/LSH near-duplicate index with synthetic verified claims
+(subjects x comparatives x quantities) and measures, at each size
+checkpoint, insert throughput, the resident memory the index added, and
+query latency for rephrasings of indexed claims (which should match), for
+claims about subjects that were never indexed, and for near misses: indexed
+claims with a qualifier added, negated or put in the past (none of which
+should).
+
+Claims are preprocessed with PathwayProcessor up front, so the timings cover
+the index only.
+
+Usage:
+    python benchmarks/near_duplicate.py
+    python benchmarks/near_duplicate.py --sizes 10000,100000,1000000 --queries 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from load_test import BACKEND_DIR, _git_commit
+
+sys.path.insert(0, BACKEND_DIR)
+
+from services.near_duplicate import MinHashLSHIndex  # noqa: E402
+from services.pathway_service import PathwayProcessor  # noqa: E402
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "ze", "bu", "da", "fe", "go", "hi", "ju", "pe", "qua", "ri", "so", "wy"]
+PREFIXES = ["North", "South", "Old", "New", "Grand", "Royal", "Central", "Upper", "Lower", "Little"]
+LANDMARKS = ["Tower", "Bridge", "Dam", "Cathedral", "Stadium", "Lighthouse", "Mountain", "Canal", "Palace", "Station"]
+STATED = [("taller than", "meters"), ("longer than", "kilometers"), ("heavier than", "kilograms"), ("shorter than", "feet")]
+# Rephrasings of each STATED form that should reuse its verdict
+REPHRASED = [("over", "m tall"), ("more than", "km long"), ("over", "kg in weight"), ("under", "ft tall")]
+# Verified claims and variants of them that must not reuse their verdict
+NEAR_MISSES = [
+    ("Paris is the capital of France", "Paris is the capital of Germany and France"),
+    ("Paris is the capital of France", "Paris was the capital of France"),
+    ("Albert Einstein won the Nobel Prize", "Albert Einstein won the Nobel Prize in Chemistry"),
+    ("Albert Einstein won the Nobel Prize", "Albert Einstein won the Nobel Prize twice"),
+    ("Albert Einstein won the Nobel Prize", "Albert Einstein never won the Nobel Prize")
+]
+
+
+def name(n: int) -> str:
+    """A made-up three-syllable word per n (8000 of them)"""
+    return "".join(SYLLABLES[(n // 20 ** i) % 20] for i in range(3)).capitalize()
+
+
+def subject(n: int) -> str:
+    """A distinct made-up landmark name per n"""
+    return f"The {PREFIXES[n % 10]} {name(n // 10)} {name(n // 80000)}ton {LANDMARKS[(n // 10) % 10]}"
+
+
+def stated_claim(n: int) -> str:
+    comparative, unit = STATED[n % len(STATED)]
+    return f"{subject(n)} is {comparative} {100 + n % 900} {unit}"
+
+
+def rephrased_claim(n: int) -> str:
+    comparative, unit = REPHRASED[n % len(REPHRASED)]
+    return f"{subject(n).lower()} is {comparative} {100 + n % 900}{unit}"
+
+
+def near_miss_claim(n: int) -> str:
+    """An indexed claim with a qualifier added, negated or put in the past"""
+    comparative, unit = STATED[n % len(STATED)]
+    variant = (n // len(STATED)) % 3
+    if variant == 0:
+        return f"{subject(n)} in {name(n + 1)}ville is {comparative} {100 + n % 900} {unit}"
+    if variant == 1:
+        return f"{subject(n)} is not {comparative} {100 + n % 900} {unit}"
+    return f"{subject(n)} was {comparative} {100 + n % 900} {unit}"
+
+
+def rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def time_queries(index: MinHashLSHIndex, processed: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Latency distribution (microseconds) and match rate for a set of queries"""
+    samples, matched = [], 0
+    for claim in processed:
+        start = time.perf_counter()
+        if index.query(claim, "bench") is not None:
+            matched += 1
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {
+        "p50_us": round(statistics.median(samples), 1),
+        "p99_us": round(percentile(samples, 0.99), 1),
+        "max_us": round(max(samples), 1),
+        "match_rate": round(matched / len(processed), 4)
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    os.environ["NEAR_DUP_MAX_ENTRIES"] = str(sizes[-1])
+    processor = PathwayProcessor()
+    index = MinHashLSHIndex()
+    payload = {"verdict": "True", "confidence_score": 90}
+    rng = random.Random(args.seed)
+
+    checkpoints = []
+    baseline_rss = rss_mb()
+    inserted, insert_seconds = 0, 0.0
+    for n, (claim, _) in enumerate(NEAR_MISSES):
+        index.insert(f"near-miss:{n}", processor.preprocess_claim(claim), payload, "bench", 86400)
+    for size in sizes:
+        print(f"⏳ Indexing up to {size} claims...")
+        for n in range(inserted, size):
+            processed = processor.preprocess_claim(stated_claim(n))
+            start = time.perf_counter()
+            index.insert(f"claim:{n}", processed, payload, "bench", 86400)
+            insert_seconds += time.perf_counter() - start
+        inserted = size
+
+        sample = rng.sample(range(size), min(args.queries, size))
+        hits = [processor.preprocess_claim(rephrased_claim(n)) for n in sample]
+        misses = [processor.preprocess_claim(stated_claim(size + n)) for n in sample]
+        near_misses = [processor.preprocess_claim(variant) for _, variant in NEAR_MISSES]
+        near_misses += [processor.preprocess_claim(near_miss_claim(n)) for n in sample]
+        checkpoints.append({
+            "entries": size,
+            "inserts_per_second": round(inserted / insert_seconds),
+            "index_rss_mb": round(rss_mb() - baseline_rss, 1),
+            "rephrased": time_queries(index, hits),
+            "unseen": time_queries(index, misses),
+            "near_miss": time_queries(index, near_misses)
+        })
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "config": {"sizes": sizes, "queries": args.queries, "num_perm": index.num_perm,
+                   "threshold": index.threshold, "max_candidates": index.max_candidates},
+        "checkpoints": checkpoints
+    }
+
+
+def print_summary(report: Dict[str, Any]):
+    print(f"\n🔎 Near-duplicate index (commit {report['git_commit'] or 'unknown'}, "
+          f"{report['config']['num_perm']} perms, threshold {report['config']['threshold']})")
+    print(f"  {'entries':>9} {'inserts/s':>10} {'RSS MB':>8}  {'rephrased p50/p99 us':>22} {'match':>6}  "
+          f"{'unseen p50/p99 us':>19} {'match':>6}  {'near miss p50/p99 us':>22} {'match':>6}")
+    for point in report["checkpoints"]:
+        hit, miss, near = point["rephrased"], point["unseen"], point["near_miss"]
+        print(f"  {point['entries']:>9} {point['inserts_per_second']:>10} {point['index_rss_mb']:>8}  "
+              f"{hit['p50_us']:>10} / {hit['p99_us']:<9} {hit['match_rate']:>6}  "
+              f"{miss['p50_us']:>8} / {miss['p99_us']:<8} {miss['match_rate']:>6}  "
+              f"{near['p50_us']:>10} / {near['p99_us']:<9} {near['match_rate']:>6}")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fact Checker near-duplicate index benchmark")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated index sizes to measure at")
+    parser.add_argument("--queries", type=int, default=2000, help="queries of each kind per checkpoint")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for the query sample")
+    parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/near-duplicate-<timestamp>-<commit>.json)")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    report = run(args)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(BACKEND_DIR, "benchmarks", "results", f"near-duplicate-{stamp}-{report['git_commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    print_summary(report)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Prompt Size Benchmark
+
+Compares the prompt sent to the LLM before and after compact rendering: the
+original universal template (the repr of the category configuration, a
+closing instruction per category) against the prompt builder's output, for a
+set of claims across categories. This is the prompt analyze_claim_universal
+sends, the only one requests reach. Token counts use the configured prompt
+tokenizer (PROMPT_TOKENIZER).
+
+With --ollama, each prompt is also sent to Ollama with num_predict=1 and the
+prompt_eval_count and prompt_eval_duration it reports are compared, which
+shows the prompt evaluation time saved per request.
+
+Usage:
+    python benchmarks/prompt_size.py
+    python benchmarks/prompt_size.py --ollama http://127.0.0.1:11434 --model llama2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from load_test import BACKEND_DIR, _git_commit
+
+sys.path.insert(0, BACKEND_DIR)
+
+from services.llama_service import ClaimCategory, UniversalLLaMAService  # noqa: E402
+from services.pathway_service import PathwayProcessor  # noqa: E402
+
+CLAIMS = [
+    "The Eiffel Tower is taller than 400 meters",
+    "Water boils at 100 degrees Celsius at sea level",
+    "The Battle of Hastings took place in 1066",
+    "Vaccines cause autism in children",
+    "The square root of 144 is 12",
+    "Mount Everest is located in Nepal and China",
+    "Albert Einstein was born in Germany in 1879",
+    "70 percent of the Earth's surface is covered by water",
+    "Python was released before Java",
+    "Chocolate is the best dessert"
+]
+
+# The templates the prompts were built from before the prompt builder, for comparison
+UNIVERSAL_FRAMEWORKS = {
+    ClaimCategory.SCIENTIFIC: """SCIENTIFIC ANALYSIS FRAMEWORK:
+1. Evaluate the claim against current scientific consensus
+2. Consider peer-reviewed research and methodology
+3. Assess experimental evidence and reproducibility
+4. Check for scientific validity and logical consistency
+5. Consider uncertainty levels and confidence intervals
+
+Provide analysis in JSON format with high scientific rigor.""",
+    ClaimCategory.MATHEMATICAL: """MATHEMATICAL ANALYSIS FRAMEWORK:
+1. Verify mathematical accuracy through logical proof
+2. Check computational correctness
+3. Consider mathematical definitions and axioms
+4. Validate through multiple mathematical approaches
+5. Ensure logical consistency and completeness
+
+Mathematical claims require near-absolute certainty. Provide JSON analysis with mathematical precision.""",
+    ClaimCategory.HISTORICAL: """HISTORICAL ANALYSIS FRAMEWORK:
+1. Evaluate historical evidence and primary sources
+2. Consider multiple historical perspectives and interpretations
+3. Assess reliability of historical documentation
+4. Check chronological accuracy and context
+5. Consider historical consensus among scholars
+
+Provide historically contextualized JSON analysis with attention to source reliability.""",
+    ClaimCategory.MEDICAL: """MEDICAL ANALYSIS FRAMEWORK:
+1. Evaluate against current medical knowledge and guidelines
+2. Consider clinical evidence and research studies
+3. Assess safety implications and contraindications
+4. Check regulatory approval status where relevant
+5. Consider individual variation and context
+
+CRITICAL: Medical claims require highest confidence thresholds due to health implications."""
+}
+GENERAL_FRAMEWORK = """GENERAL ANALYSIS FRAMEWORK:
+1. Evaluate factual accuracy using reliable sources
+2. Consider context and nuanced interpretations
+3. Assess evidence quality and reliability
+4. Check for logical consistency
+5. Consider limitations and uncertainties
+
+Provide comprehensive JSON analysis appropriate for this claim type."""
+
+
+def original_universal_prompt(claim: str, category: ClaimCategory, config: Dict[str, Any]) -> str:
+    base_context = f"""You are a world-class fact-checking expert specializing in {category.value} claims.
+Your task is to analyze the following claim with the highest standards of accuracy and provide comprehensive analysis.
+
+CLAIM TO ANALYZE: "{claim}"
+CLAIM CATEGORY: {category.value}
+ANALYSIS REQUIREMENTS: {config}
+"""
+    return f"""{base_context}
+
+{UNIVERSAL_FRAMEWORKS.get(category, GENERAL_FRAMEWORK)}"""
+
+
+def ollama_prompt_eval(client: httpx.Client, model: str, prompt: str, num_ctx: Optional[int]) -> Dict[str, float]:
+    """prompt_eval_count and prompt_eval_duration (ms) Ollama reports for a prompt"""
+    options = {"num_predict": 1, "temperature": 0}
+    if num_ctx is not None:
+        options["num_ctx"] = num_ctx
+    response = client.post("/api/generate", json={"model": model, "prompt": prompt, "stream": False, "options": options})
+    response.raise_for_status()
+    result = response.json()
+    return {
+        "tokens": result.get("prompt_eval_count", 0),
+        "eval_ms": (result.get("prompt_eval_duration") or 0) / 1e6
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    processor = PathwayProcessor()
+    service = UniversalLLaMAService()
+    tokenizer = service.prompts
+
+    rows = []
+    for claim in CLAIMS:
+        context = processor.create_verification_context(processor.preprocess_claim(claim))
+        category, _ = service._categorize_claim_advanced(claim, context)
+        config = service.category_configs.get(category, {})
+
+        before = original_universal_prompt(claim, category, config)
+        after = service._prepare_universal_prompt(claim, category, context, config)
+        rows.append({
+            "claim": claim,
+            "category": category.value,
+            "path": "universal",
+            "before": {"chars": len(before), "tokens": tokenizer.count(before), "text": before},
+            "after": {"chars": len(after.text), "tokens": after.tokens, "num_ctx": after.num_ctx,
+                      "trimmed": after.trimmed, "text": after.text}
+        })
+
+    if args.ollama:
+        with httpx.Client(base_url=args.ollama, timeout=args.timeout) as client:
+            for row in rows:
+                row["before"]["ollama"] = ollama_prompt_eval(client, args.model, row["before"]["text"], None)
+                row["after"]["ollama"] = ollama_prompt_eval(client, args.model, row["after"]["text"], row["after"]["num_ctx"])
+
+    summary = {}
+    for path in ("universal",):
+        path_rows = [row for row in rows if row["path"] == path]
+        summary[path] = {
+            side: {
+                "median_chars": statistics.median(row[side]["chars"] for row in path_rows),
+                "median_tokens": statistics.median(row[side]["tokens"] for row in path_rows),
+                **({
+                    "median_ollama_tokens": statistics.median(row[side]["ollama"]["tokens"] for row in path_rows),
+                    "median_prompt_eval_ms": round(statistics.median(row[side]["ollama"]["eval_ms"] for row in path_rows), 1)
+                } if args.ollama else {})
+            }
+            for side in ("before", "after")
+        }
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "config": {"tokenizer": tokenizer.tokenizer.name, "ollama": args.ollama, "model": args.model if args.ollama else None},
+        "summary": summary,
+        "prompts": rows
+    }
+
+
+def print_summary(report: Dict[str, Any], show_prompts: bool):
+    print(f"\n✂️  Prompt size (commit {report['git_commit'] or 'unknown'}, tokenizer {report['config']['tokenizer']}, "
+          f"median over {len(CLAIMS)} claims)")
+    for path, sides in report["summary"].items():
+        before, after = sides["before"], sides["after"]
+        saved = (before["median_tokens"] - after["median_tokens"]) / before["median_tokens"] * 100
+        print(f"  {path:10s} tokens {before['median_tokens']:>5} -> {after['median_tokens']:<5} ({-saved:+.1f}%)"
+              f"  chars {before['median_chars']:>5} -> {after['median_chars']}")
+        if "median_prompt_eval_ms" in after:
+            print(f"  {'':10s} Ollama tokens {before['median_ollama_tokens']} -> {after['median_ollama_tokens']}"
+                  f"  prompt eval {before['median_prompt_eval_ms']}ms -> {after['median_prompt_eval_ms']}ms")
+    if show_prompts:
+        for row in report["prompts"]:
+            print(f"\n--- {row['path']} / {row['category']} ({row['before']['tokens']} -> {row['after']['tokens']} tokens)")
+            print(row["after"]["text"])
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fact Checker prompt size benchmark")
+    parser.add_argument("--ollama", default=None, help="Ollama base URL to measure prompt evaluation on (optional)")
+    parser.add_argument("--model", default=os.getenv("LLAMA_MODEL", "llama2"), help="model for --ollama")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per Ollama request")
+    parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/prompt-size-<timestamp>-<commit>.json)")
+    parser.add_argument("--show-prompts", action="store_true", help="print the compact prompts")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    report = run(args)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(BACKEND_DIR, "benchmarks", "results", f"prompt-size-{stamp}-{report['git_commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    print_summary(report, args.show_prompts)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Logging Configuration
+
+Queue-backed logging for the Fact Checker backend. Log calls made while
+serving a request only build a LogRecord and put it on an in-memory queue; a
+background QueueListener thread formats and writes it, so slow stdout or file
+I/O never blocks the event loop. Records carry the ID of the request that
+produced them.
+
+Configuration (environment variables):
+    LOG_LEVEL       Root level (default: INFO)
+    LOG_LEVELS      Per-module overrides, e.g. "services.llama_service=DEBUG,services.fact_checker=WARNING"
+    LOG_FORMAT      "text" (default) or "json" for JSON lines
+    LOG_FILE        Optional file to write to instead of stderr
+    LOG_QUEUE_SIZE  Records buffered before new ones are dropped (default: 10000)
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# ID of the request being served in the current context
+request_id_var: "contextvars.ContextVar[str]" = contextvars.ContextVar("request_id", default="-")
+
+# LogRecord attributes that are not user-supplied extras
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._\-]{1,64}$")
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+# Third-party loggers that log every request at INFO; quiet by default, override with LOG_LEVELS
+_DEFAULT_MODULE_LEVELS = {"httpx": logging.WARNING, "httpcore": logging.WARNING}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request ID (runs in the caller, before the record is queued)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking or erroring when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments and render the traceback; the rest of the formatting happens on the writer thread"""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-")
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_module_levels(raw: str) -> Dict[str, int]:
+    """Parse 'services.llama_service=DEBUG,models=WARNING' into logger name -> level"""
+    levels = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return {name: level for name, level in levels.items() if isinstance(level, int)}
+
+
+def setup_logging():
+    """Install the queue-backed root handler and start the writer thread (idempotent)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    if os.getenv("LOG_FILE"):
+        output = logging.FileHandler(os.getenv("LOG_FILE"), encoding="utf-8")
+    else:
+        output = logging.StreamHandler(sys.stderr)
+
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"))
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+    _queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    module_levels = dict(_DEFAULT_MODULE_LEVELS)
+    module_levels.update(parse_module_levels(os.getenv("LOG_LEVELS", "")))
+    for name, level in module_levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Queue depth and number of records dropped because the queue was full"""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware assigning each HTTP request an ID
+
+    A well-formed incoming X-Request-ID header is reused (so IDs can be
+    correlated across services); otherwise a new one is generated. The ID is
+    echoed in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -5,22 +5,58 @@ This is the main entry point for the Fact Checker backend API.
 It provides endpoints for fact-checking claims and retrieving history.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List, Optional
+import asyncio
+import json
+import logging
+import math
 import os
+from collections import Counter
 from datetime import datetime
 
+from logging_config import RequestIdMiddleware, get_logging_stats, setup_logging, shutdown_logging
+
+# Configure logging before the modules below log their initialization
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # Import our custom modules
 from models.memory_store import memory_store
-from models.schemas import ClaimRequest, ClaimResponse, HistoryResponse
-from services.fact_checker import FactCheckerService
+from models.serialization import FastJSONResponse, RawJSONResponse
+from models.schemas import (
+    ClaimRequest,
+    ClaimResponse,
+    BatchClaimRequest,
+    BatchItemResult,
+    BatchResponse,
+    JobRequest,
+    JobStatusResponse,
+    HistoryResponse
+)
+from services.adaptive_timeout import llm_timeouts
+from services.container import container
+from services.disconnect import ClientDisconnected, DisconnectGuard
+from services.drain import DrainController, DrainMiddleware
+from services.http_client import llm_http_client
+from services.job_queue import CallbackURLRejected, JobQueue, JobQueueFullError
+from services.llm_router import llm_router
+from services.loop_monitor import EventLoopMonitor
+from services.model_warmer import ModelWarmer
+from services.metrics import InFlightMiddleware, metrics
+from services.prompt_builder import prompt_builder
+from services.timing import format_server_timing
+from services.rate_limiter import RateLimiter
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Fact Checker API",
     description="AI-powered fact checking using Pathway and Ollama",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS for frontend integration
@@ -30,15 +66,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],  # Let the frontend read per-stage timings and request IDs
 )
 
-# Initialize fact checker service
-fact_checker_service = FactCheckerService()
+# Track in-flight requests per route for /metrics
+app.add_middleware(InFlightMiddleware, gauge=metrics.http_in_flight)
+
+# Refuse new fact-check work with 503 while draining for shutdown
+drain_controller = DrainController()
+app.add_middleware(DrainMiddleware, controller=drain_controller)
+
+# Tag every request (and its log records) with an ID; added last so it wraps everything
+app.add_middleware(RequestIdMiddleware)
+
+async def get_fact_checker():
+    """FastAPI dependency: the fact checker, waiting (off the event loop) for it to be built"""
+    return await container.aget("fact_checker")
+
+# Initialize background job queue
+job_queue = JobQueue(get_fact_checker)
+drain_controller.add_source("jobs", lambda: job_queue.outstanding)
+
+# Per-client request rate limiting; batch claims draw on their own, larger allowance
+rate_limiter = RateLimiter()
+batch_rate_limiter = RateLimiter(
+    per_minute=float(os.getenv("BATCH_RATE_LIMIT_PER_MINUTE", "600")),
+    burst=float(os.getenv("BATCH_RATE_LIMIT_BURST", os.getenv("BATCH_MAX_SIZE", "500")))
+)
+
+# Event loop lag sampling (reported in /stats)
+loop_monitor = EventLoopMonitor()
+
+# Cancels fact-checks whose client has disconnected
+disconnect_guard = DisconnectGuard()
+
+# Loads the LLM at startup and keeps it resident (reported in /health)
+model_warmer = ModelWarmer(lambda: container.aget("llama_service"))
+
+def _fact_checker_gauge(read):
+    """Gauge callback reading from the fact checker, 0 until it has been built"""
+    def callback():
+        service = container.peek("fact_checker")
+        return read(service) if service is not None else 0
+    return callback
+
+# Gauges read from the owning components when /metrics is scraped
+metrics.gauge("memory_store_results", "Fact-check results held in the memory store", callback=memory_store.count)
+metrics.gauge("llm_active_requests", "LLM calls currently holding a fair-queue slot", callback=_fact_checker_gauge(lambda service: service.fair_queue.active))
+metrics.gauge("llm_queued_requests", "LLM calls waiting in the fair queue", callback=_fact_checker_gauge(lambda service: service.fair_queue.queued))
+metrics.gauge("job_queue_depth", "Background jobs waiting for a worker", callback=lambda: job_queue.queue_depth)
+metrics.gauge("verdict_cache_entries", "Entries in the verdict cache", callback=_fact_checker_gauge(lambda service: service.verdict_cache.get_stats()["entries"]))
+metrics.gauge("event_loop_lag_seconds", "Most recent event loop lag sample", callback=lambda: loop_monitor.get_stats()["last_lag_ms"] / 1000)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the API"""
-    print("🚀 Fact Checker API is ready!")
+    await llm_http_client.start()
+    await job_queue.start()
+    loop_monitor.start()
+    # Build the fact checker (importing Pathway) in the background instead of at import time
+    container.start_warm_up("fact_checker")
+    model_warmer.start()
+    # Drain in-flight checks on SIGTERM/SIGINT before uvicorn shuts down
+    drain_controller.install_signal_handlers()
+    logger.info("🚀 Fact Checker API is ready!")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Finish in-flight work, stop background workers and flush the store and log records"""
+    # Already done when shutdown was triggered by a signal
+    await drain_controller.drain()
+    await container.stop_warm_up()
+    await model_warmer.stop()
+    await job_queue.stop()
+    await loop_monitor.stop()
+    await llm_router.stop()
+    await llm_http_client.stop()
+    memory_store.close()
+    shutdown_logging()
 
 @app.get("/")
 async def root():
@@ -51,20 +156,39 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "services": {
-            "memory_store": "initialized",
-            "pathway": "available",
-            "ollama": "configured"
-        }
-    }
+    """
+    Health check endpoint for monitoring
+    
+    Answers 503 ("warming") until the LLM is loaded, so load balancers and the
+    container health check only route traffic to an instance with a hot model,
+    and 503 ("draining") once the instance is shutting down.
+    """
+    if drain_controller.draining:
+        status = "draining"
+    else:
+        status = "healthy" if model_warmer.ready else "warming"
+    return FastJSONResponse(
+        {
+            "status": status,
+            "timestamp": datetime.now().isoformat(),
+            "services": {
+                "memory_store": "initialized",
+                "pathway": "available" if container.peek("pathway_processor") is not None else "loading",
+                "ollama": "configured"
+            },
+            "model": model_warmer.get_stats(),
+            "llm_backends": llm_router.get_health(),
+            "drain": drain_controller.get_stats()
+        },
+        status_code=200 if status == "healthy" else 503
+    )
 
 @app.post("/check", response_model=ClaimResponse)
 async def check_claim(
-    claim_request: ClaimRequest
+    claim_request: ClaimRequest,
+    request: Request,
+    response: Response,
+    fact_checker_service=Depends(get_fact_checker)
 ):
     """
     Main endpoint to fact-check a claim
@@ -75,29 +199,285 @@ async def check_claim(
     Returns:
         ClaimResponse: Verdict, confidence score, and explanation
     """
+    client_key = _enforce_rate_limit(request, claim_request.session_id)
+    
     try:
-        # Use the fact checker service to process the claim
-        result = await fact_checker_service.check_fact(
+        # Use the fact checker service to process the claim, cancelling it if the client goes away
+        result = await disconnect_guard.run(request, fact_checker_service.check_fact(
             claim=claim_request.claim,
-            session_id=claim_request.session_id
+            session_id=claim_request.session_id,
+            client_key=client_key
+        ))
+        
+        headers = {}
+        if result.get("timings"):
+            headers["Server-Timing"] = format_server_timing(result["timings"])
+        
+        # Send the body serialized when the result was stored, skipping model validation
+        body = await memory_store.call(memory_store.get_response_json, result["id"], result.get("timings"))
+        if body is None:
+            response.headers.update(headers)
+            return _to_claim_response(result)
+        return RawJSONResponse(body, headers=headers)
+        
+    except ClientDisconnected:
+        # Nobody will read the response (499 is the conventional "client closed request")
+        return Response(status_code=499)
+    except Exception as e:
+        logger.exception("❌ Error processing claim: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to process claim: {str(e)}"
+        )
+
+@app.post("/check/stream")
+async def check_claim_stream(
+    claim_request: ClaimRequest,
+    request: Request,
+    fact_checker_service=Depends(get_fact_checker)
+):
+    """
+    Fact-check a claim and stream progress as Server-Sent Events
+    
+    Emits one event per pipeline stage (preprocessed, categorized, generating,
+    parsed, stored), 'token' events carrying partial LLM output, and a final
+    'result' event whose data is the ClaimResponse.
+    
+    Args:
+        claim_request: The claim to be fact-checked
+    
+    Returns:
+        StreamingResponse: text/event-stream of pipeline events
+    """
+    client_key = _enforce_rate_limit(request, claim_request.session_id)
+    
+    async def event_stream():
+        try:
+            async for event in fact_checker_service.check_fact_stream(
+                claim=claim_request.claim,
+                session_id=claim_request.session_id,
+                client_key=client_key
+            ):
+                if event["event"] == "stored":
+                    yield _format_sse("stored", {"id": event["data"]["id"]})
+                    yield _format_sse("result", jsonable_encoder(_to_claim_response(event["data"])))
+                else:
+                    yield _format_sse(event["event"], event["data"])
+        except (asyncio.CancelledError, GeneratorExit):
+            # Starlette stops the stream when the client disconnects; the generation is aborted with it
+            disconnect_guard.record_disconnect(request.url.path)
+            raise
+        except Exception as e:
+            logger.exception("❌ Error streaming claim: %s", e)
+            yield _format_sse("error", {"detail": f"Failed to process claim: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/check/batch", response_model=BatchResponse)
+async def check_claims_batch(
+    batch_request: BatchClaimRequest,
+    request: Request,
+    fact_checker_service=Depends(get_fact_checker)
+):
+    """
+    Fact-check a batch of claims concurrently
+    
+    Args:
+        batch_request: The claims to be fact-checked and an optional concurrency cap
+    
+    Returns:
+        BatchResponse: Per-claim results (or errors) in input order with aggregate timing
+    """
+    if len(batch_request.claims) > fact_checker_service.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch_request.claims)} claims (max {fact_checker_service.batch_max_size})"
         )
+    
+    claims = _enforce_batch_rate_limit(request, batch_request.claims)
+    
+    try:
+        batch = await disconnect_guard.run(request, fact_checker_service.check_batch(
+            claims=claims,
+            max_concurrency=batch_request.max_concurrency
+        ))
+        
+        results = []
+        for item in batch["items"]:
+            if item["status"] == "ok":
+                try:
+                    results.append(BatchItemResult(
+                        index=item["index"],
+                        status="ok",
+                        result=_to_claim_response(item["result"])
+                    ))
+                    continue
+                except Exception as e:
+                    item = {"index": item["index"], "error": str(e)}
+            
+            results.append(BatchItemResult(
+                index=item["index"],
+                status="error",
+                error=item["error"]
+            ))
         
-        return ClaimResponse(
-            id=result["id"],
-            claim=result["claim"],
-            verdict=result["verdict"],
-            confidence_score=result["confidence_score"],
-            explanation=result["explanation"],
-            timestamp=result["timestamp"],
-            processing_time_ms=result["processing_time_ms"]
+        succeeded = sum(1 for result in results if result.status == "ok")
+        
+        return BatchResponse(
+            results=results,
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            concurrency=batch["concurrency"],
+            total_time_ms=batch["total_time_ms"],
+            average_item_time_ms=batch["average_item_time_ms"]
         )
         
+    except ClientDisconnected:
+        return Response(status_code=499)
     except Exception as e:
-        print(f"❌ Error processing claim: {str(e)}")
+        logger.exception("❌ Error processing batch: %s", e)
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to process claim: {str(e)}"
+            detail=f"Failed to process batch: {str(e)}"
+        )
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def submit_job(
+    job_request: JobRequest,
+    request: Request
+):
+    """
+    Submit a claim for background fact-checking
+    
+    Args:
+        job_request: The claim to be fact-checked and an optional callback URL
+    
+    Returns:
+        JobStatusResponse: The queued job; poll GET /jobs/{job_id} for the result
+    """
+    client_key = _enforce_rate_limit(request, job_request.session_id)
+    
+    try:
+        job = job_queue.submit(
+            claim=job_request.claim,
+            session_id=job_request.session_id,
+            callback_url=str(job_request.callback_url) if job_request.callback_url else None,
+            client_key=client_key
+        )
+    except CallbackURLRejected as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    
+    return _to_job_response(job)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """
+    Get the status (and result, once completed) of a background job
+    
+    Args:
+        job_id: The ID returned by POST /jobs
+    
+    Returns:
+        JobStatusResponse: Current job status
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return _to_job_response(job)
+
+def _to_job_response(job: dict) -> JobStatusResponse:
+    """Build the API response model from a job record"""
+    return JobStatusResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        queue_depth=job_queue.queue_depth,
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        completed_at=job["completed_at"],
+        result=_to_claim_response(job["result"]) if job["result"] else None,
+        error=job["error"]
+    )
+
+def _enforce_rate_limit(request: Request, session_id: Optional[str]) -> str:
+    """Charge the request to its client's token bucket, raising 429 when exhausted"""
+    client_key = rate_limiter.client_key(session_id, request.client.host if request.client else None)
+    allowed, retry_after = rate_limiter.check(client_key)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for {client_key}. Please slow down.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+    return client_key
+
+def _enforce_batch_rate_limit(request: Request, items: List[ClaimRequest]) -> List[dict]:
+    """
+    Charge one claim per item to each item's own client's batch allowance, raising 429 when any is exhausted
+
+    Batches draw on batch_rate_limiter rather than the per-request buckets, so
+    an idle client can send a batch of up to BATCH_RATE_LIMIT_BURST claims.
+
+    Returns:
+        The batch items as dicts, each tagged with the client_key its LLM work is charged to
+    """
+    client_ip = request.client.host if request.client else None
+    claims = [
+        dict(item.dict(), client_key=rate_limiter.client_key(item.session_id, client_ip))
+        for item in items
+    ]
+    costs = Counter(claim["client_key"] for claim in claims)
+    
+    too_costly = [key for key, cost in costs.items() if cost > batch_rate_limiter.burst]
+    if batch_rate_limiter.enabled and too_costly:
+        # Could never be admitted however long the client waits
+        raise HTTPException(
+            status_code=429,
+            detail=(
+                f"Batch needs {costs[too_costly[0]]} claims from {too_costly[0]}, "
+                f"more than the batch allowance of {int(batch_rate_limiter.burst)}. Split the batch."
+            )
+        )
+    
+    allowed, retry_after, limited_key = batch_rate_limiter.check_all(costs)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Batch rate limit exceeded for {limited_key}. Please slow down.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
         )
+    return claims
+
+def _format_sse(event: str, data) -> str:
+    """Encode a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _to_claim_response(result: dict) -> ClaimResponse:
+    """Build the API response model from a stored fact-check result"""
+    return ClaimResponse(
+        id=result["id"],
+        claim=result["claim"],
+        verdict=result["verdict"],
+        confidence_score=result["confidence_score"],
+        explanation=result["explanation"],
+        timestamp=result["timestamp"],
+        processing_time_ms=result["processing_time_ms"],
+        cache_hit=result.get("cache_hit"),
+        similarity_score=result.get("similarity_score"),
+        matched_claim=result.get("matched_claim"),
+        timings=result.get("timings")
+    )
 
 @app.get("/history", response_model=List[HistoryResponse])
 async def get_history(
@@ -115,29 +495,18 @@ async def get_history(
         List of historical fact-check results
     """
     try:
-        results = memory_store.get_all(limit=limit, offset=offset)
-        
-        return [
-            HistoryResponse(
-                id=result["id"],
-                claim=result["claim"],
-                verdict=result["verdict"],
-                confidence_score=result["confidence_score"],
-                explanation=result["explanation"][:200] + "..." if len(result["explanation"]) > 200 else result["explanation"],
-                timestamp=result["timestamp"]
-            )
-            for result in results
-        ]
+        # Entries are serialized once when stored; a page is a join of those bytes
+        return RawJSONResponse(await memory_store.call(memory_store.get_history_json, limit=limit, offset=offset))
         
     except Exception as e:
-        print(f"❌ Error retrieving history: {str(e)}")
+        logger.exception("❌ Error retrieving history: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve history: {str(e)}"
         )
 
 @app.get("/stats")
-async def get_stats():
+async def get_stats(fact_checker_service=Depends(get_fact_checker)):
     """
     Get statistics about fact-checks
     
@@ -145,14 +514,43 @@ async def get_stats():
         Dict with statistics about fact-check results
     """
     try:
-        return memory_store.get_stats()
+        stats = await memory_store.call(memory_store.get_stats)
+        stats["jobs"] = job_queue.get_stats()
+        stats["coalescing"] = fact_checker_service.single_flight.get_stats()
+        stats["cancellation"] = disconnect_guard.get_stats()
+        stats["verdict_cache"] = fact_checker_service.verdict_cache.get_stats()
+        stats["near_duplicate"] = fact_checker_service.near_duplicate_index.get_stats()
+        stats["rate_limiting"] = rate_limiter.get_stats()
+        stats["rate_limiting"]["batch"] = batch_rate_limiter.get_stats()
+        stats["fair_queue"] = fact_checker_service.fair_queue.get_stats()
+        stats["llm_backends"] = llm_router.get_stats()
+        stats["llm_timeouts"] = llm_timeouts.get_stats()
+        stats["prompts"] = prompt_builder.get_stats()
+        stats["llm_http"] = llm_http_client.get_stats()
+        stats["event_loop"] = loop_monitor.get_stats()
+        stats["logging"] = get_logging_stats()
+        stats["services"] = container.get_stats()
+        stats["worker_pid"] = os.getpid()
+        return stats
     except Exception as e:
-        print(f"❌ Error retrieving stats: {str(e)}")
+        logger.exception("❌ Error retrieving stats: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve stats: {str(e)}"
         )
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Get metrics in the Prometheus text exposition format
+    
+    Returns:
+        Per-stage latency histograms, verdict/category/error counters and in-flight gauges
+    """
+    # The stored-results gauge reads the result store, so render where store calls run
+    body = await memory_store.call(metrics.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     
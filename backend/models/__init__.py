@@ -3,12 +3,21 @@ Models Package Initialization
 
 This file makes the models directory a Python package and
 provides convenient imports for database models and schemas.
+
+The SQLAlchemy database module is imported on first access to one of its
+names, so importing the schemas or the result store does not load SQLAlchemy.
 """
 
-from .database import ClaimResult, get_db, create_tables, init_database
+import importlib
+
 from .schemas import (
     ClaimRequest, 
     ClaimResponse, 
+    BatchClaimRequest,
+    BatchItemResult,
+    BatchResponse,
+    JobRequest,
+    JobStatusResponse,
     HistoryResponse, 
     StatsResponse, 
     ErrorResponse,
@@ -25,8 +34,23 @@ __all__ = [
     # Pydantic schemas
     "ClaimRequest",
     "ClaimResponse", 
+    "BatchClaimRequest",
+    "BatchItemResult",
+    "BatchResponse",
+    "JobRequest",
+    "JobStatusResponse",
     "HistoryResponse",
     "StatsResponse",
     "ErrorResponse",
     "VerdictEnum"
-]
\ No newline at end of file
+]
+
+_DATABASE_EXPORTS = {"ClaimResult", "get_db", "create_tables", "init_database"}
+
+
+def __getattr__(name):
+    if name not in _DATABASE_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(".database", __name__), name)
+    globals()[name] = value
+    return value
@@ -6,8 +6,16 @@ Fact Checker application, eliminating the need for a database.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, TypeVar
 import json
+import logging
+import os
+
+from .serialization import close_response, join_array, serialize_history, serialize_response
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 class MemoryStore:
     """
@@ -21,7 +29,18 @@ class MemoryStore:
         """Initialize the memory store with an empty dictionary"""
         self._store = []
         self._counter = 1  # For generating IDs
-        print("📊 In-Memory Store initialized")
+        self._base_id = 1  # ID of _store[0]; IDs are contiguous from here
+        
+        # Serialized forms of each result, aligned with _store: the /check
+        # response body without its closing brace (so per-request timings can
+        # be appended) and the /history entry
+        self._response_json: List[bytes] = []
+        self._history_json: List[bytes] = []
+        logger.info("📊 In-Memory Store initialized")
+    
+    async def call(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call one of the store's methods from async code (in-memory calls never block, so they run inline)"""
+        return method(*args, **kwargs)
     
     def add_result(self, 
                   claim: str, 
@@ -30,7 +49,10 @@ class MemoryStore:
                   explanation: str,
                   processing_time_ms: Optional[int] = None,
                   sources: Optional[str] = None,
-                  session_id: Optional[str] = None) -> Dict:
+                  session_id: Optional[str] = None,
+                  cache_hit: Optional[bool] = None,
+                  similarity_score: Optional[float] = None,
+                  matched_claim: Optional[str] = None) -> Dict:
         """
         Add a new fact-check result to the store
         
@@ -42,6 +64,9 @@ class MemoryStore:
             processing_time_ms: Processing time in milliseconds
             sources: Optional JSON string of source URLs
             session_id: Optional user session identifier
+            cache_hit: Whether the verdict was served from the verdict cache
+            similarity_score: Similarity to the cached claim whose verdict was reused
+            matched_claim: The near-duplicate claim whose verdict was reused
             
         Returns:
             Dict: The stored result with a generated ID
@@ -55,10 +80,17 @@ class MemoryStore:
             "processing_time_ms": processing_time_ms,
             "timestamp": datetime.utcnow().isoformat(),
             "sources": sources,
-            "session_id": session_id
+            "session_id": session_id,
+            "cache_hit": cache_hit,
+            "similarity_score": similarity_score,
+            "matched_claim": matched_claim
         }
         
+        # Serialize first: an invalid result raises before anything is stored
+        response_json, history_json = serialize_response(result), serialize_history(result)
         self._store.append(result)
+        self._response_json.append(response_json)
+        self._history_json.append(history_json)
         self._counter += 1
         
         return result
@@ -74,15 +106,45 @@ class MemoryStore:
         Returns:
             List[Dict]: List of stored results
         """
-        results = sorted(self._store, key=lambda x: x["id"], reverse=True)
+        # Results are appended in ID order, so newest-first is a reversed slice
+        start, end = self._page_bounds(limit, offset)
+        return self._store[start:end][::-1]
+    
+    def get_history_json(self, limit: Optional[int] = None, offset: Optional[int] = 0) -> bytes:
+        """
+        Get a page of history as a serialized JSON array of HistoryResponse entries
         
-        if offset:
-            results = results[offset:]
+        Args:
+            limit: Maximum number of results to return
+            offset: Number of results to skip
             
-        if limit:
-            results = results[:limit]
+        Returns:
+            bytes: JSON array, newest first
+        """
+        start, end = self._page_bounds(limit, offset)
+        return join_array(reversed(self._history_json[start:end]))
+    
+    def get_response_json(self, result_id: int, timings: Optional[Dict[str, float]] = None) -> Optional[bytes]:
+        """
+        Get a stored result serialized as a ClaimResponse body
+        
+        Args:
+            result_id: The ID of the result
+            timings: Per-request stage timings to include
             
-        return results
+        Returns:
+            Optional[bytes]: The JSON body, or None if the ID is unknown
+        """
+        index = result_id - self._base_id
+        if index < 0 or index >= len(self._response_json):
+            return None
+        return close_response(self._response_json[index], timings)
+    
+    def _page_bounds(self, limit: Optional[int], offset: Optional[int]):
+        """Slice bounds into the ID-ordered store for a newest-first page"""
+        end = max(len(self._store) - (offset or 0), 0)
+        start = max(end - limit, 0) if limit else 0
+        return start, end
     
     def get_by_id(self, result_id: int) -> Optional[Dict]:
         """
@@ -94,9 +156,9 @@ class MemoryStore:
         Returns:
             Optional[Dict]: The result if found, None otherwise
         """
-        for result in self._store:
-            if result["id"] == result_id:
-                return result
+        index = result_id - self._base_id
+        if 0 <= index < len(self._store):
+            return self._store[index]
         return None
     
     def get_stats(self) -> Dict:
@@ -138,10 +200,36 @@ class MemoryStore:
             "average_processing_time_ms": avg_processing_time
         }
     
+    def count(self) -> int:
+        """Get the number of stored results"""
+        return len(self._store)
+    
     def clear(self):
         """Clear all stored results"""
         self._store = []
-        print("🧹 In-Memory Store cleared")
+        self._response_json = []
+        self._history_json = []
+        self._base_id = self._counter
+        logger.info("🧹 In-Memory Store cleared")
+    
+    def close(self):
+        """Flush pending writes before shutdown (nothing is buffered in memory)"""
+
+def create_store():
+    """
+    Create the result store selected by the environment
+    
+    RESULT_STORE=memory (default) keeps results in this process.
+    RESULT_STORE=sqlite shares them through the database at RESULT_STORE_PATH,
+    which is required when running uvicorn with more than one worker.
+    """
+    backend = os.getenv("RESULT_STORE", "memory").lower()
+    if backend == "sqlite":
+        from .sqlite_store import SQLiteStore
+        return SQLiteStore(os.getenv("RESULT_STORE_PATH", "fact_checker_results.db"))
+    if backend != "memory":
+        logger.warning("⚠️ Unknown RESULT_STORE %r, using the in-memory store", backend)
+    return MemoryStore()
 
 # Create a singleton instance
-memory_store = MemoryStore()
\ No newline at end of file
+memory_store = create_store()
\ No newline at end of file
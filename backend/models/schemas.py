@@ -5,8 +5,8 @@ This module defines the data validation schemas used for API requests
 and responses in the Fact Checker application.
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -93,6 +93,28 @@ class ClaimResponse(BaseModel):
         description="List of source URLs used for verification"
     )
     
+    cache_hit: Optional[bool] = Field(
+        None,
+        description="Whether the verdict was served from the verdict cache"
+    )
+    
+    similarity_score: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Similarity between this claim and the cached claim whose verdict was reused"
+    )
+    
+    matched_claim: Optional[str] = Field(
+        None,
+        description="The previously verified near-duplicate claim whose verdict was reused"
+    )
+    
+    timings: Optional[Dict[str, float]] = Field(
+        None,
+        description="Time spent in each pipeline stage in milliseconds (also sent as a Server-Timing header)"
+    )
+    
     class Config:
         schema_extra = {
             "example": {
@@ -103,7 +125,9 @@ class ClaimResponse(BaseModel):
                 "explanation": "The Eiffel Tower is 330 meters tall to the top of its structure, which is less than 400 meters. Including the antenna, it reaches 324 meters.",
                 "timestamp": "2024-01-15T10:30:00Z",
                 "processing_time_ms": 1250,
-                "sources": ["https://en.wikipedia.org/wiki/Eiffel_Tower"]
+                "sources": ["https://en.wikipedia.org/wiki/Eiffel_Tower"],
+                "cache_hit": False,
+                "timings": {"preprocess": 2.1, "cache_lookup": 0.2, "context": 0.1, "queue_wait": 0.0, "categorize": 0.1, "prompt": 0.1, "llm": 1240.3, "parse": 0.4, "store": 0.2, "total": 1250.1}
             }
         }
 
@@ -157,6 +181,177 @@ class HistoryResponse(BaseModel):
         }
 
 
+class BatchClaimRequest(BaseModel):
+    """
+    Request model for submitting several claims in a single call
+    """
+    claims: List[ClaimRequest] = Field(
+        ...,
+        min_length=1,
+        description="The claims to be fact-checked, processed concurrently"
+    )
+    
+    max_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Optional concurrency cap for this batch (bounded by the server limit)"
+    )
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "claims": [
+                    {"claim": "The Eiffel Tower is taller than 400 meters"},
+                    {"claim": "Water boils at 100 degrees Celsius at sea level"}
+                ],
+                "max_concurrency": 4
+            }
+        }
+
+
+class BatchItemResult(BaseModel):
+    """
+    Per-claim outcome within a batch response
+    """
+    index: int = Field(
+        ...,
+        description="Position of the claim in the submitted batch"
+    )
+    
+    status: str = Field(
+        ...,
+        description="'ok' when the claim was processed, 'error' otherwise"
+    )
+    
+    result: Optional[ClaimResponse] = Field(
+        None,
+        description="The fact-check result when status is 'ok'"
+    )
+    
+    error: Optional[str] = Field(
+        None,
+        description="Error message when status is 'error'"
+    )
+
+
+class BatchResponse(BaseModel):
+    """
+    Response model for batch fact-check results, in input order
+    """
+    results: List[BatchItemResult] = Field(
+        ...,
+        description="Per-claim results in the same order as the request"
+    )
+    
+    total: int = Field(
+        ...,
+        description="Number of claims in the batch"
+    )
+    
+    succeeded: int = Field(
+        ...,
+        description="Number of claims processed successfully"
+    )
+    
+    failed: int = Field(
+        ...,
+        description="Number of claims that produced an error"
+    )
+    
+    concurrency: int = Field(
+        ...,
+        description="Concurrency cap that was applied to this batch"
+    )
+    
+    total_time_ms: int = Field(
+        ...,
+        description="Wall-clock time for the whole batch in milliseconds"
+    )
+    
+    average_item_time_ms: float = Field(
+        ...,
+        description="Average per-claim processing time in milliseconds"
+    )
+
+
+class JobRequest(ClaimRequest):
+    """
+    Request model for submitting a claim as a background job
+    """
+    callback_url: Optional[HttpUrl] = Field(
+        None,
+        description="Optional http(s) URL that receives the finished job as a JSON POST; loopback, private and link-local hosts are refused"
+    )
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "claim": "The Eiffel Tower is taller than 400 meters",
+                "session_id": "user_session_123",
+                "callback_url": "https://example.com/fact-check-callback"
+            }
+        }
+
+
+class JobStatusResponse(BaseModel):
+    """
+    Response model for background job submission and status
+    """
+    job_id: str = Field(
+        ...,
+        description="Unique identifier for this job"
+    )
+    
+    status: str = Field(
+        ...,
+        description="Job status: queued, running, completed or failed"
+    )
+    
+    queue_depth: int = Field(
+        ...,
+        description="Number of jobs currently waiting for a worker"
+    )
+    
+    created_at: datetime = Field(
+        ...,
+        description="When the job was submitted"
+    )
+    
+    started_at: Optional[datetime] = Field(
+        None,
+        description="When a worker picked up the job"
+    )
+    
+    completed_at: Optional[datetime] = Field(
+        None,
+        description="When the job finished"
+    )
+    
+    result: Optional[ClaimResponse] = Field(
+        None,
+        description="The fact-check result once the job has completed"
+    )
+    
+    error: Optional[str] = Field(
+        None,
+        description="Error message if the job failed"
+    )
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "job_id": "3f2b8c1e9a6d4e7f8b0c1d2e3f4a5b6c",
+                "status": "queued",
+                "queue_depth": 3,
+                "created_at": "2024-01-15T10:30:00Z",
+                "started_at": None,
+                "completed_at": None,
+                "result": None,
+                "error": None
+            }
+        }
+
+
 class StatsResponse(BaseModel):
     """
     Response model for fact-checking statistics
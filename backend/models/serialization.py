@@ -0,0 +1,111 @@
+"""
+Fast JSON Serialization
+
+This module provides the JSON encoding used for API responses and for the
+pre-serialized results kept in the memory store. orjson is used when it is
+installed; otherwise the standard library encoder is used with compact
+separators, producing the same JSON.
+"""
+
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+from .schemas import ClaimResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+# Explanations in /history responses are shortened to this many characters
+HISTORY_EXPLANATION_CHARS = 200
+
+
+def _default(obj: Any) -> Any:
+    """Encode the non-JSON types that appear in results"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        """Serialize an object to compact JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize an object to compact JSON bytes"""
+        return _encoder.encode(obj).encode("utf-8")
+
+
+def join_array(items: Iterable[bytes]) -> bytes:
+    """Combine already serialized JSON values into a JSON array"""
+    return b"[" + b",".join(items) + b"]"
+
+
+def serialize_response(result: Dict) -> bytes:
+    """
+    Serialize a stored result as a ClaimResponse body, leaving it open for the timings field
+
+    The result is validated as a ClaimResponse first, so the stored body holds
+    exactly what /check/batch and /jobs return for the same result.
+
+    Raises:
+        pydantic.ValidationError: If the result is not a valid ClaimResponse
+    """
+    response = ClaimResponse(
+        id=result["id"],
+        claim=result["claim"],
+        verdict=result["verdict"],
+        confidence_score=result["confidence_score"],
+        explanation=result["explanation"],
+        timestamp=result["timestamp"],
+        processing_time_ms=result["processing_time_ms"],
+        cache_hit=result["cache_hit"],
+        similarity_score=result["similarity_score"],
+        matched_claim=result["matched_claim"]
+    )
+    return dumps(response.model_dump(mode="json", exclude={"timings"}))[:-1]
+
+
+def close_response(prefix: bytes, timings: Optional[Dict[str, float]]) -> bytes:
+    """Complete a body from serialize_response with the per-request timings"""
+    return prefix + b',"timings":' + dumps(timings) + b"}"
+
+
+def serialize_history(result: Dict) -> bytes:
+    """Serialize a stored result as a HistoryResponse entry"""
+    explanation = result["explanation"]
+    if len(explanation) > HISTORY_EXPLANATION_CHARS:
+        explanation = explanation[:HISTORY_EXPLANATION_CHARS] + "..."
+    return dumps({
+        "id": result["id"],
+        "claim": result["claim"],
+        "verdict": result["verdict"],
+        "confidence_score": float(result["confidence_score"]),
+        "explanation": explanation,
+        "timestamp": result["timestamp"]
+    })
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Response whose body is already serialized JSON"""
+
+    media_type = "application/json"
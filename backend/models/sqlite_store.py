@@ -0,0 +1,298 @@
+"""
+SQLite Storage for Fact Checker
+
+This module provides a result store backed by a shared SQLite file, for
+running the API with several uvicorn workers. Every worker opens the same
+database, so result IDs are globally unique and /history and /stats give the
+same answer whichever worker serves the request. It implements the same
+interface as MemoryStore and is selected with RESULT_STORE=sqlite.
+
+The database runs in WAL mode: readers never block the single writer, and
+each write is one short transaction. Writes from different workers still
+queue for the database's write lock, for up to RESULT_STORE_BUSY_TIMEOUT_MS,
+so async code calls the store through call(), which runs every call on the
+store's own thread instead of the event loop.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from .serialization import close_response, join_array, serialize_history, serialize_response
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    claim TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    confidence_score REAL NOT NULL,
+    explanation TEXT NOT NULL,
+    processing_time_ms INTEGER,
+    timestamp TEXT NOT NULL,
+    sources TEXT,
+    session_id TEXT,
+    cache_hit INTEGER,
+    similarity_score REAL,
+    matched_claim TEXT,
+    response_json BLOB,
+    history_json BLOB
+)
+"""
+
+_RESULT_COLUMNS = (
+    "id, claim, verdict, confidence_score, explanation, processing_time_ms, timestamp, "
+    "sources, session_id, cache_hit, similarity_score, matched_claim"
+)
+
+
+class SQLiteStore:
+    """
+    SQLite storage class for fact-check results
+
+    Stores results in a database file shared by all worker processes.
+    AUTOINCREMENT keeps IDs unique across workers and never reuses them,
+    even after clear().
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store and create the schema if needed
+
+        Args:
+            path: Database file, shared by every worker
+        """
+        self.path = path
+        self.busy_timeout_ms = int(os.getenv("RESULT_STORE_BUSY_TIMEOUT_MS", "5000"))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._connection()
+        logger.info("📊 SQLite Store initialized (%s)", path)
+
+    async def call(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Call one of the store's methods from async code without blocking the event loop
+
+        Calls run one at a time on a thread owned by the store (they are
+        serialized by its lock anyway), so a write waiting for another
+        worker's write lock holds that thread rather than the event loop or
+        the default executor.
+        """
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-store")
+            self._executor_pid = os.getpid()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    def _connection(self) -> sqlite3.Connection:
+        """The connection for this process, reopened after a fork"""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def add_result(self,
+                  claim: str,
+                  verdict: str,
+                  confidence_score: float,
+                  explanation: str,
+                  processing_time_ms: Optional[int] = None,
+                  sources: Optional[str] = None,
+                  session_id: Optional[str] = None,
+                  cache_hit: Optional[bool] = None,
+                  similarity_score: Optional[float] = None,
+                  matched_claim: Optional[str] = None) -> Dict:
+        """
+        Add a new fact-check result to the store
+
+        Args:
+            claim: The claim that was fact-checked
+            verdict: The verdict (True/False/Unverified)
+            confidence_score: Confidence score (0-100)
+            explanation: Detailed explanation
+            processing_time_ms: Processing time in milliseconds
+            sources: Optional JSON string of source URLs
+            session_id: Optional user session identifier
+            cache_hit: Whether the verdict was served from the verdict cache
+            similarity_score: Similarity to the cached claim whose verdict was reused
+            matched_claim: The near-duplicate claim whose verdict was reused
+
+        Returns:
+            Dict: The stored result with a generated ID
+        """
+        result = {
+            "id": None,
+            "claim": claim,
+            "verdict": verdict,
+            "confidence_score": confidence_score,
+            "explanation": explanation,
+            "processing_time_ms": processing_time_ms,
+            "timestamp": datetime.utcnow().isoformat(),
+            "sources": sources,
+            "session_id": session_id,
+            "cache_hit": cache_hit,
+            "similarity_score": similarity_score,
+            "matched_claim": matched_claim
+        }
+
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    f"INSERT INTO results ({_RESULT_COLUMNS}) VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (claim, verdict, confidence_score, explanation, processing_time_ms, result["timestamp"],
+                     sources, session_id, cache_hit, similarity_score, matched_claim)
+                )
+                # The serialized forms embed the ID, which is only known after the insert
+                result["id"] = cursor.lastrowid
+                conn.execute(
+                    "UPDATE results SET response_json = ?, history_json = ? WHERE id = ?",
+                    (serialize_response(result), serialize_history(result), result["id"])
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return result
+
+    def get_all(self, limit: Optional[int] = None, offset: Optional[int] = 0) -> List[Dict]:
+        """
+        Get all stored results with optional pagination
+
+        Args:
+            limit: Maximum number of results to return
+            offset: Number of results to skip
+
+        Returns:
+            List[Dict]: List of stored results
+        """
+        rows = self._query(
+            f"SELECT {_RESULT_COLUMNS} FROM results ORDER BY id DESC LIMIT ? OFFSET ?",
+            (limit or -1, offset or 0)
+        )
+        return [self._row_to_result(row) for row in rows]
+
+    def get_history_json(self, limit: Optional[int] = None, offset: Optional[int] = 0) -> bytes:
+        """
+        Get a page of history as a serialized JSON array of HistoryResponse entries
+
+        Args:
+            limit: Maximum number of results to return
+            offset: Number of results to skip
+
+        Returns:
+            bytes: JSON array, newest first
+        """
+        rows = self._query(
+            "SELECT history_json FROM results ORDER BY id DESC LIMIT ? OFFSET ?",
+            (limit or -1, offset or 0)
+        )
+        return join_array(row[0] for row in rows)
+
+    def get_response_json(self, result_id: int, timings: Optional[Dict[str, float]] = None) -> Optional[bytes]:
+        """
+        Get a stored result serialized as a ClaimResponse body
+
+        Args:
+            result_id: The ID of the result
+            timings: Per-request stage timings to include
+
+        Returns:
+            Optional[bytes]: The JSON body, or None if the ID is unknown
+        """
+        rows = self._query("SELECT response_json FROM results WHERE id = ?", (result_id,))
+        if not rows:
+            return None
+        return close_response(rows[0][0], timings)
+
+    def get_by_id(self, result_id: int) -> Optional[Dict]:
+        """
+        Get a specific result by ID
+
+        Args:
+            result_id: The ID of the result to retrieve
+
+        Returns:
+            Optional[Dict]: The result if found, None otherwise
+        """
+        rows = self._query(f"SELECT {_RESULT_COLUMNS} FROM results WHERE id = ?", (result_id,))
+        return self._row_to_result(rows[0]) if rows else None
+
+    def get_stats(self) -> Dict:
+        """
+        Get statistics about the stored results
+
+        Returns:
+            Dict: Statistics about verdicts, average confidence, etc.
+        """
+        verdicts = {"True": 0, "False": 0, "Unverified": 0}
+        for verdict, count in self._query("SELECT verdict, COUNT(*) FROM results GROUP BY verdict"):
+            verdicts[verdict] = count
+
+        total, avg_confidence, avg_processing_time = self._query(
+            "SELECT COUNT(*), AVG(confidence_score), AVG(processing_time_ms) FROM results"
+        )[0]
+
+        return {
+            "total": total,
+            "verdicts": verdicts,
+            "average_confidence": avg_confidence or 0,
+            "average_processing_time_ms": avg_processing_time or 0
+        }
+
+    def count(self) -> int:
+        """Get the number of stored results"""
+        return self._query("SELECT COUNT(*) FROM results")[0][0]
+
+    def clear(self):
+        """Clear all stored results (for every worker)"""
+        with self._lock:
+            self._connection().execute("DELETE FROM results")
+        logger.info("🧹 SQLite Store cleared")
+
+    def close(self):
+        """Finish pending calls, checkpoint the WAL into the database file and close this process's connection"""
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            if self._conn is None or self._pid != os.getpid():
+                return
+            try:
+                # Other workers may still be reading; a busy checkpoint is finished by the last one
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                self._conn.close()
+                self._conn = None
+        logger.info("📊 SQLite Store closed")
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Run a read query on this process's connection"""
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _row_to_result(row: sqlite3.Row) -> Dict:
+        """Convert a row to the result dict shape used by MemoryStore"""
+        result = dict(row)
+        if result["cache_hit"] is not None:
+            result["cache_hit"] = bool(result["cache_hit"])
+        return result
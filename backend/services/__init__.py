@@ -3,19 +3,35 @@ Services Package Initialization
 
 This file makes the services directory a Python package and
 provides convenient imports for the fact-checking services.
+
+The exports are resolved lazily (PEP 562), so importing the package does not
+import Pathway or the LLM client; `services.container` builds them on first
+use. `llama_service` and `container` are submodule names here, so their
+instances are not re-exported: use `container.get("llama_service")`.
 """
 
-from .pathway_service import PathwayProcessor, pathway_processor
-from .llama_service import LLaMAService, llama_service
-from .fact_checker import FactCheckerService
+import importlib
 
-__all__ = [
+# Exported name -> (submodule, attribute)
+_EXPORTS = {
     # Classes
-    "PathwayProcessor",
-    "LLaMAService", 
-    "FactCheckerService",
+    "PathwayProcessor": ("pathway_service", "PathwayProcessor"),
+    "UniversalLLaMAService": ("llama_service", "UniversalLLaMAService"),
+    "LLaMAService": ("llama_service", "UniversalLLaMAService"),
+    "FactCheckerService": ("fact_checker", "FactCheckerService"),
+    "ServiceContainer": ("container", "ServiceContainer"),
     
     # Service instances
-    "pathway_processor",
-    "llama_service"
-]
\ No newline at end of file
+    "pathway_processor": ("pathway_service", "pathway_processor")
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attribute)
+    globals()[name] = value
+    return value
@@ -0,0 +1,144 @@
+"""
+Adaptive LLM Timeouts
+
+A single fixed read timeout is far too long for a claim the model answers
+in a second and can be too short for one that legitimately generates for a
+minute. This module learns how long the LLM takes per mode (generate or
+stream), model and ClaimCategory and derives each request's read timeout
+from it: a multiple of a high percentile of the recent latencies, clamped
+between a floor and a ceiling. A hung generation is then cut off after a
+few seconds, while slow categories keep the time they need.
+
+A request cut off by its timeout does not add a latency sample (one hung
+generation would otherwise inflate the percentile for a whole window
+of requests). Instead each consecutive timeout of a model doubles its
+timeouts, up to the ceiling, until a request completes again: an isolated
+hang costs nothing, while a model that has become slower soon gets the
+time it needs and its new latencies replace the old ones.
+
+What a read timeout bounds differs by mode: for a non-streaming generation
+it is the whole generation (Ollama sends the response when it is done), for
+a stream it is the longest wait for the next chunk (including the first
+token). Each mode records the matching latency.
+"""
+
+import os
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Latencies are also aggregated over all categories under this key, for categories with too few samples
+ALL_CATEGORIES = "*"
+
+
+class LatencyWindow:
+    """The most recent latency samples, with quantiles computed on demand"""
+
+    __slots__ = ("_samples", "_sorted")
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._sorted: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        """Add a sample, evicting the oldest once the window is full"""
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile (0-1) of the samples, or None if there are none"""
+        if not self._samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class AdaptiveTimeoutPolicy:
+    """Per-request LLM read timeouts derived from observed latency percentiles"""
+
+    def __init__(self):
+        """Initialize the policy from environment configuration"""
+        # Configuration - can be set via environment variables
+        self.enabled = os.getenv("LLM_ADAPTIVE_TIMEOUT_ENABLED", "true").lower() == "true"
+        self.quantile = float(os.getenv("LLM_TIMEOUT_QUANTILE", "0.99"))
+        self.multiplier = float(os.getenv("LLM_TIMEOUT_MULTIPLIER", "2.0"))
+        self.floor = float(os.getenv("LLM_TIMEOUT_FLOOR", "5"))
+        self.ceiling = float(os.getenv("LLM_TIMEOUT_CEILING", "120"))
+        self.min_samples = int(os.getenv("LLM_TIMEOUT_MIN_SAMPLES", "20"))
+        self.window = int(os.getenv("LLM_TIMEOUT_WINDOW", "200"))
+
+        # (mode, model, category) -> recent latencies; category ALL_CATEGORIES aggregates the model's
+        self._latencies: Dict[Tuple[str, str, str], LatencyWindow] = {}
+        self._timeouts: Dict[Tuple[str, str, str], int] = {}
+        # (mode, model) -> requests cut off in a row since the last completed one
+        self._streaks: Dict[Tuple[str, str], int] = {}
+
+    def read_timeout(self, mode: str, model: str, category: str) -> Optional[float]:
+        """
+        Read timeout for the next request, in seconds
+
+        Args:
+            mode: "generate" or "stream"
+            model: The model name
+            category: The claim's ClaimCategory value
+
+        Returns:
+            The timeout, or None to keep the HTTP client's default (disabled,
+            or too few samples for the category and the model)
+        """
+        if not self.enabled:
+            return None
+        for key in ((mode, model, category), (mode, model, ALL_CATEGORIES)):
+            window = self._latencies.get(key)
+            if window is not None and len(window) >= self.min_samples:
+                backoff = 2 ** self._streaks.get((mode, model), 0)
+                return min(self.ceiling, max(self.floor, self.multiplier * window.quantile(self.quantile)) * backoff)
+        return None
+
+    def record(self, mode: str, model: str, category: str, seconds: float):
+        """Record the latency of a completed request"""
+        for key in ((mode, model, category), (mode, model, ALL_CATEGORIES)):
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = LatencyWindow(self.window)
+            window.add(seconds)
+        self._streaks.pop((mode, model), None)
+
+    def record_timeout(self, mode: str, model: str, category: str):
+        """Record a request cut off by its read timeout (doubling the model's timeouts until one completes)"""
+        key = (mode, model, category)
+        self._timeouts[key] = self._timeouts.get(key, 0) + 1
+        # Capped so the backoff cannot overflow; the ceiling is reached long before
+        self._streaks[(mode, model)] = min(self._streaks.get((mode, model), 0) + 1, 16)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuration and, per mode, model and category, the samples, percentile and current timeout"""
+        timeouts = []
+        for (mode, model, category), window in sorted(self._latencies.items()):
+            read_timeout = self.read_timeout(mode, model, category)
+            timeouts.append({
+                "mode": mode,
+                "model": model,
+                "category": category,
+                "samples": len(window),
+                "quantile_ms": round(window.quantile(self.quantile) * 1000, 1),
+                "read_timeout_s": round(read_timeout, 2) if read_timeout is not None else None,
+                "timed_out": self._timeouts.get((mode, model, category), 0),
+                "consecutive_timeouts": self._streaks.get((mode, model), 0)
+            })
+        return {
+            "enabled": self.enabled,
+            "quantile": self.quantile,
+            "multiplier": self.multiplier,
+            "floor_s": self.floor,
+            "ceiling_s": self.ceiling,
+            "min_samples": self.min_samples,
+            "timeouts": timeouts
+        }
+
+
+# Global policy shared by all LLM calls
+llm_timeouts = AdaptiveTimeoutPolicy()
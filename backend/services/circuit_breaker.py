@@ -0,0 +1,134 @@
+"""
+Circuit Breaker
+
+When an LLM backend is overloaded or down, every request sent to it waits
+for a timeout or an error before falling back, which piles up connections
+and slows the backend's recovery. A circuit breaker watches the outcomes of
+recent requests and, once too many of them fail or time out, stops sending
+requests for a while ("open") so callers fail in microseconds instead. After
+the open period a few trial requests are let through ("half_open"): a
+success closes the breaker again, a failure re-opens it.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the circuit breakers are open"""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker driven by the failure rate of recent requests
+
+    Outcomes are "ok", "error" and "timeout"; None releases a trial slot
+    without a verdict (e.g. a cancelled request).
+    """
+
+    def __init__(self, name: str, failure_ratio: float = 0.5, min_requests: int = 5,
+                 window: float = 30.0, open_duration: float = 30.0, half_open_requests: int = 1):
+        """
+        Initialize a closed breaker
+
+        Args:
+            name: Name used in log messages (the backend URL)
+            failure_ratio: Share of errors and timeouts in the window that opens the breaker
+            min_requests: Requests in the window before the failure ratio is considered
+            window: Seconds of outcomes the failure ratio is computed over
+            open_duration: Seconds the breaker stays open before letting trial requests through
+            half_open_requests: Trial requests allowed at a time while half-open
+        """
+        self.name = name
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_requests = half_open_requests
+
+        self._state = "closed"
+        self._open_until = 0.0
+        self._trials = 0
+        # (monotonic time, failed) of the requests finished within the window
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._window_failures = 0
+        self._counters = {"errors": 0, "timeouts": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half_open" (an open breaker turns half-open once its open period is over)"""
+        if self._state == "open" and time.monotonic() >= self._open_until:
+            self._state = "half_open"
+            self._trials = 0
+            logger.info("⚡ Circuit breaker for %s half-open, letting a trial request through", self.name)
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (while half-open, this takes one of the trial slots)"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and self._trials < self.half_open_requests:
+            self._trials += 1
+            return True
+        return False
+
+    def record(self, outcome: Optional[str]):
+        """Record the outcome of a finished request"""
+        if outcome == "error":
+            self._counters["errors"] += 1
+        elif outcome == "timeout":
+            self._counters["timeouts"] += 1
+
+        state = self.state
+        if state == "half_open":
+            self._trials = max(0, self._trials - 1)
+            if outcome == "ok":
+                self._close()
+            elif outcome is not None:
+                logger.warning("⚡ Trial request to %s failed, circuit breaker re-opened for %.0fs", self.name, self.open_duration)
+                self._open()
+            return
+        if state == "open" or outcome is None:
+            # Requests sent before the breaker opened do not extend the open period
+            return
+
+        now = time.monotonic()
+        failed = outcome != "ok"
+        self._outcomes.append((now, failed))
+        self._window_failures += failed
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._window_failures -= self._outcomes.popleft()[1]
+
+        if failed and len(self._outcomes) >= self.min_requests and self._window_failures >= self.failure_ratio * len(self._outcomes):
+            logger.warning("⚡ Circuit breaker for %s opened: %d of the last %d requests failed, short-circuiting for %.0fs",
+                           self.name, self._window_failures, len(self._outcomes), self.open_duration)
+            self._open()
+
+    def _open(self):
+        self._state = "open"
+        self._open_until = time.monotonic() + self.open_duration
+        self._trials = 0
+        self._counters["opened"] += 1
+        # Once closed again, the failure rate starts from scratch
+        self._outcomes.clear()
+        self._window_failures = 0
+
+    def _close(self):
+        self._state = "closed"
+        logger.info("⚡ Circuit breaker for %s closed, backend recovered", self.name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state, recent failure rate and counters"""
+        state = self.state
+        return {
+            "state": state,
+            "open_for_s": round(max(0.0, self._open_until - time.monotonic()), 1) if state == "open" else 0.0,
+            "window_requests": len(self._outcomes),
+            "window_failures": self._window_failures,
+            **self._counters
+        }
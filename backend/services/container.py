@@ -0,0 +1,140 @@
+"""
+Service Container
+
+This module creates the heavy application services on first use instead of
+at import time. Importing Pathway alone takes over a second, so the API starts
+serving (health checks, history) immediately and the fact checker is built
+either by a background warm-up task started with the app or by the first
+request that needs it. Construction always runs in a worker thread, so a
+request waiting for a service never blocks the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Registry of lazily constructed singletons
+
+    Factories receive the container, so they can resolve the services they
+    depend on with get(). Each service is built at most once.
+    """
+
+    def __init__(self):
+        """Initialize an empty container"""
+        self.warm_up_enabled = os.getenv("SERVICE_WARMUP", "true").lower() == "true"
+
+        self._factories: Dict[str, Callable[["ServiceContainer"], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_ms: Dict[str, float] = {}
+        # One lock per service, so a slow factory does not delay unrelated services
+        self._locks: Dict[str, threading.Lock] = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self._warm_up_status = "not started"
+
+    def register(self, name: str, factory: Callable[["ServiceContainer"], Any]):
+        """Register the factory for a service"""
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """
+        Get a service, constructing it (and its dependencies) on first use
+
+        This can import heavy modules; from the event loop use aget() instead.
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name](self)
+                self._init_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+                logger.info("🧩 %s ready in %.0fms", name, self._init_ms[name])
+            return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        """Get a service, constructing it in a worker thread if needed"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        return await asyncio.to_thread(self.get, name)
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Get a service only if it has already been constructed"""
+        return self._instances.get(name)
+
+    def start_warm_up(self, *names: str):
+        """Construct services in the background, in order, on the running event loop"""
+        if not self.warm_up_enabled or self._warm_up_task is not None:
+            return
+        self._warm_up_task = asyncio.create_task(self._warm_up(names))
+
+    async def stop_warm_up(self):
+        """Cancel a warm-up that is still running"""
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+            await asyncio.gather(self._warm_up_task, return_exceptions=True)
+
+    async def _warm_up(self, names):
+        self._warm_up_status = "running"
+        try:
+            for name in names:
+                await self.aget(name)
+            self._warm_up_status = "done"
+        except asyncio.CancelledError:
+            self._warm_up_status = "cancelled"
+            raise
+        except Exception as e:
+            # The service will be retried by the first request that needs it
+            self._warm_up_status = "failed"
+            logger.exception("❌ Service warm-up failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Which services are constructed and how long each took"""
+        return {
+            "warm_up": self._warm_up_status if self.warm_up_enabled else "disabled",
+            "ready": sorted(self._instances),
+            "pending": sorted(set(self._factories) - set(self._instances)),
+            "init_ms": dict(self._init_ms)
+        }
+
+
+def _pathway_processor(container: ServiceContainer):
+    from .pathway_service import pathway_processor
+    return pathway_processor
+
+
+def _llama_service(container: ServiceContainer):
+    from .llama_service import llama_service
+    return llama_service
+
+
+def _fact_checker(container: ServiceContainer):
+    from .fact_checker import FactCheckerService
+    return FactCheckerService(
+        pathway_processor=container.get("pathway_processor"),
+        llama_service=container.get("llama_service")
+    )
+
+
+def create_container() -> ServiceContainer:
+    """Create a container with the application's services registered"""
+    container = ServiceContainer()
+    container.register("pathway_processor", _pathway_processor)
+    container.register("llama_service", _llama_service)
+    container.register("fact_checker", _fact_checker)
+    return container
+
+
+# Global container
+container = create_container()
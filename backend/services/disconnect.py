@@ -0,0 +1,96 @@
+"""
+Client Disconnect Detection
+
+A request handler that awaits a fact-check does not notice when its client
+goes away (a closed tab, a proxy timeout): the LLM keeps generating up to
+num_predict tokens for a response that can no longer be delivered. This
+module runs the handler's work alongside a watcher for the ASGI
+http.disconnect message and cancels the work as soon as the client is gone.
+The cancellation propagates through the single-flight group (only once no
+other caller is waiting for the same claim), frees the fair-queue slot and
+aborts the HTTP request to Ollama, which stops the generation.
+
+Streaming responses need no watcher: Starlette already cancels the stream
+when the client disconnects.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Dict, TypeVar
+
+from starlette.requests import Request
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client disconnected before the work finished"""
+
+
+class DisconnectGuard:
+    """Cancels request work when the client disconnects"""
+
+    def __init__(self):
+        """Initialize from environment configuration"""
+        self.enabled = os.getenv("CANCEL_ON_DISCONNECT", "true").lower() == "true"
+
+    async def run(self, request: Request, work: Awaitable[T]) -> T:
+        """
+        Await work, cancelling it if the client disconnects first
+
+        Args:
+            request: The request whose client is watched (its body must already be read)
+            work: Coroutine producing the response data
+
+        Returns:
+            The result of work
+
+        Raises:
+            ClientDisconnected: If the client went away; work has been cancelled
+        """
+        if not self.enabled:
+            return await work
+
+        task = asyncio.ensure_future(work)
+        watcher = asyncio.create_task(self._wait_for_disconnect(request))
+        try:
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+
+        if task.done():
+            return task.result()
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self.record_disconnect(request.url.path)
+        raise ClientDisconnected()
+
+    def record_disconnect(self, path: str):
+        """Count a request abandoned by its client"""
+        metrics.client_disconnects.inc(path)
+        logger.info("🔌 Client disconnected from %s, work cancelled", path)
+
+    @staticmethod
+    async def _wait_for_disconnect(request: Request):
+        """Return once the server reports that the client has gone"""
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Disconnect and LLM cancellation counters"""
+        return {
+            "enabled": self.enabled,
+            "client_disconnects": int(metrics.client_disconnects.total()),
+            "llm_generations_cancelled": int(metrics.llm_cancelled.total())
+        }
@@ -0,0 +1,210 @@
+"""
+Graceful Shutdown Drain
+
+When uvicorn receives SIGTERM it closes its listening socket at once and the
+container runtime kills the process after its grace period, which cuts off
+fact-checks in the middle of an LLM generation. This module puts a drain
+phase in front of that: the signal is intercepted and the API keeps running
+while new fact-check work (POST /check, /check/stream, /check/batch and
+/jobs) is refused with 503 and Retry-After, /health reports "draining" so
+load balancers stop routing here, and requests and background jobs already
+accepted are given until the drain deadline to finish. Only then is the
+signal handed to uvicorn for its normal shutdown.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Routes that start fact-check work; everything else is served while draining
+DRAINED_ROUTES = {("POST", "/check"), ("POST", "/check/stream"), ("POST", "/check/batch"), ("POST", "/jobs")}
+
+
+class DrainController:
+    """
+    Tracks in-flight fact-check work and drains it before shutdown
+
+    States: "serving", "draining" (refusing new work, waiting for in-flight
+    work) and "drained" (nothing left, or the deadline passed and the rest
+    was cancelled).
+    """
+
+    def __init__(self):
+        """Initialize the controller (signal handlers are installed with install_signal_handlers())"""
+        # Configuration - can be set via environment variables
+        self.timeout = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))
+        self.retry_after = int(os.getenv("SHUTDOWN_RETRY_AFTER", "5"))
+        self.poll_interval = 0.1
+
+        self.state = "serving"
+        self._requests: Set[asyncio.Task] = set()
+        self._abandoned: Set[asyncio.Task] = set()
+        self._sources: Dict[str, Callable[[], int]] = {}
+        self._drain_task: Optional[asyncio.Task] = None
+        self._started_at: Optional[str] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._in_flight_at_start = 0
+        self._counters = {"rejected": 0, "abandoned": 0}
+
+    @property
+    def draining(self) -> bool:
+        """Whether new work is being refused"""
+        return self.state != "serving"
+
+    def add_source(self, name: str, outstanding: Callable[[], int]):
+        """
+        Register other work to wait for (in-flight HTTP requests are tracked by DrainMiddleware)
+
+        Args:
+            name: Name reported in /health
+            outstanding: Callback returning the number of unfinished work items
+        """
+        self._sources[name] = outstanding
+
+    def in_flight(self) -> Dict[str, int]:
+        """Unfinished work by source"""
+        return {"requests": len(self._requests), **{name: outstanding() for name, outstanding in self._sources.items()}}
+
+    def install_signal_handlers(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """
+        Drain on the given signals, then pass them to the handler they replaced
+
+        Must be called from the running event loop, after the server has
+        installed its own handlers (i.e. from the startup event).
+        """
+        loop = asyncio.get_running_loop()
+        for sig in signals:
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+            try:
+                signal.signal(sig, functools.partial(self._handle_signal, loop, previous))
+            except ValueError:
+                # Not the main thread (e.g. an embedded test server); drain at shutdown only
+                logger.debug("Signal handlers not installed outside the main thread")
+                return
+
+    def _handle_signal(self, loop: asyncio.AbstractEventLoop, previous: Callable, signum: int, frame: Any):
+        if self._drain_task is not None:
+            # A second signal skips the rest of the drain
+            previous(signum, frame)
+            return
+        loop.call_soon_threadsafe(self._start_drain, previous, signum)
+
+    def _start_drain(self, previous: Callable, signum: int):
+        if self._drain_task is not None:
+            return
+        logger.info("🛑 Received %s, draining in-flight work (up to %.0fs)", signal.Signals(signum).name, self.timeout)
+
+        async def drain_then_exit():
+            await self.drain()
+            previous(signum, None)
+        self._drain_task = asyncio.create_task(drain_then_exit())
+
+    async def drain(self):
+        """
+        Refuse new work and wait for in-flight work until the deadline
+
+        Safe to call more than once; later calls wait for the same deadline.
+        """
+        if self._started is None:
+            self.state = "draining"
+            self._started = time.monotonic()
+            self._started_at = datetime.utcnow().isoformat()
+            self._in_flight_at_start = sum(self.in_flight().values())
+
+        deadline = self._started + self.timeout
+        while sum(self.in_flight().values()) and time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+
+        if self.state == "drained":
+            return
+
+        remaining = self.in_flight()
+        if sum(remaining.values()):
+            # Past the deadline: cancel what is left so the server can exit
+            self._counters["abandoned"] = sum(remaining.values())
+            logger.warning("⚠️ Drain deadline reached, abandoning %s", remaining)
+            for task in list(self._requests):
+                self._abandoned.add(task)
+                task.cancel()
+        self.state = "drained"
+        self._finished = time.monotonic()
+        logger.info("🛑 Drain finished in %.1fs", self._finished - self._started)
+
+    def reject(self, count: bool = True) -> JSONResponse:
+        """The response for new work arriving while draining (or abandoned at the deadline)"""
+        if count:
+            self._counters["rejected"] += 1
+        return JSONResponse(
+            {"detail": "Server is shutting down; retry the request"},
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after), "Connection": "close"}
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Drain state and progress for /health"""
+        elapsed = None
+        if self._started is not None:
+            elapsed = round((self._finished or time.monotonic()) - self._started, 2)
+        return {
+            "state": self.state,
+            "started_at": self._started_at,
+            "elapsed_s": elapsed,
+            "remaining_s": round(max(0.0, self.timeout - elapsed), 2) if elapsed is not None else None,
+            "in_flight_at_start": self._in_flight_at_start,
+            "in_flight": self.in_flight(),
+            **self._counters
+        }
+
+
+class DrainMiddleware:
+    """
+    ASGI middleware refusing new fact-check work while draining
+
+    Accepted work requests are tracked until their response (including a
+    streamed one) has been sent.
+    """
+
+    def __init__(self, app, controller: DrainController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in DRAINED_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        if self.controller.draining:
+            await self.controller.reject()(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        task = asyncio.current_task()
+        self.controller._requests.add(task)
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except asyncio.CancelledError:
+            if task not in self.controller._abandoned or response_started:
+                raise
+            # Cancelled at the drain deadline: tell the client to retry rather than answering 500
+            await self.controller.reject(count=False)(scope, receive, send)
+        finally:
+            self.controller._requests.discard(task)
@@ -5,15 +5,27 @@ This service orchestrates the entire fact-checking pipeline by combining
 Pathway preprocessing with LLaMA reasoning to analyze claims.
 """
 
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, AsyncIterator
+from datetime import datetime
+import asyncio
+import logging
+import os
 
 from models.memory_store import memory_store
-from models.database import ClaimResult
-from .pathway_service import pathway_processor
-from .llama_service import llama_service
+from .single_flight import SingleFlight
+from .verdict_cache import VerdictCache
+from .near_duplicate import MinHashLSHIndex
+from .rate_limiter import FairQueue, RateLimiter
+from .metrics import metrics
+from .timing import RequestTimings, current_timings
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+    from models.database import ClaimResult
+    from .llama_service import UniversalLLaMAService
+    from .pathway_service import PathwayProcessor
+
+logger = logging.getLogger(__name__)
 
 
 class FactCheckerService:
@@ -24,267 +36,333 @@ class FactCheckerService:
     comprehensive fact-checking results.
     """
     
-    def __init__(self):
-        """Initialize the fact checker service"""
+    def __init__(self, pathway_processor: Optional["PathwayProcessor"] = None, llama_service: Optional["UniversalLLaMAService"] = None):
+        """
+        Initialize the fact checker service
+        
+        Args:
+            pathway_processor: Claim preprocessor (defaults to the shared instance)
+            llama_service: LLM client (defaults to the shared instance)
+        """
+        if pathway_processor is None:
+            from .pathway_service import pathway_processor
+        if llama_service is None:
+            from .llama_service import llama_service
         self.pathway_processor = pathway_processor
         self.llama_service = llama_service
-        print("🔍 Fact Checker Service initialized")
+        
+        # Batch settings - can be set via environment variables
+        self.batch_max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+        self.batch_max_size = int(os.getenv("BATCH_MAX_SIZE", "500"))
+        
+        # Identical claims in flight at the same time share one analysis
+        self.single_flight = SingleFlight()
+        
+        # Recently verified claims are answered without going back to the LLM
+        self.verdict_cache = VerdictCache()
+        
+        # Rephrasings of verified claims reuse the earlier verdict
+        self.near_duplicate_index = MinHashLSHIndex()
+        
+        # LLM calls are dispatched fairly across clients
+        self.fair_queue = FairQueue()
+        logger.info("🔍 Fact Checker Service initialized")
     
-    async def check_fact(self, claim: str, session_id: Optional[str] = None) -> Dict:
+    async def check_fact(self, claim: str, session_id: Optional[str] = None, client_key: Optional[str] = None) -> Dict:
         """
         Complete fact-checking pipeline for a given claim
         
         Args:
             claim: The claim to fact-check
             session_id: Optional user session identifier
+            client_key: Client the LLM work is charged to (defaults to the session)
             
         Returns:
             Dict: The fact-check result
         """
         start_time = datetime.utcnow()
+        metrics.checks_in_flight.inc()
+        timings = RequestTimings()
+        timings_token = current_timings.set(timings)
         
         try:
-            print(f"🔍 Starting fact-check for: {claim[:50]}...")
+            logger.debug("🔍 Starting fact-check for: %.50s...", claim)
             
             # Step 1: Preprocess the claim using Pathway
-            print("📊 Preprocessing claim with Pathway...")
-            processed_claim = self.pathway_processor.preprocess_claim(claim)
-            
-            # Step 2: Create verification context
-            print("🔗 Creating verification context...")
-            verification_context = self.pathway_processor.create_verification_context(processed_claim)
+            logger.debug("📊 Preprocessing claim with Pathway...")
+            with metrics.time_stage("preprocess"):
+                processed_claim = self.pathway_processor.preprocess_claim(claim)
             
-            # Step 3: Analyze with LLaMA
-            print("🦙 Analyzing with LLaMA...")
-            analysis_result = await self.llama_service.analyze_claim(verification_context)
+            # Step 2: Reuse a cached verdict for this claim or a near-duplicate of it
+            cache_key = self.verdict_cache.make_key(processed_claim['normalized_claim'], self.llama_service.model_name)
+            with metrics.time_stage("cache_lookup"):
+                analysis_result, cache_info = self._lookup_cached_verdict(processed_claim, cache_key)
             
-            # Step 4: Calculate total processing time
-            end_time = datetime.utcnow()
-            total_processing_time = int((end_time - start_time).total_seconds() * 1000)
+            # Step 3: Otherwise analyze, sharing the work with identical claims already in flight
+            if analysis_result is None:
+                analysis_result = await self.single_flight.do(
+                    processed_claim['normalized_claim'],
+                    lambda: self._analyze_and_cache(processed_claim, cache_key, client_key or RateLimiter.client_key(session_id, None))
+                )
             
-            # Step 5: Create and save result to memory store
-            print("💾 Saving result to memory store...")
-            result = memory_store.add_result(
-                claim=claim.strip(),
-                verdict=analysis_result.get('verdict', 'Unverified'),
-                confidence_score=analysis_result.get('confidence_score', 0.0),
-                explanation=self._format_explanation(analysis_result),
-                processing_time_ms=total_processing_time,
-                sources=self._format_sources(analysis_result),
-                session_id=session_id
-            )
+            # Step 4: Create and save result to memory store
+            logger.debug("💾 Saving result to memory store...")
+            result = await self._store_result(claim, analysis_result, start_time, session_id, cache_info)
             
-            print(f"✅ Fact-check completed: {result['verdict']} ({result['confidence_score']}%)")
-            return result
+            logger.info("✅ Fact-check completed: %s (%s%%)", result['verdict'], result['confidence_score'])
+            return self._with_timings(result, timings, start_time)
             
         except Exception as e:
-            print(f"❌ Fact-check failed: {str(e)}")
-            
-            # Create error result
-            end_time = datetime.utcnow()
-            processing_time = int((end_time - start_time).total_seconds() * 1000)
-            
-            error_result = memory_store.add_result(
-                claim=claim.strip(),
-                verdict='Unverified',
-                confidence_score=0.0,
-                explanation=f"Fact-checking failed due to technical error: {str(e)}. Please try again later.",
-                processing_time_ms=processing_time,
-                session_id=session_id
-            )
-            
-            return error_result
+            logger.exception("❌ Fact-check failed: %s", e)
+            return self._with_timings(await self._store_error_result(claim, e, start_time, session_id), timings, start_time)
+        finally:
+            metrics.checks_in_flight.dec()
+            current_timings.reset(timings_token)
     
-    def _format_explanation(self, analysis_result: Dict[str, Any]) -> str:
-        """Format the analysis result into a comprehensive explanation"""
-        explanation = analysis_result.get('explanation', 'No explanation provided.')
-        
-        # Add key evidence if available
-        key_evidence = analysis_result.get('key_evidence', [])
-        if key_evidence:
-            explanation += "\n\nKey Evidence:\n"
-            for i, evidence in enumerate(key_evidence[:3], 1):  # Limit to 3 pieces of evidence
-                explanation += f"{i}. {evidence}\n"
-        
-        # Add reasoning steps if available
-        reasoning_steps = analysis_result.get('reasoning_steps', [])
-        if reasoning_steps:
-            explanation += "\nReasoning Process:\n"
-            for i, step in enumerate(reasoning_steps[:3], 1):  # Limit to 3 steps
-                explanation += f"{i}. {step}\n"
-        
-        # Add caveats if available
-        caveats = analysis_result.get('caveats', [])
-        if caveats:
-            explanation += "\nImportant Notes:\n"
-            for caveat in caveats[:2]:  # Limit to 2 caveats
-                explanation += f"• {caveat}\n"
+    async def _analyze(self, processed_claim: Dict[str, Any], client_key: str) -> Dict[str, Any]:
+        """Build the verification context and run LLaMA analysis for a preprocessed claim"""
+        logger.debug("🔗 Creating verification context...")
+        with metrics.time_stage("context"):
+            verification_context = self.pathway_processor.create_verification_context(processed_claim)
         
-        return explanation.strip()
+        logger.debug("🦙 Analyzing with LLaMA...")
+        async with self.fair_queue.slot(client_key):
+            return await self.llama_service.analyze_claim(
+                processed_claim['original_claim'],
+                verification_context
+            )
     
-    def _format_sources(self, analysis_result: Dict[str, Any]) -> Optional[str]:
-        """Format sources information as JSON string"""
-        sources_needed = analysis_result.get('sources_needed', [])
-        if sources_needed:
-            import json
-            return json.dumps({
-                'sources_needed': sources_needed,
-                'model_used': analysis_result.get('model_used', 'unknown')
-            })
-        return None
+    async def _analyze_and_cache(self, processed_claim: Dict[str, Any], cache_key: str, client_key: str) -> Dict[str, Any]:
+        """Analyze a claim and cache the result unless the analysis failed"""
+        analysis_result = await self._analyze(processed_claim, client_key)
+        self._cache_verdict(processed_claim, cache_key, analysis_result)
+        return analysis_result
     
-    async def test_services(self) -> Dict[str, Any]:
+    def _lookup_cached_verdict(self, processed_claim: Dict[str, Any], cache_key: str):
         """
-        Test all components of the fact-checking service
+        Find a reusable analysis for a claim
         
         Returns:
-            Dictionary with test results for each component
+            Tuple of (analysis result or None, cache info for the stored record)
         """
-        results = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'pathway_service': {'status': 'unknown'},
-            'llama_service': {'status': 'unknown'},
-            'overall_status': 'unknown'
-        }
+        analysis_result = self.verdict_cache.get(cache_key)
+        if analysis_result is not None:
+            logger.debug("⚡ Verdict cache hit")
+            metrics.cache_results.inc("exact")
+            return analysis_result, {'cache_hit': True, 'similarity_score': 1.0}
         
-        # Test Pathway preprocessing
-        try:
-            test_claim = "This is a test claim for service verification."
-            processed = self.pathway_processor.preprocess_claim(test_claim)
-            results['pathway_service'] = {
-                'status': 'working',
-                'test_claim': test_claim,
-                'entities_found': len(processed.get('entities', {})),
-                'claim_type': processed.get('claim_type', 'unknown')
-            }
-        except Exception as e:
-            results['pathway_service'] = {
-                'status': 'error',
-                'error': str(e)
+        match = self.near_duplicate_index.query(processed_claim, self.llama_service.model_name)
+        if match is not None:
+            logger.debug("⚡ Near-duplicate verdict reused (similarity %s)", match['similarity'])
+            metrics.cache_results.inc("near_duplicate")
+            return match['payload'], {
+                'cache_hit': True,
+                'similarity_score': match['similarity'],
+                'matched_claim': match['claim']
             }
         
-        # Test LLaMA service
-        try:
-            test_context = {
-                'claim_analysis': {
-                    'original_claim': 'Test claim for API check',
-                    'entities': {},
-                    'claim_type': 'test'
-                },
-                'verification_strategy': 'testing'
-            }
-            response = await self.llama_service._call_llama_api("Hello, this is a test")
-            results['llama_service'] = {
-                'status': 'connected' if response else 'error',
-                'api_url': self.llama_service.api_url,
-                'model': self.llama_service.model_name
-            }
-        except Exception as e:
-            results['llama_service'] = {
-                'status': 'error',
-                'error': str(e)
-            }
-        
-        # Determine overall status
-        pathway_ok = results['pathway_service']['status'] == 'working'
-        llama_ok = results['llama_service']['status'] == 'connected'
-        
-        if pathway_ok and llama_ok:
-            results['overall_status'] = 'healthy'
-        elif pathway_ok or llama_ok:
-            results['overall_status'] = 'partial'
-        else:
-            results['overall_status'] = 'error'
-        
-        return results
-
-from typing import Dict, List, Optional, Any
-from datetime import datetime
-
-from models.memory_store import memory_store
-from .pathway_service import pathway_processor
-from .llama_service import llama_service
-
-
-class FactCheckerService:
-    """
-    Main service class that orchestrates the complete fact-checking pipeline
+        metrics.cache_results.inc("miss")
+        return None, {'cache_hit': False}
     
-    This service combines Pathway preprocessing with LLaMA analysis to provide
-    comprehensive fact-checking results.
-    """
+    def _cache_verdict(self, processed_claim: Dict[str, Any], cache_key: str, analysis_result: Dict[str, Any]):
+        """Remember an analysis for exact and near-duplicate reuse"""
+        if not self._is_cacheable(analysis_result):
+            return
+        category = analysis_result.get('claim_category')
+        self.verdict_cache.put(cache_key, analysis_result, category)
+        self.near_duplicate_index.insert(
+            cache_key,
+            processed_claim,
+            analysis_result,
+            self.llama_service.model_name,
+            self.verdict_cache.ttl_for(category)
+        )
     
-    def __init__(self):
-        """Initialize the fact checker service"""
-        self.pathway_processor = pathway_processor
-        self.llama_service = llama_service
-        print("🔍 Fact Checker Service initialized")
+    def _is_cacheable(self, analysis_result: Dict[str, Any]) -> bool:
+        """Fallback responses from timeouts or errors must not be served from cache"""
+        return 'error_type' not in analysis_result and 'error' not in analysis_result
     
-    async def check_fact(self, claim: str, session_id: Optional[str] = None) -> Dict:
+    async def check_fact_stream(self, claim: str, session_id: Optional[str] = None, client_key: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
         """
-        Complete fact-checking pipeline for a given claim
+        Streaming fact-checking pipeline for a given claim
+        
+        Runs the same steps as check_fact but yields an event after each stage
+        ('preprocessed', 'categorized', 'generating', 'token', 'parsed', 'stored')
+        so clients see progress and partial LLM output while generation runs.
         
         Args:
             claim: The claim to fact-check
             session_id: Optional user session identifier
+            client_key: Client the LLM work is charged to (defaults to the session)
             
-        Returns:
-            Dict: The fact-check result
+        Yields:
+            Dicts with 'event' and 'data' keys; the 'stored' event carries the result
         """
         start_time = datetime.utcnow()
+        metrics.checks_in_flight.inc()
+        timings = RequestTimings()
+        timings_token = current_timings.set(timings)
         
         try:
-            print(f"🔍 Starting fact-check for: {claim[:50]}...")
-            
-            # Step 1: Preprocess the claim using Pathway
-            print("📊 Preprocessing claim with Pathway...")
-            processed_claim = self.pathway_processor.preprocess_claim(claim)
-            
-            # Step 2: Create verification context
-            print("🔗 Creating verification context...")
-            verification_context = self.pathway_processor.create_verification_context(processed_claim)
+            logger.debug("🔍 Starting streaming fact-check for: %.50s...", claim)
+            
+            with metrics.time_stage("preprocess"):
+                processed_claim = self.pathway_processor.preprocess_claim(claim)
+            with metrics.time_stage("context"):
+                verification_context = self.pathway_processor.create_verification_context(processed_claim)
+            yield {
+                "event": "preprocessed",
+                "data": {
+                    "claim_type": processed_claim.get('claim_type', 'general'),
+                    "key_terms": processed_claim.get('key_terms', []),
+                    "verification_strategy": verification_context.get('verification_strategy', '')
+                }
+            }
             
-            # Step 3: Analyze with LLaMA
-            print("🦙 Analyzing with LLaMA...")
-            analysis_result = await self.llama_service.analyze_claim(verification_context)
+            cache_key = self.verdict_cache.make_key(processed_claim['normalized_claim'], self.llama_service.model_name)
+            with metrics.time_stage("cache_lookup"):
+                analysis_result, cache_info = self._lookup_cached_verdict(processed_claim, cache_key)
+            
+            if analysis_result is None:
+                async with self.fair_queue.slot(client_key or RateLimiter.client_key(session_id, None)):
+                    async for event in self.llama_service.stream_claim_universal(
+                        processed_claim['original_claim'],
+                        verification_context
+                    ):
+                        if event["event"] == "parsed":
+                            analysis_result = event["data"]
+                        else:
+                            yield event
+                
+                if analysis_result is not None:
+                    self._cache_verdict(processed_claim, cache_key, analysis_result)
+            
+            analysis_result = analysis_result or {}
+            yield {
+                "event": "parsed",
+                "data": {
+                    "verdict": self.llama_service._normalize_verdict(analysis_result.get('verdict', 'Unverified')),
+                    "confidence_score": self._confidence_score(analysis_result.get('confidence_score')),
+                    **cache_info
+                }
+            }
             
+            result = await self._store_result(claim, analysis_result, start_time, session_id, cache_info)
+            logger.info("✅ Streaming fact-check completed: %s (%s%%)", result['verdict'], result['confidence_score'])
             
-            # Step 4: Calculate total processing time
+        except Exception as e:
+            logger.exception("❌ Streaming fact-check failed: %s", e)
+            result = await self._store_error_result(claim, e, start_time, session_id)
+        finally:
+            metrics.checks_in_flight.dec()
+            current_timings.reset(timings_token)
+        
+        yield {"event": "stored", "data": self._with_timings(result, timings, start_time)}
+    
+    async def _store_result(self, claim: str, analysis_result: Dict[str, Any], start_time: datetime, session_id: Optional[str], cache_info: Optional[Dict[str, Any]] = None) -> Dict:
+        """Save an analysis result to the memory store with its total processing time"""
+        verdict = self.llama_service._normalize_verdict(analysis_result.get('verdict', 'Unverified'))
+        with metrics.time_stage("store"):
             end_time = datetime.utcnow()
             total_processing_time = int((end_time - start_time).total_seconds() * 1000)
             
-            # Step 5: Create and save result to memory store
-            print("💾 Saving result to memory store...")
-            result = memory_store.add_result(
+            result = await memory_store.call(
+                memory_store.add_result,
                 claim=claim.strip(),
-                verdict=analysis_result.get('verdict', 'Unverified'),
-                confidence_score=analysis_result.get('confidence_score', 0.0),
+                verdict=verdict,
+                confidence_score=self._confidence_score(analysis_result.get('confidence_score')),
                 explanation=self._format_explanation(analysis_result),
                 processing_time_ms=total_processing_time,
                 sources=self._format_sources(analysis_result),
-                session_id=session_id
-            )
-            
-            print(f"✅ Fact-check completed: {result['verdict']} ({result['confidence_score']}%)")
-            return result
-            
-        except Exception as e:
-            print(f"❌ Fact-check failed: {str(e)}")
-            
-            # Create error result
-            end_time = datetime.utcnow()
-            processing_time = int((end_time - start_time).total_seconds() * 1000)
-            
-            error_result = memory_store.add_result(
-                claim=claim.strip(),
-                verdict='Unverified',
-                confidence_score=0.0,
-                explanation=f"Fact-checking failed due to technical error: {str(e)}. Please try again later.",
-                processing_time_ms=processing_time,
-                session_id=session_id
+                session_id=session_id,
+                **(cache_info or {})
             )
+        
+        metrics.check_duration.observe((end_time - start_time).total_seconds())
+        metrics.verdicts.inc(verdict)
+        metrics.categories.inc(analysis_result.get('claim_category', 'unknown'))
+        return result
+    
+    @staticmethod
+    def _confidence_score(value: Any) -> float:
+        """The model's confidence as a number in 0-100 (0 when it is missing or not a number)"""
+        try:
+            confidence = float(value)
+        except (TypeError, ValueError):
+            return 0.0
+        if confidence != confidence:
+            return 0.0
+        return min(100.0, max(0.0, confidence))
+    
+    def _with_timings(self, result: Dict, timings: RequestTimings, start_time: datetime) -> Dict:
+        """Attach the request's stage timings (in ms, plus the total) to a result copy"""
+        timings.add('total', (datetime.utcnow() - start_time).total_seconds())
+        return {**result, 'timings': timings.as_dict()}
+    
+    async def _store_error_result(self, claim: str, error: Exception, start_time: datetime, session_id: Optional[str]) -> Dict:
+        """Save an 'Unverified' result describing a pipeline failure"""
+        end_time = datetime.utcnow()
+        processing_time = int((end_time - start_time).total_seconds() * 1000)
+        metrics.pipeline_errors.inc()
+        metrics.check_duration.observe((end_time - start_time).total_seconds())
+        metrics.verdicts.inc('Unverified')
+        
+        return await memory_store.call(
+            memory_store.add_result,
+            claim=claim.strip(),
+            verdict='Unverified',
+            confidence_score=0.0,
+            explanation=f"Fact-checking failed due to technical error: {str(error)}. Please try again later.",
+            processing_time_ms=processing_time,
+            session_id=session_id
+        )
+    
+    async def check_batch(self, claims: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fact-check several claims concurrently under a concurrency cap
+        
+        Args:
+            claims: List of dicts with 'claim', optional 'session_id' and optional
+                'client_key' (the client each item's LLM work is charged to)
+            max_concurrency: Optional per-batch cap, bounded by the server limit
             
-            return error_result
+        Returns:
+            Dict with per-item outcomes in input order plus aggregate timing
+        """
+        concurrency = min(max_concurrency or self.batch_max_concurrency, self.batch_max_concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        start_time = datetime.utcnow()
+        
+        async def run_item(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await self.check_fact(
+                        claim=item['claim'],
+                        session_id=item.get('session_id'),
+                        client_key=item.get('client_key')
+                    )
+                    return {'index': index, 'status': 'ok', 'result': result}
+                except Exception as e:
+                    logger.error("❌ Batch item %d failed: %s", index, e)
+                    return {'index': index, 'status': 'error', 'error': str(e)}
+        
+        logger.info("📦 Starting batch fact-check for %d claims (concurrency %d)...", len(claims), concurrency)
+        items = await asyncio.gather(*(run_item(i, item) for i, item in enumerate(claims)))
+        
+        end_time = datetime.utcnow()
+        total_time = int((end_time - start_time).total_seconds() * 1000)
+        item_times = [
+            item['result']['processing_time_ms'] for item in items
+            if item['status'] == 'ok' and item['result'].get('processing_time_ms') is not None
+        ]
+        
+        logger.info("✅ Batch fact-check completed: %d claims in %dms", len(items), total_time)
+        return {
+            'items': items,
+            'concurrency': concurrency,
+            'total_time_ms': total_time,
+            'average_item_time_ms': sum(item_times) / len(item_times) if item_times else 0.0
+        }
     
     def _format_explanation(self, analysis_result: Dict[str, Any]) -> str:
         """Format the analysis result into a comprehensive explanation"""
@@ -324,7 +402,7 @@ class FactCheckerService:
             })
         return None
     
-    def get_statistics(self, db: Session) -> Dict[str, Any]:
+    def get_statistics(self, db: "Session") -> Dict[str, Any]:
         """
         Get fact-checking statistics
         
@@ -334,6 +412,9 @@ class FactCheckerService:
         Returns:
             Dictionary with statistics
         """
+        from sqlalchemy import func
+        from models.database import ClaimResult
+        
         try:
             # Total claims
             total_claims = db.query(ClaimResult).count()
@@ -368,7 +449,7 @@ class FactCheckerService:
             }
             
         except Exception as e:
-            print(f"❌ Error calculating statistics: {str(e)}")
+            logger.error("❌ Error calculating statistics: %s", e)
             return {
                 'total_claims': 0,
                 'true_claims': 0,
@@ -381,7 +462,7 @@ class FactCheckerService:
                 'error': str(e)
             }
     
-    def search_claims(self, db: Session, query: str, limit: int = 20) -> List[ClaimResult]:
+    def search_claims(self, db: "Session", query: str, limit: int = 20) -> List["ClaimResult"]:
         """
         Search for claims containing specific text
         
@@ -393,6 +474,9 @@ class FactCheckerService:
         Returns:
             List of matching ClaimResult objects
         """
+        from sqlalchemy import desc
+        from models.database import ClaimResult
+        
         try:
             results = db.query(ClaimResult)\
                        .filter(ClaimResult.claim.contains(query))\
@@ -403,7 +487,7 @@ class FactCheckerService:
             return results
             
         except Exception as e:
-            print(f"❌ Error searching claims: {str(e)}")
+            logger.error("❌ Error searching claims: %s", e)
             return []
     
     async def test_services(self) -> Dict[str, Any]:
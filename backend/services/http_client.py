@@ -0,0 +1,143 @@
+"""
+Pooled HTTP Client for LLM Calls
+
+Opening an httpx.AsyncClient per request costs a TCP connect per LLM call,
+with no keep-alive reuse and no limit on connections to Ollama. This module
+holds one application-scoped client with a bounded connection pool: it is
+opened at startup, closed at shutdown and shared by every call to Ollama.
+
+Requests are traced through httpcore's trace extension to count new and
+reused connections and to measure how long each request waited for a
+connection from the pool.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# The first event of a request tells whether it opened a connection or reused one
+_NEW_CONNECTION_EVENT = "connection.connect_tcp.started"
+_REUSED_CONNECTION_EVENTS = ("http11.send_request_headers.started", "http2.send_request_headers.started")
+
+
+class _RequestTrace:
+    """httpcore trace callback recording how one request obtained its connection"""
+
+    __slots__ = ("pool", "start", "acquired")
+
+    def __init__(self, pool: "PooledHTTPClient"):
+        self.pool = pool
+        self.start = time.perf_counter()
+        self.acquired = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]):
+        if self.acquired:
+            return
+        if event_name == _NEW_CONNECTION_EVENT:
+            self.acquired = True
+            self.pool._record_connection("new", time.perf_counter() - self.start)
+        elif event_name in _REUSED_CONNECTION_EVENTS:
+            self.acquired = True
+            self.pool._record_connection("reused", time.perf_counter() - self.start)
+
+
+class _TracingTransport(httpx.AsyncHTTPTransport):
+    """Transport attaching a _RequestTrace to every request"""
+
+    def __init__(self, pool: "PooledHTTPClient", **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["trace"] = _RequestTrace(self.pool)
+        return await super().handle_async_request(request)
+
+
+class PooledHTTPClient:
+    """
+    Application-scoped httpx.AsyncClient with a bounded, keep-alive connection pool
+
+    The client is opened by start() and closed by stop(); code running outside
+    the application (scripts, benchmarks) gets one opened on first use.
+    """
+
+    def __init__(self):
+        """Initialize the pool configuration (the client is opened with start())"""
+        # Configuration - can be set via environment variables
+        self.max_connections = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32"))
+        self.max_keepalive_connections = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "16"))
+        self.keepalive_expiry = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.timeout = httpx.Timeout(
+            connect=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+            read=float(os.getenv("LLM_READ_TIMEOUT", "45")),
+            write=float(os.getenv("LLM_WRITE_TIMEOUT", "10")),
+            pool=float(os.getenv("LLM_POOL_TIMEOUT", "10"))
+        )
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._connections = {"new": 0, "reused": 0}
+        self._pool_wait_total = 0.0
+        self._pool_wait_max = 0.0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, opened on first use if start() has not been called"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._open()
+        return self._client
+
+    async def start(self):
+        """Open the client"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._open()
+
+    async def stop(self):
+        """Close the client and its pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _open(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        logger.info("🔗 LLM HTTP pool opened (max %d connections, %d keep-alive)",
+                    self.max_connections, self.max_keepalive_connections)
+        return httpx.AsyncClient(timeout=self.timeout, transport=_TracingTransport(self, limits=limits))
+
+    def _record_connection(self, kind: str, pool_wait: float):
+        """Count how a request got its connection and how long it waited for it"""
+        self._connections[kind] += 1
+        self._pool_wait_total += pool_wait
+        self._pool_wait_max = max(self._pool_wait_max, pool_wait)
+        metrics.llm_http_connections.inc(kind)
+        metrics.llm_http_pool_wait.observe(pool_wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool configuration, connection reuse and pool wait times"""
+        requests = self._connections["new"] + self._connections["reused"]
+        return {
+            "open": self._client is not None and not self._client.is_closed,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry_s": self.keepalive_expiry,
+            "requests": requests,
+            "new_connections": self._connections["new"],
+            "reused_connections": self._connections["reused"],
+            "reuse_ratio": round(self._connections["reused"] / requests, 3) if requests else 0.0,
+            "average_pool_wait_ms": round(self._pool_wait_total / requests * 1000, 3) if requests else 0.0,
+            "max_pool_wait_ms": round(self._pool_wait_max * 1000, 3)
+        }
+
+
+# Global client shared by all calls to Ollama
+llm_http_client = PooledHTTPClient()
@@ -0,0 +1,357 @@
+"""
+Asynchronous Job Queue
+
+This module runs fact-checks in the background so long LLM generations do not
+hold HTTP connections open. Jobs are placed on a bounded asyncio queue and
+drained by a fixed-size pool of worker tasks that call
+FactCheckerService.check_fact.
+
+Callback URLs are client-supplied, so they are only POSTed to when they point
+at a public address (or a host on JOB_CALLBACK_ALLOWED_HOSTS); anything that
+names or resolves to loopback, private or link-local space is refused. The
+callback connects to the address that was checked, so a host that resolves
+differently the second time (DNS rebinding) cannot redirect it.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from logging_config import request_id_var
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+    def __init__(self, queue_depth: int, max_queue_size: int):
+        self.queue_depth = queue_depth
+        self.max_queue_size = max_queue_size
+        super().__init__(f"Job queue is full ({queue_depth}/{max_queue_size} jobs waiting)")
+
+
+class CallbackURLRejected(ValueError):
+    """Raised when a callback URL points somewhere the server must not POST to"""
+
+
+class JobQueue:
+    """
+    Bounded job queue with an in-process asyncio worker pool
+
+    Job records are kept in memory (bounded by JOB_HISTORY_SIZE) so that
+    clients can poll for status and results after submission.
+    """
+
+    def __init__(self, get_fact_checker: Callable[[], Awaitable[Any]]):
+        """
+        Initialize the job queue (workers are started with start())
+
+        Args:
+            get_fact_checker: Coroutine function returning the FactCheckerService,
+                resolved per job so the service is only built once a job runs
+        """
+        self.get_fact_checker = get_fact_checker
+
+        # Configuration - can be set via environment variables
+        self.num_workers = int(os.getenv("JOB_WORKERS", "4"))
+        self.max_queue_size = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+        self.max_jobs_retained = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+        self.callback_timeout_seconds = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10.0"))
+        self.callback_timeout = httpx.Timeout(self.callback_timeout_seconds)
+        self.callback_allowed_hosts = {
+            host.strip().lower()
+            for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",")
+            if host.strip()
+        }
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._callbacks: Set[asyncio.Task] = set()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._running = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        logger.info("📬 Job Queue initialized (%d workers, queue size %d)", self.num_workers, self.max_queue_size)
+
+    async def start(self):
+        """Create the queue and start the worker pool on the running event loop"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(self.num_workers)
+        ]
+
+    async def stop(self):
+        """Cancel the worker pool, giving pending callbacks up to JOB_CALLBACK_TIMEOUT to finish"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._callbacks:
+            _, pending = await asyncio.wait(self._callbacks, timeout=self.callback_timeout_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def outstanding(self) -> int:
+        """Number of accepted jobs that have not finished (queued or running)"""
+        return self.queue_depth + self._running
+
+    def submit(self, claim: str, session_id: Optional[str] = None, callback_url: Optional[str] = None, client_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Enqueue a claim for background fact-checking
+
+        Args:
+            claim: The claim to fact-check
+            session_id: Optional user session identifier
+            callback_url: Optional URL that receives the finished job via POST
+            client_key: Client the LLM work is charged to (defaults to the session)
+
+        Returns:
+            Dict: The new job record
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity
+            CallbackURLRejected: If callback_url is not an allowed target
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        if callback_url:
+            self.validate_callback_url(callback_url)
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "claim": claim,
+            "session_id": session_id,
+            "callback_url": callback_url,
+            "client_key": client_key,
+            "request_id": request_id_var.get(),
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "error": None,
+            "callback_status": None
+        }
+
+        try:
+            self._queue.put_nowait(job["job_id"])
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            raise JobQueueFullError(self._queue.qsize(), self.max_queue_size)
+
+        self._jobs[job["job_id"]] = job
+        self._counters["submitted"] += 1
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job record by ID
+
+        Args:
+            job_id: The ID returned by submit
+
+        Returns:
+            Optional[Dict]: The job if known, None otherwise
+        """
+        return self._jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, worker count and job counters"""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "workers": self.num_workers,
+            "running": self._running,
+            "callbacks_pending": len(self._callbacks),
+            **self._counters
+        }
+
+    async def _worker(self, worker_id: int):
+        """Drain the queue, running one fact-check at a time"""
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is None:
+                    continue
+
+                self._running += 1
+                job["status"] = "running"
+                job["started_at"] = datetime.utcnow().isoformat()
+                # Log the job's work under the ID of the request that submitted it
+                request_id_var.set(job["request_id"])
+
+                try:
+                    fact_checker_service = await self.get_fact_checker()
+                    job["result"] = await fact_checker_service.check_fact(
+                        claim=job["claim"],
+                        session_id=job["session_id"],
+                        client_key=job["client_key"]
+                    )
+                    job["status"] = "completed"
+                    self._counters["completed"] += 1
+                except Exception as e:
+                    logger.exception("❌ Job %s failed: %s", job_id, e)
+                    job["status"] = "failed"
+                    job["error"] = str(e)
+                    self._counters["failed"] += 1
+
+                job["completed_at"] = datetime.utcnow().isoformat()
+
+                if job["callback_url"]:
+                    # Deliver from its own task so a slow receiver does not hold this worker
+                    job["callback_status"] = "pending"
+                    task = asyncio.create_task(self._send_callback(job))
+                    self._callbacks.add(task)
+                    task.add_done_callback(self._callbacks.discard)
+            finally:
+                if job is not None:
+                    self._running -= 1
+                self._queue.task_done()
+
+    def validate_callback_url(self, url: str) -> str:
+        """
+        Check that a callback URL is an http(s) URL the server may POST to
+
+        Hosts on JOB_CALLBACK_ALLOWED_HOSTS are always accepted. Otherwise
+        localhost names and literal non-public IP addresses are refused;
+        hostnames are resolved and re-checked when the callback is sent, and
+        the callback is sent to the address that passed.
+
+        Args:
+            url: The client-supplied callback URL
+
+        Returns:
+            str: The host the URL points at
+
+        Raises:
+            CallbackURLRejected: If the URL must not be called
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        if parts.scheme not in ("http", "https") or not host:
+            raise CallbackURLRejected("Callback URL must be an absolute http(s) URL")
+        if self._host_allowed(host):
+            return host
+        if self.callback_allowed_hosts:
+            raise CallbackURLRejected(f"Callback host {host} is not on the allowlist")
+        if host == "localhost" or host.endswith(".localhost"):
+            raise CallbackURLRejected(f"Callback host {host} is not a public address")
+
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return host
+        if not address.is_global:
+            raise CallbackURLRejected(f"Callback host {host} is not a public address")
+        return host
+
+    def _host_allowed(self, host: str) -> bool:
+        """Whether a host (or a parent domain of it) is on the allowlist"""
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.callback_allowed_hosts)
+
+    async def _resolve_callback(self, url: str) -> Optional[str]:
+        """
+        Resolve a callback's host, refusing it if any address it resolves to is non-public
+
+        Returns:
+            Optional[str]: The address to connect to, or None for an allowlisted host (connected to by name)
+
+        Raises:
+            CallbackURLRejected: If the URL must not be called
+            OSError: If the host cannot be resolved
+        """
+        host = self.validate_callback_url(url)
+        if self._host_allowed(host):
+            return None
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port)
+        addresses = [ipaddress.ip_address(info[4][0].split("%", 1)[0]) for info in infos]
+        for address in addresses:
+            if not address.is_global:
+                raise CallbackURLRejected(f"Callback host {host} resolves to non-public address {address}")
+        if not addresses:
+            raise OSError(f"Callback host {host} did not resolve")
+        return str(addresses[0])
+
+    @staticmethod
+    def _pin_callback(url: str, address: Optional[str]) -> Tuple[httpx.URL, Dict[str, str], Dict[str, Any]]:
+        """
+        URL, headers and extensions that send a callback to a checked address
+
+        httpx would otherwise resolve the hostname again when connecting. The
+        hostname still goes in the Host header and, over TLS, is used for SNI
+        and certificate verification.
+        """
+        original = httpx.URL(url)
+        if address is None:
+            return original, {}, {}
+        headers = {"Host": original.netloc.decode("ascii")}
+        extensions = {"sni_hostname": original.raw_host.decode("ascii")} if original.scheme == "https" else {}
+        return original.copy_with(host=address), headers, extensions
+
+    async def _send_callback(self, job: Dict[str, Any]):
+        """POST the finished job to its callback URL"""
+        try:
+            address = await self._resolve_callback(job["callback_url"])
+        except CallbackURLRejected as e:
+            logger.warning("⚠️ Job %s callback refused: %s", job['job_id'], e)
+            job["callback_status"] = "refused"
+            return
+        except OSError as e:
+            logger.warning("⚠️ Job %s callback host lookup failed: %s", job['job_id'], e)
+            job["callback_status"] = "failed"
+            return
+
+        url, headers, extensions = self._pin_callback(job["callback_url"], address)
+        try:
+            # Redirects are not followed (httpx's default), so the checked address is the only one called
+            async with httpx.AsyncClient(timeout=self.callback_timeout) as client:
+                response = await client.post(
+                    url,
+                    headers=headers,
+                    extensions=extensions,
+                    json={
+                        "job_id": job["job_id"],
+                        "status": job["status"],
+                        "result": job["result"],
+                        "error": job["error"]
+                    }
+                )
+                job["callback_status"] = response.status_code
+        except Exception as e:
+            logger.warning("⚠️ Job %s callback failed: %s", job['job_id'], e)
+            job["callback_status"] = "failed"
+
+    def _trim_history(self):
+        """Drop the oldest finished jobs beyond the retention limit"""
+        excess = len(self._jobs) - self.max_jobs_retained
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs.keys()):
+            if excess <= 0:
+                break
+            if self._jobs[job_id]["status"] in ("completed", "failed"):
+                del self._jobs[job_id]
+                excess -= 1
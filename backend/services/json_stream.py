@@ -0,0 +1,164 @@
+"""
+Incremental JSON Parsing
+
+The model answers with a JSON object, but left alone it keeps generating
+after the closing brace (or, in Ollama's JSON mode, emits whitespace) until
+it reaches num_predict, and the whole output used to be regex-scanned for
+the object afterwards. This parser is fed the generation token by token and
+tracks the first top-level object as it is written, so the caller can stop
+generating as soon as the object is closed, or once the fields it needs
+are complete, and gets the parsed object without a second pass.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class IncrementalJSONParser:
+    """
+    Follows the first top-level JSON object in text fed piece by piece
+
+    Text before the object's opening brace is ignored. Only the structure
+    is tracked (nesting depth, strings and escapes, top-level keys), so
+    feeding a piece costs one pass over its characters; the object is
+    decoded once, by result().
+    """
+
+    __slots__ = ("stop_fields", "_pieces", "_length", "_depth", "_in_string", "_escape", "_expect_key",
+                 "_string_start", "_key", "_value_end", "completed_fields", "closed")
+
+    def __init__(self, stop_fields: Iterable[str] = ()):
+        """
+        Args:
+            stop_fields: Top-level fields after which the object counts as
+                done even if it is not closed yet (empty: wait for the close)
+        """
+        self.stop_fields: Set[str] = set(stop_fields)
+        # Text from the opening brace on
+        self._pieces: List[str] = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        # End offset of the last complete top-level value
+        self._value_end = 0
+        self.completed_fields: Set[str] = set()
+        self.closed = False
+
+    @property
+    def started(self) -> bool:
+        """Whether the object's opening brace has been seen"""
+        return self._length > 0
+
+    @property
+    def done(self) -> bool:
+        """Whether the object is closed, or every stop field is complete"""
+        return self.closed or (bool(self.stop_fields) and self.stop_fields <= self.completed_fields)
+
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next piece of generated text
+
+        Returns:
+            Whether the object is done (further text is ignored)
+        """
+        if self.done:
+            return True
+        if not self.started:
+            start = text.find("{")
+            if start < 0:
+                return False
+            text = text[start:]
+
+        offset = self._length
+        self._pieces.append(text)
+        self._length += len(text)
+        for index, char in enumerate(text):
+            position = offset + index
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._end_string(position)
+            elif char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    # A nested object or array value ended
+                    self._complete_value(position + 1)
+                elif self._depth == 0:
+                    self._complete_value(self._value_end if self._key is None else position)
+                    self._truncate(position + 1)
+                    self.closed = True
+                    return True
+            elif char == "," and self._depth == 1:
+                if self._key is not None:
+                    # A number, true, false or null value ended
+                    self._complete_value(position)
+                self._expect_key = True
+            if self.done:
+                return True
+        return False
+
+    def _end_string(self, position: int):
+        """A top-level string ended: a key, or a value"""
+        if self._expect_key:
+            self._key = json.loads(self._text()[self._string_start:position + 1])
+            self._expect_key = False
+        else:
+            self._complete_value(position + 1)
+
+    def _complete_value(self, end: int):
+        if self._key is not None:
+            self.completed_fields.add(self._key)
+            self._value_end = end
+            self._key = None
+
+    def _text(self) -> str:
+        if len(self._pieces) > 1:
+            self._pieces = ["".join(self._pieces)]
+        return self._pieces[0] if self._pieces else ""
+
+    def _truncate(self, end: int):
+        """Drop whatever followed the closing brace"""
+        self._pieces = [self._text()[:end]]
+        self._length = end
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """
+        The parsed object, or None if no complete object was seen
+
+        When the object is not closed but its stop fields are complete, the
+        fields up to the last complete one are returned.
+        """
+        if self.closed:
+            text = self._text()
+        elif self.done:
+            text = self._text()[:self._value_end] + "}"
+        else:
+            return None
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+
+def parse_first_object(text: str) -> Optional[Dict[str, Any]]:
+    """The first complete top-level JSON object in a text, ignoring anything around it"""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result()
@@ -10,20 +10,30 @@ import json
 import os
 import re
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
 import asyncio
+import time
 from datetime import datetime
 from enum import Enum
 import random
 
+from .adaptive_timeout import llm_timeouts
+from .circuit_breaker import CircuitOpenError
+from .llm_router import llm_router
+from .json_stream import IncrementalJSONParser, parse_first_object
+from .metrics import metrics
+from .prompt_builder import Prompt, prompt_builder, render_entities, render_settings
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
-try:
-    import ollama
-except ImportError:
-    print("⚠️ Ollama client not installed, using httpx fallback")
-    ollama = None
+
+def parse_keep_alive(raw: str) -> Any:
+    """Ollama keep_alive value: a number of seconds (negative keeps the model loaded forever) or a duration such as 30m"""
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
 
 
 class ClaimCategory(Enum):
@@ -64,6 +74,61 @@ class VerdictType(Enum):
     COMPLEX = "COMPLEX"
 
 
+# Analysis framework per category: (name, steps, closing instruction); other categories use GENERAL_FRAMEWORK.
+# The format line asks for the JSON and the requirements line carries the thresholds, so a closer
+# is only kept where it must survive trimming of the requirements (medical safety).
+ANALYSIS_FRAMEWORKS = {
+    ClaimCategory.SCIENTIFIC: ("SCIENTIFIC", [
+        "Evaluate the claim against current scientific consensus",
+        "Consider peer-reviewed research and methodology",
+        "Assess experimental evidence and reproducibility",
+        "Check for scientific validity and logical consistency",
+        "Consider uncertainty levels and confidence intervals"
+    ], ""),
+    ClaimCategory.MATHEMATICAL: ("MATHEMATICAL", [
+        "Verify mathematical accuracy through logical proof",
+        "Check computational correctness",
+        "Consider mathematical definitions and axioms",
+        "Validate through multiple mathematical approaches",
+        "Ensure logical consistency and completeness"
+    ], ""),
+    ClaimCategory.HISTORICAL: ("HISTORICAL", [
+        "Evaluate historical evidence and primary sources",
+        "Consider multiple historical perspectives and interpretations",
+        "Assess reliability of historical documentation",
+        "Check chronological accuracy and context",
+        "Consider historical consensus among scholars"
+    ], ""),
+    ClaimCategory.MEDICAL: ("MEDICAL", [
+        "Evaluate against current medical knowledge and guidelines",
+        "Consider clinical evidence and research studies",
+        "Assess safety implications and contraindications",
+        "Check regulatory approval status where relevant",
+        "Consider individual variation and context"
+    ], "CRITICAL: Medical claims require the highest confidence thresholds.")
+}
+GENERAL_FRAMEWORK = ("GENERAL", [
+    "Evaluate factual accuracy using reliable sources",
+    "Consider context and nuanced interpretations",
+    "Assess evidence quality and reliability",
+    "Check for logical consistency",
+    "Consider limitations and uncertainties"
+], "")
+
+# Response formats (the fields the verdict needs first, so generation can stop after them)
+# and guidelines of the universal and the structured fact-check prompt
+UNIVERSAL_RESPONSE_FORMAT = 'Respond with JSON: {"verdict": "True"|"False"|"Unverified", "confidence_score": 0-100, "explanation": "..."}'
+FACT_CHECK_RESPONSE_FORMAT = (
+    'Respond with JSON: {"verdict": "True"|"False"|"Unverified", "confidence_score": 0-100, '
+    '"explanation": "...", "key_evidence": [...], "sources_needed": [...], "reasoning_steps": [...], "caveats": [...]}'
+)
+FACT_CHECK_GUIDELINES = (
+    'GUIDELINES: Use "True" or "False" only if confident, otherwise "Unverified". '
+    "The confidence score reflects your certainty. Explain specifically, state the limits of your knowledge "
+    "and consider whether the information is date-sensitive."
+)
+
+
 class UniversalLLaMAService:
     """
     Universal LLaMA Service for Comprehensive Fact-Checking
@@ -75,8 +140,6 @@ class UniversalLLaMAService:
     def __init__(self):
         """Initialize the Universal LLaMA service"""
         # Configuration - can be set via environment variables
-        self.api_base_url = os.getenv("OLLAMA_API_URL", "http://localhost:11434")
-        self.api_url = f"{self.api_base_url}/api/generate"
         self.api_key = os.getenv("LLAMA_API_KEY")
         self.model_name = os.getenv("LLAMA_MODEL", "llama2")
         self.max_tokens = int(os.getenv("LLAMA_MAX_TOKENS", "800"))
@@ -85,16 +148,42 @@ class UniversalLLaMAService:
         # Enable demo mode when Ollama is not available
         self.demo_mode = os.getenv("DEMO_MODE", "true").lower() == "true"
         
-        # Timeout settings
-        self.timeout = httpx.Timeout(45.0)
+        # Requests are routed over the Ollama backends (OLLAMA_API_URLS, or OLLAMA_API_URL)
+        # through the shared connection pool, which holds the timeouts (LLM_CONNECT_TIMEOUT, ...)
+        self.router = llm_router
+        
+        # Per-request read timeouts learned from observed latencies per model and claim category
+        self.timeouts = llm_timeouts
+        
+        # Compact prompts within per-category token budgets (PROMPT_TOKEN_BUDGET, ...), with num_ctx sized to fit
+        self.prompts = prompt_builder
+        
+        # Structured output: Ollama's JSON mode, and generations read as a stream and stopped
+        # as soon as the JSON object closes or the fields the verdict needs are complete
+        self.json_format = os.getenv("LLM_JSON_FORMAT", "true").lower() == "true"
+        self.early_stop = os.getenv("LLM_EARLY_STOP", "true").lower() == "true"
+        self.early_stop_fields = [
+            field.strip()
+            for field in os.getenv("LLM_EARLY_STOP_FIELDS", "verdict,confidence_score,explanation").split(",")
+            if field.strip()
+        ]
+        
+        # Model residency: how long Ollama keeps the model loaded after each request,
+        # and how long a warm-up may take (loading a model can exceed the request timeout)
+        self.keep_alive = parse_keep_alive(os.getenv("LLAMA_KEEP_ALIVE", "30m"))
+        self.warmup_timeout = httpx.Timeout(float(os.getenv("LLAMA_WARMUP_TIMEOUT", "300")))
+        
+        # Monotonic time of the last request sent to Ollama (None before the first)
+        self.last_request_at: Optional[float] = None
         
         # Initialize category-specific configurations
         self._init_category_configs()
         
         if self.demo_mode:
-            print(f"🦙 Universal LLaMA Service initialized in DEMO MODE (intelligent mock responses)")
+            logger.info("🦙 Universal LLaMA Service initialized in DEMO MODE (intelligent mock responses)")
         else:
-            print(f"🦙 Universal LLaMA Service initialized with Ollama at {self.api_base_url}, model: {self.model_name}")
+            logger.info("🦙 Universal LLaMA Service initialized with Ollama at %s, model: %s",
+                        ", ".join(backend.url for backend in self.router.backends), self.model_name)
     
     def _init_category_configs(self):
         """Initialize specialized configurations for each claim category"""
@@ -193,51 +282,224 @@ class UniversalLLaMAService:
             context = {}
         
         # Step 1: Advanced claim categorization
-        claim_category, category_confidence = self._categorize_claim_advanced(claim, context)
+        with metrics.time_stage("categorize"):
+            claim_category, category_confidence = self._categorize_claim_advanced(claim, context)
         
         # Step 2: Get category-specific configuration
-        category_config = self.category_configs.get(claim_category, self.category_configs[ClaimCategory.GENERAL])
+        category_config = self.category_configs.get(claim_category, {})
         
         # Step 3: Generate specialized prompt
-        prompt = self._prepare_universal_prompt(claim, claim_category, context, category_config)
+        with metrics.time_stage("prompt"):
+            prompt = self._prepare_universal_prompt(claim, claim_category, context, category_config)
         
         if self.demo_mode:
             return self._generate_intelligent_demo_response(claim, claim_category, category_confidence)
         
+        if self.early_stop:
+            # Read the generation as a stream, so it can be stopped as soon as the verdict JSON is complete
+            result = None
+            async for event in self._generate_streamed(prompt, claim, claim_category, category_config, "generate"):
+                if event["event"] == "parsed":
+                    result = event["data"]
+            return result
+        
+        read_timeout = self.timeouts.read_timeout("generate", self.model_name, claim_category.value)
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                payload = {
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": self.temperature,
-                        "num_predict": self.max_tokens,
-                        "top_p": 0.9,
-                        "repeat_penalty": 1.1,
-                        "top_k": 40
-                    }
-                }
-                
-                response = await client.post(self.api_url, json=payload)
+            metrics.llm_requests.inc("generate")
+            self.last_request_at = time.monotonic()
+            payload = self._build_universal_payload(prompt, stream=False)
+            
+            start = time.perf_counter()
+            with metrics.time_stage("llm"):
+                response = await self.router.generate(payload, **self._request_timeout(read_timeout))
                 response.raise_for_status()
-                
-                result = response.json()
-                llama_response = result.get("response", "")
-                
-                # Parse with category-aware logic
+            self.timeouts.record("generate", self.model_name, claim_category.value, time.perf_counter() - start)
+            
+            result = response.json()
+            llama_response = result.get("response", "")
+            self.prompts.record(claim_category.value, prompt, result.get("prompt_eval_count"))
+            metrics.llm_generated_tokens.inc("generate", amount=result.get("eval_count") or 0)
+            
+            # Parse with category-aware logic
+            with metrics.time_stage("parse"):
                 return self._parse_universal_response(llama_response, claim, claim_category, category_config)
                 
-        except httpx.TimeoutException:
-            logger.error("Timeout calling Universal LLaMA API")
+        except asyncio.CancelledError:
+            # Nobody is waiting any more; the interrupted request's connection is closed, aborting the generation
+            metrics.llm_cancelled.inc("generate")
+            raise
+        except CircuitOpenError:
+            # Every backend is failing: answer at once instead of waiting for a timeout
+            return self._generate_intelligent_fallback_response(claim, claim_category, "circuit_open")
+        except httpx.TimeoutException as e:
+            self._record_timeout(e, "generate", claim_category)
+            logger.error("Timeout calling Universal LLaMA API (%s)", type(e).__name__)
             return self._generate_intelligent_fallback_response(claim, claim_category, "timeout")
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error calling Universal LLaMA API: {e}")
+            logger.error("HTTP error calling Universal LLaMA API: %s", e)
             return self._generate_intelligent_fallback_response(claim, claim_category, "http_error")
         except Exception as e:
-            logger.error(f"Unexpected error calling Universal LLaMA API: {e}")
+            logger.error("Unexpected error calling Universal LLaMA API: %s", e)
             return self._generate_intelligent_fallback_response(claim, claim_category, "unexpected_error")
     
+    async def stream_claim_universal(self, claim: str, context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of analyze_claim_universal
+        
+        Uses Ollama's streaming generate mode and yields events as they happen:
+        'categorized', 'generating', one 'token' per generated chunk and finally
+        'parsed' carrying the same analysis dict analyze_claim_universal returns.
+        
+        Args:
+            claim: The claim to analyze
+            context: Additional context from previous processing steps
+            
+        Yields:
+            Dicts with 'event' and 'data' keys
+        """
+        if context is None:
+            context = {}
+        
+        with metrics.time_stage("categorize"):
+            claim_category, category_confidence = self._categorize_claim_advanced(claim, context)
+        category_config = self.category_configs.get(claim_category, {})
+        yield {
+            "event": "categorized",
+            "data": {"category": claim_category.value, "category_confidence": category_confidence}
+        }
+        
+        with metrics.time_stage("prompt"):
+            prompt = self._prepare_universal_prompt(claim, claim_category, context, category_config)
+        yield {
+            "event": "generating",
+            "data": {"model": self.model_name if not self.demo_mode else "demo-llama", "prompt_tokens": prompt.tokens}
+        }
+        
+        if self.demo_mode:
+            result = self._generate_intelligent_demo_response(claim, claim_category, category_confidence)
+            for word in result["explanation"].split(" "):
+                yield {"event": "token", "data": {"text": word + " "}}
+                await asyncio.sleep(0)
+            yield {"event": "parsed", "data": result}
+            return
+        
+        async for event in self._generate_streamed(prompt, claim, claim_category, category_config, "stream"):
+            yield event
+    
+    async def _generate_streamed(self, prompt: Prompt, claim: str, claim_category: ClaimCategory,
+                                 category_config: Dict[str, Any], mode: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a generation from Ollama and parse its JSON as it arrives
+        
+        The generation is stopped (by closing the stream, which aborts it in
+        Ollama) as soon as the top-level JSON object closes or, with
+        LLM_EARLY_STOP_FIELDS, once those fields are complete.
+        
+        Args:
+            prompt: The prompt to send
+            claim: The claim being analyzed
+            claim_category: Its category
+            category_config: The category's configuration
+            mode: "stream" or "generate", for metrics
+            
+        Yields:
+            'token' events with the generated text, then 'parsed' with the
+            analysis (a fallback response if the LLM call failed)
+        """
+        chunks = []
+        parser = IncrementalJSONParser(self.early_stop_fields if self.early_stop else ())
+        read_timeout = self.timeouts.read_timeout("stream", self.model_name, claim_category.value)
+        try:
+            metrics.llm_requests.inc(mode)
+            self.last_request_at = time.monotonic()
+            payload = self._build_universal_payload(prompt, stream=True)
+            
+            # The read timeout bounds each wait for the next chunk, so learn the longest one
+            last_chunk_at = time.perf_counter()
+            longest_wait = 0.0
+            reported_tokens = None
+            with metrics.time_stage("llm"):
+                async with self.router.stream(payload, **self._request_timeout(read_timeout)) as response:
+                    response.raise_for_status()
+                    
+                    async for line in response.aiter_lines():
+                        now = time.perf_counter()
+                        longest_wait = max(longest_wait, now - last_chunk_at)
+                        last_chunk_at = now
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        text = chunk.get("response", "")
+                        if text:
+                            chunks.append(text)
+                            yield {"event": "token", "data": {"text": text}}
+                            if parser.feed(text) and self.early_stop:
+                                # Leaving the stream closes its connection, which stops the generation
+                                metrics.llm_early_stops.inc("object_closed" if parser.closed else "fields_complete")
+                                break
+                        if chunk.get("done"):
+                            # The final chunk carries Ollama's counts, including prompt_eval_count
+                            reported_tokens = chunk.get("prompt_eval_count")
+                            break
+            self.timeouts.record("stream", self.model_name, claim_category.value, longest_wait)
+            self.prompts.record(claim_category.value, prompt, reported_tokens)
+            # Ollama streams one token per chunk
+            metrics.llm_generated_tokens.inc(mode, amount=len(chunks))
+            
+            with metrics.time_stage("parse"):
+                result = self._parse_universal_response("".join(chunks), claim, claim_category, category_config, parser.result())
+            
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away mid-stream; closing the stream aborts the generation
+            metrics.llm_cancelled.inc(mode)
+            raise
+        except CircuitOpenError:
+            result = self._generate_intelligent_fallback_response(claim, claim_category, "circuit_open")
+        except httpx.TimeoutException as e:
+            self._record_timeout(e, "stream", claim_category)
+            logger.error("Timeout streaming from Universal LLaMA API (%s)", type(e).__name__)
+            result = self._generate_intelligent_fallback_response(claim, claim_category, "timeout")
+        except httpx.HTTPStatusError as e:
+            logger.error("HTTP error streaming from Universal LLaMA API: %s", e)
+            result = self._generate_intelligent_fallback_response(claim, claim_category, "http_error")
+        except Exception as e:
+            logger.error("Unexpected error streaming from Universal LLaMA API: %s", e)
+            result = self._generate_intelligent_fallback_response(claim, claim_category, "unexpected_error")
+        
+        yield {"event": "parsed", "data": result}
+    
+    def _request_timeout(self, read_timeout: Optional[float]) -> Dict[str, Any]:
+        """httpx arguments applying an adaptive read timeout (no arguments: the pool's default timeouts)"""
+        if read_timeout is None:
+            return {}
+        default = self.router.http_client.timeout
+        return {"timeout": httpx.Timeout(connect=default.connect, read=read_timeout, write=default.write, pool=default.pool)}
+    
+    def _record_timeout(self, error: httpx.TimeoutException, mode: str, category: ClaimCategory):
+        """Tell the timeout policy that a generation was cut off by its read timeout"""
+        if isinstance(error, httpx.ReadTimeout):
+            self.timeouts.record_timeout(mode, self.model_name, category.value)
+    
+    def _build_universal_payload(self, prompt: Prompt, stream: bool) -> Dict[str, Any]:
+        """Build the Ollama /api/generate payload for universal analysis"""
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt.text,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": self.temperature,
+                "num_predict": self.max_tokens,
+                "num_ctx": prompt.num_ctx,
+                "top_p": 0.9,
+                "repeat_penalty": 1.1,
+                "top_k": 40
+            }
+        }
+        if self.json_format:
+            payload["format"] = "json"
+        return payload
+    
     async def analyze_claim(self, verification_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze a claim using LLaMA reasoning
@@ -261,9 +523,9 @@ class UniversalLLaMAService:
             start_time = datetime.utcnow()
             
             if self.demo_mode:
-                llama_response = self._create_demo_response(original_claim, claim_type)
+                llama_response = await self._create_demo_response(original_claim, claim_type)
             else:
-                llama_response = await self._call_llama_api(prompt)
+                llama_response = await self._call_llama_api(prompt.text)
             
             end_time = datetime.utcnow()
             
@@ -277,126 +539,78 @@ class UniversalLLaMAService:
             return analysis_result
             
         except Exception as e:
-            print(f"❌ LLaMA analysis error: {str(e)}")
+            logger.error("❌ LLaMA analysis error: %s", e)
             return self._create_fallback_response(verification_context, str(e))
     
-    def _create_fact_check_prompt(self, verification_context: Dict[str, Any]) -> str:
+    def _create_fact_check_prompt(self, verification_context: Dict[str, Any]) -> Prompt:
         """Create a structured prompt for LLaMA fact-checking"""
         claim_analysis = verification_context.get('claim_analysis', {})
         claim = claim_analysis.get('original_claim', '')
         claim_type = claim_analysis.get('claim_type', 'general')
-        entities = claim_analysis.get('entities', {})
-        structure = claim_analysis.get('structure', {})
+        entities = render_entities(claim_analysis.get('entities', {}), claim)
+        structure = render_settings(claim_analysis.get('structure', {}))
         strategy = verification_context.get('verification_strategy', '')
         
-        prompt = f"""You are an expert fact-checker. Analyze the following claim and provide a structured response.
-
-CLAIM TO ANALYZE: "{claim}"
-
-CLAIM ANALYSIS:
-- Type: {claim_type}
-- Key entities: {json.dumps(entities, indent=2)}
-- Structure: {json.dumps(structure, indent=2)}
-- Verification strategy: {strategy}
-
-INSTRUCTIONS:
-1. Analyze the claim for factual accuracy
-2. Consider the specific type of claim and verification strategy
-3. Provide your assessment in the following JSON format:
-
-{{
-    "verdict": "True" | "False" | "Unverified",
-    "confidence_score": <number between 0-100>,
-    "explanation": "<detailed explanation of your reasoning>",
-    "key_evidence": ["<evidence point 1>", "<evidence point 2>", ...],
-    "sources_needed": ["<type of source 1>", "<type of source 2>", ...],
-    "reasoning_steps": ["<step 1>", "<step 2>", ...],
-    "caveats": ["<caveat 1>", "<caveat 2>", ...]
-}}
-
-IMPORTANT GUIDELINES:
-- Use "True" only if you're confident the claim is factually correct
-- Use "False" only if you're confident the claim is factually incorrect  
-- Use "Unverified" if you cannot determine accuracy with confidence
-- Confidence score should reflect your certainty (0-100)
-- Provide specific, detailed explanations
-- Be honest about limitations in your knowledge
-- Consider the date sensitivity of information
-
-Please analyze the claim now:"""
-
-        return prompt
+        return self.prompts.build([
+            ("role", "You are an expert fact-checker. Analyze the following claim and provide a structured response.", True),
+            ("claim", f'CLAIM TO ANALYZE: "{claim}"\nCLAIM TYPE: {claim_type}', True),
+            ("strategy", f"VERIFICATION STRATEGY: {strategy}" if strategy else "", False),
+            ("entities", f"KEY ENTITIES: {entities}" if entities else "", False),
+            ("structure", f"STRUCTURE: {structure}" if structure else "", False),
+            ("format", FACT_CHECK_RESPONSE_FORMAT, True),
+            ("guidelines", FACT_CHECK_GUIDELINES, False),
+            ("instructions", "Please analyze the claim now:", True)
+        ], claim_type, self.max_tokens)
     
     async def _call_llama_api(self, prompt: str) -> str:
         """Call the LLaMA API with the given prompt"""
         try:
-            # Try to use ollama-python client if available
-            if ollama is not None:
-                try:
-                    # Call ollama directly (non-async but cleaner)
-                    response = ollama.generate(
-                        model=self.model_name,
-                        prompt=prompt,
-                        options={
-                            "temperature": self.temperature,
-                            "num_predict": self.max_tokens,
-                        }
-                    )
-                    return response.get("response", "")
-                except Exception as e:
-                    print(f"⚠️ Ollama client error: {str(e)}, falling back to HTTP API")
-            
-            # Fallback to HTTP API
-            # Prepare the request payload (Ollama format)
+            # The synchronous ollama client would block the event loop for the whole
+            # generation; the pooled async HTTP client talks to the same API without blocking
             payload = {
                 "model": self.model_name,
                 "prompt": prompt,
                 "stream": False,
+                "keep_alive": self.keep_alive,
                 "options": {
                     "temperature": self.temperature,
                     "num_predict": self.max_tokens,
+                    "num_ctx": self.prompts.num_ctx(self.prompts.count(prompt), self.max_tokens)
                 }
             }
+            if self.json_format:
+                payload["format"] = "json"
             
             headers = {"Content-Type": "application/json"}
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.api_url,
-                    json=payload,
-                    headers=headers
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("response", "")
-                else:
-                    print(f"❌ LLaMA API error: {response.status_code} - {response.text}")
-                    return self._get_mock_response(prompt)
-                    
+            response = await self.router.generate(payload, headers=headers)
+            
+            if response.status_code == 200:
+                result = response.json()
+                return result.get("response", "")
+            else:
+                logger.error("❌ LLaMA API error: %s - %s", response.status_code, response.text)
+                return self._get_mock_response(prompt)
+            
+        except CircuitOpenError:
+            logger.warning("⚡ LLaMA API unavailable (circuit open) - using fallback")
+            return self._get_mock_response(prompt)
         except httpx.TimeoutException:
-            print("⏰ LLaMA API timeout - using fallback")
+            logger.warning("⏰ LLaMA API timeout - using fallback")
             return self._get_mock_response(prompt)
         except Exception as e:
-            print(f"❌ LLaMA API call failed: {str(e)}")
+            logger.error("❌ LLaMA API call failed: %s", e)
             return self._get_mock_response(prompt)
     
     def _parse_llama_response(self, response: str, original_claim: str) -> Dict[str, Any]:
         """Parse the LLaMA response into structured data"""
         try:
-            # Try to extract JSON from the response
-            response_clean = response.strip()
+            # The first JSON object in the response, ignoring any text around it
+            parsed = parse_first_object(response)
             
-            # Look for JSON block
-            json_start = response_clean.find('{')
-            json_end = response_clean.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_clean[json_start:json_end]
-                parsed = json.loads(json_str)
-                
+            if parsed is not None:
                 # Validate and normalize the response
                 return {
                     'verdict': self._normalize_verdict(parsed.get('verdict', 'Unverified')),
@@ -412,7 +626,7 @@ Please analyze the claim now:"""
                 raise ValueError("No valid JSON found in response")
                 
         except Exception as e:
-            print(f"⚠️ Failed to parse LLaMA response: {str(e)}")
+            logger.warning("⚠️ Failed to parse LLaMA response: %s", e)
             return self._parse_text_response(response, original_claim)
     
     def _parse_text_response(self, response: str, original_claim: str) -> Dict[str, Any]:
@@ -460,7 +674,7 @@ Please analyze the claim now:"""
     
     def _normalize_verdict(self, verdict: str) -> str:
         """Normalize verdict to standard format"""
-        verdict_lower = verdict.lower().strip()
+        verdict_lower = verdict.lower().strip().replace('_', ' ')
         
         if verdict_lower in ['true', 'correct', 'accurate', 'yes', 'confirmed', 'factually correct']:
             return 'True'
@@ -512,6 +726,47 @@ Please analyze the claim now:"""
             'error': error_message
         }
     
+    async def warm_up(self) -> Dict[str, Any]:
+        """
+        Load the model into the memory of every available Ollama backend with a one-token generation
+        
+        Also resets the model's keep_alive timer, so calling it periodically
+        keeps an idle model resident.
+        
+        Returns:
+            The final response object of the slowest load (load_duration etc. in nanoseconds)
+            
+        Raises:
+            httpx.HTTPError: If a backend is unreachable or cannot load the model
+        """
+        payload = {
+            "model": self.model_name,
+            "prompt": "Hi",
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            # The context window requests use, so the first request does not reload the model
+            "options": {"num_predict": 1, "num_ctx": self.prompts.min_num_ctx}
+        }
+        responses = await self.router.each_backend("POST", "/api/generate", json=payload, timeout=self.warmup_timeout)
+        results = []
+        for response in responses:
+            response.raise_for_status()
+            results.append(response.json())
+        return max(results, key=lambda result: result.get("load_duration") or 0)
+    
+    async def resident_models(self) -> List[str]:
+        """Names of the models every available Ollama backend currently holds in memory (GET /api/ps)"""
+        resident = None
+        for response in await self.router.each_backend("GET", "/api/ps"):
+            response.raise_for_status()
+            names = {model.get("name", "") for model in response.json().get("models", [])}
+            resident = names if resident is None else resident & names
+        return sorted(resident or ())
+    
+    def is_model_name(self, name: str) -> bool:
+        """Whether a name reported by Ollama refers to the configured model (an untagged name means :latest)"""
+        return name == self.model_name or (":" not in self.model_name and name == f"{self.model_name}:latest")
+    
     async def test_connection(self) -> Dict[str, Any]:
         """Test the connection to LLaMA service"""
         try:
@@ -538,10 +793,9 @@ Please analyze the claim now:"""
                 'response_time_ms': 0
             }
     
-    def _create_demo_response(self, claim: str, claim_type: str) -> str:
+    async def _create_demo_response(self, claim: str, claim_type: str) -> str:
         """Create a detailed demo response when Ollama is not available"""
-        import time
-        time.sleep(1.5)  # Simulate thorough processing time
+        await asyncio.sleep(1.5)  # Simulate thorough processing time without blocking other requests
         
         # Analyze the claim for detailed demo response
         claim_lower = claim.lower()
@@ -739,75 +993,20 @@ Please analyze the claim now:"""
     "caveats": ["Limited by demo mode constraints", "Requires comprehensive source verification", "May need expert consultation"]
 }}"""
     
-    def _prepare_universal_prompt(self, claim: str, category: ClaimCategory, context: Dict[str, Any], config: Dict[str, Any]) -> str:
-        """Generate category-specific prompts for optimal analysis"""
-        base_context = f"""You are a world-class fact-checking expert specializing in {category.value} claims. 
-Your task is to analyze the following claim with the highest standards of accuracy and provide comprehensive analysis.
-
-CLAIM TO ANALYZE: "{claim}"
-CLAIM CATEGORY: {category.value}
-ANALYSIS REQUIREMENTS: {config}
-"""
+    def _prepare_universal_prompt(self, claim: str, category: ClaimCategory, context: Dict[str, Any], config: Dict[str, Any]) -> Prompt:
+        """Generate the category-specific prompt, within the category's token budget"""
+        name, steps, closing = ANALYSIS_FRAMEWORKS.get(category, GENERAL_FRAMEWORK)
+        requirements = render_settings(config)
+        framework = "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
         
-        if category == ClaimCategory.SCIENTIFIC:
-            return f"""{base_context}
-
-SCIENTIFIC ANALYSIS FRAMEWORK:
-1. Evaluate the claim against current scientific consensus
-2. Consider peer-reviewed research and methodology
-3. Assess experimental evidence and reproducibility
-4. Check for scientific validity and logical consistency
-5. Consider uncertainty levels and confidence intervals
-
-Provide analysis in JSON format with high scientific rigor."""
-
-        elif category == ClaimCategory.MATHEMATICAL:
-            return f"""{base_context}
-
-MATHEMATICAL ANALYSIS FRAMEWORK:
-1. Verify mathematical accuracy through logical proof
-2. Check computational correctness
-3. Consider mathematical definitions and axioms
-4. Validate through multiple mathematical approaches
-5. Ensure logical consistency and completeness
-
-Mathematical claims require near-absolute certainty. Provide JSON analysis with mathematical precision."""
-
-        elif category == ClaimCategory.HISTORICAL:
-            return f"""{base_context}
-
-HISTORICAL ANALYSIS FRAMEWORK:
-1. Evaluate historical evidence and primary sources
-2. Consider multiple historical perspectives and interpretations
-3. Assess reliability of historical documentation
-4. Check chronological accuracy and context
-5. Consider historical consensus among scholars
-
-Provide historically contextualized JSON analysis with attention to source reliability."""
-
-        elif category == ClaimCategory.MEDICAL:
-            return f"""{base_context}
-
-MEDICAL ANALYSIS FRAMEWORK:
-1. Evaluate against current medical knowledge and guidelines
-2. Consider clinical evidence and research studies
-3. Assess safety implications and contraindications
-4. Check regulatory approval status where relevant
-5. Consider individual variation and context
-
-CRITICAL: Medical claims require highest confidence thresholds due to health implications."""
-
-        else:
-            return f"""{base_context}
-
-GENERAL ANALYSIS FRAMEWORK:
-1. Evaluate factual accuracy using reliable sources
-2. Consider context and nuanced interpretations
-3. Assess evidence quality and reliability
-4. Check for logical consistency
-5. Consider limitations and uncertainties
-
-Provide comprehensive JSON analysis appropriate for this claim type."""
+        return self.prompts.build([
+            ("role", f"You are a world-class fact-checking expert specializing in {category.value} claims.", True),
+            ("claim", f'CLAIM TO ANALYZE: "{claim}"', True),
+            ("requirements", f"ANALYSIS REQUIREMENTS: {requirements}" if requirements else "", False),
+            ("framework", f"{name} ANALYSIS FRAMEWORK:\n{framework}", False),
+            ("format", UNIVERSAL_RESPONSE_FORMAT, True),
+            ("instructions", closing, True)
+        ], category.value, self.max_tokens)
 
     def _generate_intelligent_demo_response(self, claim: str, category: ClaimCategory, category_confidence: float) -> Dict[str, Any]:
         """Generate intelligent demo responses based on claim category"""
@@ -889,6 +1088,7 @@ Provide comprehensive JSON analysis appropriate for this claim type."""
 
     def _generate_intelligent_fallback_response(self, claim: str, category: ClaimCategory, error_type: str) -> Dict[str, Any]:
         """Generate intelligent fallback responses when API fails"""
+        metrics.llm_errors.inc(error_type)
         return {
             "verdict": VerdictType.UNVERIFIED.value,
             "confidence_score": 30.0,
@@ -911,14 +1111,12 @@ Provide comprehensive JSON analysis appropriate for this claim type."""
             "caveats": [f"Analysis incomplete due to {error_type}", "Requires retry or manual verification"]
         }
 
-    def _parse_universal_response(self, llama_response: str, claim: str, category: ClaimCategory, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse LLaMA response with category-aware logic"""
+    def _parse_universal_response(self, llama_response: str, claim: str, category: ClaimCategory, config: Dict[str, Any],
+                                  parsed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parse LLaMA response with category-aware logic (parsed: the JSON object, if already parsed while streaming)"""
         try:
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{.*\}', llama_response, re.DOTALL)
-            if json_match:
-                response_dict = json.loads(json_match.group())
-            else:
+            response_dict = parsed if parsed is not None else parse_first_object(llama_response)
+            if response_dict is None:
                 # Fallback parsing for non-JSON responses
                 response_dict = self._extract_structured_info(llama_response)
             
@@ -940,7 +1138,7 @@ Provide comprehensive JSON analysis appropriate for this claim type."""
             return response_dict
             
         except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Error parsing LLaMA response: {e}")
+            logger.error("Error parsing LLaMA response: %s", e)
             return self._generate_intelligent_fallback_response(claim, category, "parsing_error")
 
     def _adjust_confidence_by_category(self, confidence: float, category: ClaimCategory, config: Dict[str, Any]) -> float:
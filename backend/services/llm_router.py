@@ -0,0 +1,606 @@
+"""
+LLM Backend Router
+
+With a single OLLAMA_API_URL every generation queues on one Ollama instance,
+however many are running. This module spreads generations over a list of
+backends: each request goes to the healthy backend with the fewest requests
+outstanding, and a background probe takes unreachable backends out of
+rotation (and puts them back once they answer again).
+
+Each backend has a circuit breaker. When too many of a backend's recent
+requests failed or timed out its breaker opens and no requests are sent to
+it; when every breaker is open, requests fail at once with CircuitOpenError
+instead of waiting for a timeout. Transient failures (connection errors,
+502/503/504) are retried on another backend after a jittered backoff, within
+a retry budget so retries cannot amplify an outage.
+
+Optionally, a generation that takes longer than the observed p95 latency is
+hedged: the same request is sent to a second backend, the first successful
+response is used and the other request is cancelled (which aborts its
+generation). Non-streaming generations are hedged on their total latency and
+streams on the time to their first chunk; the stream that produces a chunk
+first is used and the other is closed. Hedges are capped at a fraction of all
+requests so a slow cluster is not loaded with duplicates.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from .adaptive_timeout import LatencyWindow
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .http_client import PooledHTTPClient, llm_http_client
+from .metrics import metrics
+from .retry_budget import RetryBudget, jittered_backoff
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying on another backend: the request did not reach a
+# working backend, or the backend said it is temporarily unable to serve it
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+RETRYABLE_STATUSES = {502, 503, 504}
+
+
+def parse_backend_urls(raw: str) -> List[str]:
+    """Backend base URLs from a comma-separated list (whitespace and trailing slashes ignored, duplicates dropped)"""
+    urls: List[str] = []
+    for url in raw.split(","):
+        url = url.strip().rstrip("/")
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def outcome_of(error: BaseException) -> Optional[str]:
+    """Circuit breaker outcome of a failed request ("timeout", "error"), or None if the backend is not to blame"""
+    if isinstance(error, httpx.PoolTimeout):
+        # Waiting for a connection from our own pool says nothing about the backend
+        return None
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "error"
+    return None
+
+
+class PrefetchedStream:
+    """
+    A streaming response whose first line was read ahead, to time it or race it against a hedge
+
+    Attributes are those of the response, except that aiter_lines() replays
+    the line read ahead before the rest of the stream.
+    """
+
+    def __init__(self, response: httpx.Response, backend: "LLMBackend"):
+        self.response = response
+        self.backend = backend
+        self._lines = response.aiter_lines()
+        self._buffered: List[str] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+    async def prefetch(self):
+        """Read the first line (a stream that ends at once has none)"""
+        try:
+            self._buffered.append(await self._lines.__anext__())
+        except StopAsyncIteration:
+            pass
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        while self._buffered:
+            yield self._buffered.pop(0)
+        async for line in self._lines:
+            yield line
+
+
+class LLMBackend:
+    """Routing state of one Ollama instance"""
+
+    __slots__ = ("url", "breaker", "outstanding", "healthy", "requests", "failures", "last_probe_at", "last_error")
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.outstanding = 0
+        # Assumed healthy until a probe says otherwise
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.last_probe_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether new requests may be routed here"""
+        return self.healthy and self.breaker.state != "open"
+
+
+class LLMRouter:
+    """
+    Routes requests to Ollama over one or more backends
+
+    Requests are sent through the shared pooled HTTP client. Health probing
+    starts with the first routed request, so an instance that never calls
+    Ollama (demo mode) never probes it.
+    """
+
+    def __init__(self, http_client: PooledHTTPClient = llm_http_client):
+        """Initialize the router from environment configuration"""
+        self.http_client = http_client
+
+        # Configuration - can be set via environment variables
+        urls = os.getenv("OLLAMA_API_URLS") or os.getenv("OLLAMA_API_URL", "http://localhost:11434")
+        self.probe_interval = float(os.getenv("LLM_PROBE_INTERVAL", "10"))
+        self.probe_timeout = float(os.getenv("LLM_PROBE_TIMEOUT", "2"))
+        self.hedge_enabled = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_quantile = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+        self.hedge_min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_max_ratio = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))
+        self.retry_max = int(os.getenv("LLM_RETRY_MAX", "2"))
+        self.retry_base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY_MS", "100")) / 1000
+        self.retry_max_delay = float(os.getenv("LLM_RETRY_MAX_DELAY_MS", "1000")) / 1000
+        self.retry_budget = RetryBudget(
+            ratio=float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.2")),
+            min_per_second=float(os.getenv("LLM_RETRY_BUDGET_MIN_PER_SEC", "1")),
+            window=float(os.getenv("LLM_RETRY_BUDGET_WINDOW", "10"))
+        )
+        breaker_config = {
+            "failure_ratio": float(os.getenv("LLM_BREAKER_FAILURE_RATIO", "0.5")),
+            "min_requests": int(os.getenv("LLM_BREAKER_MIN_REQUESTS", "5")),
+            "window": float(os.getenv("LLM_BREAKER_WINDOW", "30")),
+            "open_duration": float(os.getenv("LLM_BREAKER_OPEN_DURATION", "30")),
+            "half_open_requests": int(os.getenv("LLM_BREAKER_HALF_OPEN_REQUESTS", "1"))
+        }
+        self.backends = [LLMBackend(url, CircuitBreaker(url, **breaker_config)) for url in parse_backend_urls(urls)]
+
+        self._probe_task: Optional[asyncio.Task] = None
+        # Latencies of recent successful generations and times to the first
+        # chunk of recent streams, for the hedging delays
+        self._latencies = LatencyWindow(int(os.getenv("LLM_HEDGE_WINDOW", "200")))
+        self._first_chunk_latencies = LatencyWindow(int(os.getenv("LLM_HEDGE_WINDOW", "200")))
+        self._generations = 0
+        self._hedges = {"sent": 0, "won": 0}
+        self._short_circuited = 0
+
+    async def stop(self):
+        """Stop health probing"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    def pick(self, exclude: Iterable[LLMBackend] = ()) -> Optional[LLMBackend]:
+        """
+        The backend for the next request, taking a trial slot if its breaker is half-open
+
+        Healthy backends come first, then those with the fewest outstanding
+        requests, then those with the fewest requests overall. A backend that
+        failed its probe is still used when no healthy one is left; the
+        circuit breakers decide whether a request is sent at all.
+
+        Args:
+            exclude: Backends not to pick (e.g. ones the request already failed on)
+
+        Returns:
+            The backend, or None if no backend's breaker lets the request through
+        """
+        candidates = sorted(
+            (backend for backend in self.backends if backend not in exclude),
+            key=lambda backend: (not backend.healthy, backend.outstanding, backend.requests)
+        )
+        for backend in candidates:
+            if backend.breaker.allow():
+                return backend
+        return None
+
+    async def generate(self, payload: Dict[str, Any], **kwargs) -> httpx.Response:
+        """
+        POST a non-streaming /api/generate request, retrying transient failures and hedging when enabled
+
+        Args:
+            payload: The generate request body
+            **kwargs: Passed to httpx (headers, timeout)
+
+        Returns:
+            The first non-5xx response, or the last failed one
+
+        Raises:
+            CircuitOpenError: If every backend's circuit breaker is open
+            httpx.HTTPError: If the request failed on every attempt
+        """
+        self._ensure_probing()
+        self._generations += 1
+        return await self._with_retries(lambda backend: self._generate_on(backend, payload, kwargs))
+
+    @asynccontextmanager
+    async def stream(self, payload: Dict[str, Any], **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Stream a /api/generate request from the least loaded backend
+
+        Opening the stream is retried like generate(). With hedging enabled,
+        the first chunk is read ahead (see PrefetchedStream), and a stream
+        whose first chunk has not arrived after the hedge delay is opened on
+        a second backend as well; whichever produces a chunk first is used.
+
+        Args:
+            payload: The generate request body (with "stream": true)
+            **kwargs: Passed to httpx (headers, timeout)
+
+        Yields:
+            The streaming response
+
+        Raises:
+            CircuitOpenError: If every backend's circuit breaker is open
+        """
+        self._ensure_probing()
+        self._generations += 1
+        if self.hedge_enabled and len(self.backends) > 1:
+            response = await self._race_streams(payload, kwargs)
+            backend = response.backend
+        else:
+            response, backend = await self._open_stream(payload, kwargs)
+
+        outcome, error = "ok", None
+        try:
+            yield response
+        except httpx.TransportError as e:
+            # Raised while reading the body, e.g. a read timeout mid-generation
+            outcome, error = outcome_of(e), f"{type(e).__name__}: {e}"
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # The caller went away; that says nothing about the backend
+            outcome = None
+            raise
+        finally:
+            await self._close_stream(backend, response, outcome, error)
+
+    async def each_backend(self, method: str, path: str, **kwargs) -> List[httpx.Response]:
+        """
+        Send the same request to every available backend concurrently (model warm-up and residency checks)
+
+        Args:
+            method: HTTP method
+            path: Path on the backend, e.g. "/api/ps"
+            **kwargs: Passed to httpx (json, timeout)
+
+        Returns:
+            One response per available backend
+
+        Raises:
+            CircuitOpenError: If every backend's circuit breaker is open
+            httpx.HTTPError: If any of the requests failed
+        """
+        self._ensure_probing()
+        backends = ([backend for backend in self.backends if backend.available]
+                    or [backend for backend in self.backends if backend.breaker.state != "open"])
+        if not backends:
+            raise CircuitOpenError("All LLM backends are unavailable (circuit breakers open)")
+        client = self.http_client.client
+        return list(await asyncio.gather(*(
+            self._dispatch(backend, client.request(method, f"{backend.url}{path}", **kwargs)) for backend in backends
+        )))
+
+    async def _with_retries(self, send: Callable[[LLMBackend], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Send a request, retrying transient failures on another backend within the retry budget"""
+        self.retry_budget.record_request()
+        tried: List[LLMBackend] = []
+        failure = None
+        for attempt in range(self.retry_max + 1):
+            if attempt:
+                if not self.retry_budget.try_acquire():
+                    metrics.llm_retries.inc("budget_exhausted")
+                    break
+                await asyncio.sleep(jittered_backoff(attempt, self.retry_base_delay, self.retry_max_delay))
+
+            backend = self.pick(exclude=tried) or self.pick()
+            if backend is None:
+                if attempt == 0:
+                    self._short_circuited += 1
+                    metrics.llm_short_circuits.inc()
+                    raise CircuitOpenError("All LLM backends are unavailable (circuit breakers open)")
+                break
+            if attempt:
+                metrics.llm_retries.inc("attempted")
+                logger.info("🔁 Retrying LLM request on %s (attempt %d) after %s", backend.url, attempt + 1,
+                            f"HTTP {failure.status_code}" if isinstance(failure, httpx.Response) else type(failure).__name__)
+            tried.append(backend)
+
+            try:
+                response = await send(backend)
+            except RETRYABLE_ERRORS as e:
+                failure = e
+                continue
+            if response.status_code not in RETRYABLE_STATUSES:
+                return response
+            await response.aclose()
+            failure = response
+
+        if isinstance(failure, httpx.Response):
+            return failure
+        raise failure
+
+    async def _generate_on(self, primary: LLMBackend, payload: Dict[str, Any], kwargs: Dict[str, Any]) -> httpx.Response:
+        """Send a generation to a backend, hedging it on a second backend if it runs past the hedge delay"""
+        client = self.http_client.client
+        first = self._dispatch(primary, client.post(f"{primary.url}/api/generate", json=payload, **kwargs), record_latency=True)
+
+        delay = self._current_hedge_delay()
+        if delay is None:
+            return await first
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+        if done or self._hedges["sent"] >= self.hedge_max_ratio * self._generations:
+            return await first
+        secondary = self.pick(exclude=(primary,))
+        if secondary is None:
+            return await first
+
+        self._hedges["sent"] += 1
+        metrics.llm_hedges.inc("sent")
+        logger.debug("Hedging generation on %s after %.0fms without a response from %s", secondary.url, delay * 1000, primary.url)
+        hedge = self._dispatch(secondary, client.post(f"{secondary.url}/api/generate", json=payload, **kwargs), record_latency=True)
+        pending = {first, hedge}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code < 500:
+                        if task is hedge:
+                            self._hedges["won"] += 1
+                            metrics.llm_hedges.inc("won")
+                        return task.result()
+                if not pending:
+                    # Both failed: report the later failure
+                    return done.pop().result()
+        finally:
+            # Cancelling the slower request closes its connection, which aborts its generation
+            for task in pending:
+                task.cancel()
+
+    async def _open_stream(self, payload: Dict[str, Any], kwargs: Dict[str, Any], backend: Optional[LLMBackend] = None,
+                           opened_on: Optional[List[LLMBackend]] = None) -> Tuple[httpx.Response, LLMBackend]:
+        """
+        Open a stream on a backend (or, retrying, on the least loaded one); it counts as outstanding until closed
+
+        Args:
+            payload: The generate request body
+            kwargs: Passed to httpx
+            backend: Backend to open the stream on, without retries
+            opened_on: Collects every backend tried, as it is tried
+        """
+        client = self.http_client.client
+        opened_on = [] if opened_on is None else opened_on
+
+        async def open_on(target: LLMBackend) -> httpx.Response:
+            opened_on.append(target)
+            request = client.build_request("POST", f"{target.url}/api/generate", json=payload, **kwargs)
+            return await self._dispatch(target, client.send(request, stream=True), defer_success=True)
+
+        response = await (open_on(backend) if backend is not None else self._with_retries(open_on))
+        # Opening the stream is accounted for by _dispatch; the generation keeps the backend busy until the stream ends
+        opened_on[-1].outstanding += 1
+        return response, opened_on[-1]
+
+    async def _close_stream(self, backend: LLMBackend, response: httpx.Response, outcome: Optional[str], error: Optional[str]):
+        """Close a stream and record its one outcome"""
+        backend.outstanding -= 1
+        await response.aclose()
+        # Headers alone do not prove a backend healthy, so a stream's one
+        # outcome is recorded when it ends (a 5xx was recorded on opening)
+        if response.status_code < 500:
+            self._record_result(backend, outcome, error)
+
+    async def _open_prefetched(self, payload: Dict[str, Any], kwargs: Dict[str, Any], backend: Optional[LLMBackend] = None,
+                               opened_on: Optional[List[LLMBackend]] = None) -> PrefetchedStream:
+        """Open a stream and read its first chunk (error responses are left for the caller to read)"""
+        response, backend = await self._open_stream(payload, kwargs, backend, opened_on)
+        stream = PrefetchedStream(response, backend)
+        if response.status_code >= 400:
+            return stream
+        try:
+            await stream.prefetch()
+        except BaseException as e:
+            # Reading the first chunk ends the stream's life here, so its outcome is recorded here too
+            outcome = outcome_of(e) if isinstance(e, Exception) else None
+            await self._close_stream(backend, response, outcome, f"{type(e).__name__}: {e}")
+            raise
+        return stream
+
+    async def _race_streams(self, payload: Dict[str, Any], kwargs: Dict[str, Any]) -> PrefetchedStream:
+        """Open a stream, hedging it on a second backend if its first chunk takes longer than the hedge delay"""
+        start = time.perf_counter()
+        tried: List[LLMBackend] = []
+        first = asyncio.ensure_future(self._open_prefetched(payload, kwargs, opened_on=tried))
+        pending = {first}
+        try:
+            delay = self._current_hedge_delay(self._first_chunk_latencies)
+            secondary = None
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and self._hedges["sent"] < self.hedge_max_ratio * self._generations:
+                    secondary = self.pick(exclude=tried)
+            if secondary is None:
+                winner = await first
+                pending.clear()
+            else:
+                self._hedges["sent"] += 1
+                metrics.llm_hedges.inc("sent")
+                logger.debug("Hedging stream on %s after %.0fms without a first chunk", secondary.url, delay * 1000)
+                hedge = asyncio.ensure_future(self._open_prefetched(payload, kwargs, backend=secondary))
+                pending.add(hedge)
+                winner = await self._first_stream(pending)
+                if winner is hedge:
+                    self._hedges["won"] += 1
+                    metrics.llm_hedges.inc("won")
+                winner = winner.result()
+        finally:
+            # Cancelling or closing the slower stream aborts its generation
+            for task in pending:
+                await self._abandon_stream(task)
+        if winner.status_code < 400:
+            self._first_chunk_latencies.add(time.perf_counter() - start)
+        return winner
+
+    async def _first_stream(self, pending: Set["asyncio.Future[PrefetchedStream]"]) -> "asyncio.Future[PrefetchedStream]":
+        """
+        Wait for the first of racing streams to open without a server error
+
+        The winner is removed from pending and returned; losers that already
+        finished are closed. When every stream failed the last one is
+        returned, so its error reaches the caller.
+        """
+        while True:
+            done, remaining = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            winner = next((task for task in done if task.exception() is None and task.result().status_code < 500), None)
+            if winner is None and not remaining:
+                winner = done.pop()
+            for task in done:
+                if task is not winner:
+                    await self._abandon_stream(task)
+            if winner is not None:
+                return winner
+
+    async def _abandon_stream(self, task: "asyncio.Future[PrefetchedStream]"):
+        """Cancel a stream that lost a hedge race, or close it if it was already open"""
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        elif not task.cancelled() and task.exception() is None:
+            stream = task.result()
+            await self._close_stream(stream.backend, stream.response, None, None)
+
+    def _dispatch(self, backend: LLMBackend, request: Awaitable[httpx.Response], record_latency: bool = False,
+                  defer_success: bool = False) -> asyncio.Task:
+        """
+        Run a request to a backend in a task and account for it when it finishes
+
+        The request counts as outstanding from now on, so concurrent callers
+        picking a backend before the task first runs already see it. With
+        defer_success, a response that arrives without a server error is not
+        recorded as a success; the caller records the outcome once the
+        response body has been read (streams).
+        """
+        backend.outstanding += 1
+        backend.requests += 1
+        task = asyncio.ensure_future(request)
+        # A done callback also runs for a task cancelled before it started
+        task.add_done_callback(functools.partial(self._finish, backend, time.perf_counter(), record_latency, defer_success))
+        return task
+
+    def _finish(self, backend: LLMBackend, start: float, record_latency: bool, defer_success: bool, task: asyncio.Task):
+        """Done callback of a dispatched request: record its outcome (a cancelled request has none)"""
+        backend.outstanding -= 1
+        if task.cancelled():
+            self._record_result(backend, None, None)
+            return
+        error = task.exception()
+        if error is not None:
+            self._record_result(backend, outcome_of(error), f"{type(error).__name__}: {error}")
+            return
+
+        response = task.result()
+        if response.status_code >= 500:
+            self._record_result(backend, "error", f"HTTP {response.status_code}")
+            return
+        if defer_success:
+            return
+        self._record_result(backend, "ok", None)
+        if record_latency:
+            self._latencies.add(time.perf_counter() - start)
+
+    def _record_result(self, backend: LLMBackend, outcome: Optional[str], error: Optional[str]):
+        """Count a request's outcome and feed it to the backend's circuit breaker"""
+        if outcome is not None:
+            metrics.llm_backend_requests.inc(backend.url, outcome)
+        if outcome in ("error", "timeout"):
+            backend.failures += 1
+            backend.last_error = error
+        backend.breaker.record(outcome)
+
+    def _current_hedge_delay(self, latencies: Optional[LatencyWindow] = None) -> Optional[float]:
+        """Seconds to wait before hedging (on generation latencies, unless another window is given), or None when a request is not hedged"""
+        latencies = self._latencies if latencies is None else latencies
+        if not self.hedge_enabled or len(self.backends) < 2 or len(latencies) < self.hedge_min_samples:
+            return None
+        return latencies.quantile(self.hedge_quantile)
+
+    def _ensure_probing(self):
+        """Start the health probe on first use"""
+        if self._probe_task is None and self.probe_interval > 0:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.gather(*(self._probe(backend) for backend in self.backends))
+            await asyncio.sleep(self.probe_interval)
+
+    async def _probe(self, backend: LLMBackend):
+        """Check that a backend answers GET /api/version and take it out of (or put it back into) rotation"""
+        try:
+            response = await self.http_client.client.get(f"{backend.url}/api/version", timeout=self.probe_timeout)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            backend.last_error = f"{type(e).__name__}: {e}"
+            if backend.healthy:
+                logger.warning("⚠️ LLM backend %s failed its health probe (%s), taking it out of rotation", backend.url, backend.last_error)
+            backend.healthy = False
+        else:
+            if not backend.healthy:
+                logger.info("✅ LLM backend %s is healthy again", backend.url)
+            backend.healthy = True
+        backend.last_probe_at = datetime.utcnow().isoformat()
+
+    def get_health(self) -> Dict[str, Any]:
+        """Probe result and circuit breaker state of each backend, for /health"""
+        return {
+            backend.url: {"healthy": backend.healthy, "circuit": backend.breaker.state}
+            for backend in self.backends
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend health, load and circuit breakers, and retry and hedging counters"""
+        hedge_delay = self._current_hedge_delay()
+        stream_hedge_delay = self._current_hedge_delay(self._first_chunk_latencies)
+        return {
+            "backends": [
+                {
+                    "url": backend.url,
+                    "available": backend.available,
+                    "healthy": backend.healthy,
+                    "outstanding": backend.outstanding,
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "last_probe_at": backend.last_probe_at,
+                    "last_error": backend.last_error,
+                    "circuit_breaker": backend.breaker.get_stats()
+                }
+                for backend in self.backends
+            ],
+            "available": sum(1 for backend in self.backends if backend.available),
+            "short_circuited": self._short_circuited,
+            "retries": {"max_retries": self.retry_max, **self.retry_budget.get_stats()},
+            "hedging": {
+                "enabled": self.hedge_enabled,
+                "delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+                "latency_samples": len(self._latencies),
+                "stream_delay_ms": round(stream_hedge_delay * 1000, 1) if stream_hedge_delay is not None else None,
+                "first_chunk_samples": len(self._first_chunk_latencies),
+                **self._hedges
+            }
+        }
+
+
+# Global router shared by all calls to Ollama
+llm_router = LLMRouter()
@@ -0,0 +1,80 @@
+"""
+Event Loop Lag Monitor
+
+This module measures how late the asyncio event loop runs scheduled
+callbacks. A background task sleeps for a fixed interval and records how much
+longer than requested the sleep took; sustained lag means something is
+blocking the loop (synchronous I/O, CPU-heavy parsing, time.sleep).
+"""
+
+import asyncio
+import bisect
+import os
+import time
+from typing import Dict, List, Optional, Any
+
+# Upper bounds (ms) of the cumulative lag histogram buckets
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class EventLoopMonitor:
+    """
+    Periodic event-loop lag sampler
+
+    Lag samples are accumulated into a fixed histogram so that callers (such
+    as the benchmark harness) can diff two snapshots and get the lag
+    distribution for exactly the interval between them.
+    """
+
+    def __init__(self):
+        """Initialize the monitor from environment configuration"""
+        self.enabled = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100")) / 1000
+
+        self._task: Optional[asyncio.Task] = None
+        self._bucket_counts: List[int] = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self._samples = 0
+        self._total_lag_ms = 0.0
+        self._max_lag_ms = 0.0
+        self._last_lag_ms = 0.0
+
+    def start(self):
+        """Start sampling on the running event loop"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def record(self, lag_ms: float):
+        """Add one lag sample"""
+        self._bucket_counts[bisect.bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+        self._samples += 1
+        self._total_lag_ms += lag_ms
+        self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+        self._last_lag_ms = lag_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lag counters and the cumulative lag histogram"""
+        return {
+            "enabled": self.enabled,
+            "interval_ms": self.interval * 1000,
+            "samples": self._samples,
+            "mean_lag_ms": round(self._total_lag_ms / self._samples, 3) if self._samples else 0.0,
+            "max_lag_ms": round(self._max_lag_ms, 3),
+            "last_lag_ms": round(self._last_lag_ms, 3),
+            "total_lag_ms": round(self._total_lag_ms, 3),
+            "buckets_ms": list(LAG_BUCKETS_MS),
+            "bucket_counts": list(self._bucket_counts)
+        }
+
+    async def _run(self):
+        """Sleep for the interval and record the overshoot"""
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, (time.perf_counter() - expected) * 1000))
@@ -0,0 +1,323 @@
+"""
+Prometheus Metrics
+
+This module keeps the counters, gauges and histograms exposed on /metrics in
+the Prometheus text exposition format. It is self-contained (no
+prometheus_client dependency) and deliberately minimal: recording a value is a
+dict lookup plus an addition, and all formatting happens when /metrics is
+scraped.
+"""
+
+import bisect
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .timing import record_span
+
+# Latency buckets in seconds, from sub-millisecond preprocessing up to long generations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prompt sizes in tokens
+PROMPT_TOKEN_BUCKETS = (64, 128, 192, 256, 384, 512, 768, 1024, 2048, 4096)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a label set as {a="x",b="y"}"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value the way Prometheus expects"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing counter, optionally labelled"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        # Unlabelled metrics are always exported, starting at zero
+        self._values: Dict[Tuple[str, ...], float] = {} if labels else {(): 0.0}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        """Add to the counter for a label set"""
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def total(self) -> float:
+        """Sum over all label sets"""
+        return sum(self._values.values())
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down; optionally read from a callback at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        """Subtract from the gauge for a label set"""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values: str):
+        """Set the gauge for a label set"""
+        self._values[label_values] = value
+
+    def samples(self) -> List[str]:
+        if self.callback is not None:
+            return [f"{self.name} {_format_value(self.callback())}"]
+        return super().samples()
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally labelled"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        """Record one observation"""
+        series = self._values.get(label_values)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._values[label_values] = series
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                running += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class StageTimer:
+    """Context manager observing the duration of a pipeline stage (histogram and request span)"""
+
+    __slots__ = ("histogram", "stage", "start")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed, self.stage)
+        record_span(self.stage, elapsed)
+        return False
+
+
+class MetricsRegistry:
+    """Holds the application's metrics and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics = []
+
+        self.stage_duration = self.histogram(
+            "factcheck_stage_duration_seconds",
+            "Time spent in each fact-checking pipeline stage",
+            ("stage",)
+        )
+        self.check_duration = self.histogram(
+            "factcheck_duration_seconds",
+            "End-to-end fact-check processing time"
+        )
+        self.verdicts = self.counter(
+            "factcheck_verdicts_total",
+            "Completed fact-checks by verdict",
+            ("verdict",)
+        )
+        self.categories = self.counter(
+            "factcheck_claim_categories_total",
+            "Analyzed claims by ClaimCategory",
+            ("category",)
+        )
+        self.cache_results = self.counter(
+            "factcheck_cache_lookups_total",
+            "Verdict lookups by outcome (exact, near_duplicate, miss)",
+            ("outcome",)
+        )
+        self.pipeline_errors = self.counter(
+            "factcheck_pipeline_errors_total",
+            "Fact-checks that failed with an exception"
+        )
+        self.llm_requests = self.counter(
+            "llm_requests_total",
+            "Requests sent to the LLM backend",
+            ("mode",)
+        )
+        self.llm_errors = self.counter(
+            "llm_errors_total",
+            "LLM calls that fell back to an error response, by error_type (timeout, http_error, ...)",
+            ("error_type",)
+        )
+        self.llm_http_connections = self.counter(
+            "llm_http_connections_total",
+            "Requests to the LLM backend by connection (new, reused)",
+            ("kind",)
+        )
+        self.llm_http_pool_wait = self.histogram(
+            "llm_http_pool_wait_seconds",
+            "Time a request to the LLM backend waited for a pooled connection"
+        )
+        self.llm_prompt_tokens = self.histogram(
+            "llm_prompt_tokens",
+            "Tokens in each prompt sent to the LLM, by ClaimCategory",
+            ("category",),
+            buckets=PROMPT_TOKEN_BUCKETS
+        )
+        self.llm_generated_tokens = self.counter(
+            "llm_generated_tokens_total",
+            "Tokens generated by the LLM, by mode",
+            ("mode",)
+        )
+        self.llm_early_stops = self.counter(
+            "llm_early_stops_total",
+            "Generations stopped once their JSON was complete, by reason (object_closed, fields_complete)",
+            ("reason",)
+        )
+        self.llm_backend_requests = self.counter(
+            "llm_backend_requests_total",
+            "Requests to each LLM backend by outcome (ok, error, timeout)",
+            ("backend", "outcome")
+        )
+        self.llm_hedges = self.counter(
+            "llm_hedged_requests_total",
+            "Generations duplicated to a second LLM backend (sent), and those the duplicate answered first (won)",
+            ("outcome",)
+        )
+        self.llm_retries = self.counter(
+            "llm_retries_total",
+            "LLM requests retried after a transient failure (attempted), and retries refused by the retry budget (budget_exhausted)",
+            ("outcome",)
+        )
+        self.llm_short_circuits = self.counter(
+            "llm_short_circuited_total",
+            "LLM requests refused at once because every backend's circuit breaker was open"
+        )
+        self.llm_cancelled = self.counter(
+            "llm_cancelled_total",
+            "LLM generations aborted because no client was waiting for the result",
+            ("mode",)
+        )
+        self.client_disconnects = self.counter(
+            "http_client_disconnects_total",
+            "Requests whose client disconnected before the response was sent, by route",
+            ("path",)
+        )
+        self.checks_in_flight = self.gauge(
+            "factcheck_in_flight",
+            "Fact-checks currently being processed"
+        )
+        self.http_in_flight = self.gauge(
+            "http_requests_in_flight",
+            "HTTP requests currently being served, by route",
+            ("path",)
+        )
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = (), callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def time_stage(self, stage: str) -> StageTimer:
+        """Time a pipeline stage: `with metrics.time_stage("llm"): ...`"""
+        return StageTimer(self.stage_duration, stage)
+
+    def observe_stage(self, stage: str, seconds: float):
+        """Record a stage duration measured by the caller"""
+        self.stage_duration.observe(seconds, stage)
+        record_span(stage, seconds)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+class InFlightMiddleware:
+    """
+    ASGI middleware tracking in-flight HTTP requests per route
+
+    Paths that are not plain routes of the application (path parameters,
+    unknown URLs) are counted under "other" to keep label cardinality bounded.
+    """
+
+    def __init__(self, app, gauge: Gauge):
+        self.app = app
+        self.gauge = gauge
+        self._route_paths = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._route_paths is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._route_paths = {route.path for route in routes if "{" not in getattr(route, "path", "{")}
+        path = scope["path"] if scope["path"] in self._route_paths else "other"
+
+        self.gauge.inc(path)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gauge.dec(path)
+
+
+# Global registry
+metrics = MetricsRegistry()
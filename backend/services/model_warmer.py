@@ -0,0 +1,145 @@
+"""
+LLM Model Warm-Up and Residency
+
+Ollama loads a model on the first request that needs it and unloads it after
+keep_alive of inactivity; a request that arrives at a cold model pays the
+whole load time, which can exceed the request timeout. This module loads the
+model when the API starts and keeps it resident: every interval it checks
+Ollama's loaded models (GET /api/ps), reloads the model if it was evicted, and
+refreshes its keep_alive timer when no fact-check has used it for a whole
+interval. With several Ollama backends (OLLAMA_API_URLS) the model is loaded
+on, and kept resident on, each of them. The state is reported by /health so
+traffic is only routed to an instance once its model is hot.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWarmer:
+    """
+    Background task managing the LLM's residency in Ollama
+
+    States: "pending" (not started), "loading", "loaded", "unloaded" (evicted,
+    reload pending), "error" (last load failed, retried) and "disabled"
+    (warm-up turned off, or demo mode without Ollama).
+    """
+
+    def __init__(self, get_llama_service: Callable[[], Awaitable[Any]]):
+        """
+        Initialize the warmer (the task is started with start())
+
+        Args:
+            get_llama_service: Coroutine function returning the LLM service
+        """
+        self.get_llama_service = get_llama_service
+
+        # Configuration - can be set via environment variables
+        self.enabled = os.getenv("MODEL_WARMUP_ENABLED", "true").lower() == "true"
+        self.keep_warm_interval = float(os.getenv("MODEL_KEEP_WARM_INTERVAL", "60"))
+        self.retry_interval = float(os.getenv("MODEL_WARMUP_RETRY_INTERVAL", "10"))
+        self.require_for_health = os.getenv("HEALTH_REQUIRE_MODEL", "true").lower() == "true"
+
+        self.state = "pending" if self.enabled else "disabled"
+        self._llama_service = None
+        self._task: Optional[asyncio.Task] = None
+        self._load_duration_ms: Optional[float] = None
+        self._loaded_at: Optional[str] = None
+        self._last_keep_warm_at: Optional[str] = None
+        self._last_error: Optional[str] = None
+        self._counters = {"loads": 0, "keep_warm_pings": 0, "evictions": 0, "failures": 0}
+
+    def start(self):
+        """Start warming the model on the running event loop"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the instance should receive traffic as far as the model is concerned"""
+        return self.state in ("loaded", "disabled") or not self.require_for_health
+
+    async def _run(self):
+        self._llama_service = await self.get_llama_service()
+        if self._llama_service.demo_mode:
+            self.state = "disabled"
+            return
+
+        while True:
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.state = "error"
+                self._last_error = f"{type(e).__name__}: {e}"
+                self._counters["failures"] += 1
+                logger.warning("⚠️ Model warm-up failed (%s), retrying in %.0fs", self._last_error, self.retry_interval)
+            await asyncio.sleep(self.keep_warm_interval if self.state == "loaded" else self.retry_interval)
+
+    async def _tick(self):
+        """Load the model if it is not resident, otherwise keep it warm while idle"""
+        llama_service = self._llama_service
+        if self.state == "loaded":
+            resident = await llama_service.resident_models()
+            if not any(llama_service.is_model_name(name) for name in resident):
+                self.state = "unloaded"
+                self._counters["evictions"] += 1
+                logger.warning("⚠️ Model %s was unloaded by Ollama, reloading", llama_service.model_name)
+
+        if self.state != "loaded":
+            await self._load()
+        elif self._idle_for() >= self.keep_warm_interval:
+            await llama_service.warm_up()
+            self._counters["keep_warm_pings"] += 1
+            self._last_keep_warm_at = datetime.utcnow().isoformat()
+
+    async def _load(self):
+        """Load the model with a one-token generation and record how long it took"""
+        self.state = "loading"
+        logger.info("🔥 Loading model %s...", self._llama_service.model_name)
+        start = time.perf_counter()
+        response = await self._llama_service.warm_up()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # Ollama reports the load time itself; fall back to the round trip
+        load_duration_ns = response.get("load_duration")
+        self._load_duration_ms = round(load_duration_ns / 1e6 if load_duration_ns else elapsed_ms, 1)
+        self._loaded_at = datetime.utcnow().isoformat()
+        self._last_error = None
+        self._counters["loads"] += 1
+        self.state = "loaded"
+        logger.info("🔥 Model %s loaded in %.0fms", self._llama_service.model_name, self._load_duration_ms)
+
+    def _idle_for(self) -> float:
+        """Seconds since a fact-check last sent a request to the model (pings do not count)"""
+        last = self._llama_service.last_request_at
+        return float("inf") if last is None else time.monotonic() - last
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Model residency state for /health"""
+        llama_service = self._llama_service
+        return {
+            "name": llama_service.model_name if llama_service else None,
+            "state": self.state,
+            "loaded": self.state == "loaded",
+            "load_duration_ms": self._load_duration_ms,
+            "loaded_at": self._loaded_at,
+            "keep_alive": llama_service.keep_alive if llama_service else None,
+            "last_keep_warm_at": self._last_keep_warm_at,
+            "last_error": self._last_error,
+            **self._counters
+        }
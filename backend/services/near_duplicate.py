@@ -0,0 +1,395 @@
+"""
+Near-Duplicate Claim Index
+
+This module finds previously verified claims that are near-duplicates of a
+new claim, so rephrasings such as "the eiffel tower is over 400m tall" can
+reuse an earlier verdict. Each claim is reduced to a small set of canonical
+features built from its normalized text: its subject terms (the words left
+once filler words, negations, comparatives and units are removed), the direction and dimension
+of any comparison ("over", "more than" and "taller than" all become '>'), and
+its quantities with units collapsed ("400m" and "400 meters" both become
+"400 meter"). The feature sets are summarized as MinHash signatures and
+bucketed with locality-sensitive hashing so a lookup only compares against a
+handful of candidates regardless of index size.
+
+Similarity alone cannot tell "The Tokyo Tower is taller than 400 meters"
+from the Eiffel Tower claim, or "Paris is the capital of Germany and France"
+from "Paris is the capital of France", so a candidate is only reused when the
+two claims have the same subject terms, quantities and comparison, and agree
+on negation and tense.
+
+Signatures use one-permutation hashing (each feature is hashed once and
+assigned to a bin) with rotation densification for empty bins, which keeps
+signature cost linear in the number of features instead of features x hashes.
+They are stored packed as bytes and bucketed by the hash of each band; a
+100,000-entry index takes about 280 MB and a million-entry one about 2.3 GB
+(benchmarks/near_duplicate.py), not counting the analysis results it shares
+with the verdict cache. Each worker process keeps its own index, so the
+default bound (100,000) leaves room for several workers in the backend
+container's 2 GB.
+"""
+
+import hashlib
+import heapq
+import itertools
+import operator
+import os
+import re
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Set, Tuple, Union
+
+# Offset added per rotation step when an empty bin borrows from a neighbour.
+# Bin values are below 2**58 and steps below 64, so signatures fit in 64 bits.
+_ROTATION_OFFSET = 1 << 58
+
+# Words that carry no meaning for similarity. Negations and tense are guarded
+# separately; comparatives are canonicalized below instead.
+_FILLER_WORDS = {
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'of', 'to',
+    'in', 'on', 'at', 'for', 'by', 'with', 'and', 'that', 'this', 'it', 'its',
+    'than', 'measure', 'measures', 'stand', 'stands', 'approximately', 'about',
+    'roughly', 'around'
+}
+
+# Comparative words mapped to (direction, dimension), so "over 400m tall",
+# "more than 400 meters high" and "taller than 400 meters" line up
+_COMPARATIVES = {
+    'over': ('>', None), 'above': ('>', None), 'more': ('>', None),
+    'greater': ('>', None), 'exceeds': ('>', None), 'exceed': ('>', None),
+    'exceeding': ('>', None), 'bigger': ('>', None), 'larger': ('>', None),
+    'taller': ('>', 'height'), 'higher': ('>', 'height'),
+    'longer': ('>', 'length'), 'heavier': ('>', 'weight'),
+    'under': ('<', None), 'below': ('<', None), 'less': ('<', None),
+    'fewer': ('<', None), 'smaller': ('<', None), 'lower': ('<', None),
+    'shorter': ('<', 'height'), 'lighter': ('<', 'weight')
+}
+
+# Words naming the dimension a comparison is about
+_DIMENSIONS = {
+    'tall': 'height', 'high': 'height', 'height': 'height',
+    'long': 'length', 'length': 'length',
+    'heavy': 'weight', 'weight': 'weight', 'weigh': 'weight', 'weighs': 'weight'
+}
+
+# Common unit spellings collapsed to one token
+_UNIT_ALIASES = {
+    'm': 'meter', 'meters': 'meter', 'metre': 'meter', 'metres': 'meter',
+    'km': 'kilometer', 'kilometers': 'kilometer', 'kilometres': 'kilometer',
+    'ft': 'feet', 'foot': 'feet', 'mi': 'mile', 'miles': 'mile',
+    'kg': 'kilogram', 'kilograms': 'kilogram', 'lb': 'pound', 'lbs': 'pound', 'pounds': 'pound',
+    '%': 'percent'
+}
+_UNITS = set(_UNIT_ALIASES.values())
+
+# Whole words (or "n't" contractions) that negate a claim
+_NEGATIONS = {'not', 'no', 'never', 'none', 'neither', 'nor', 'nobody', 'nothing', 'false', 'cannot'}
+
+# Auxiliaries that put a claim in the past, so "Paris was the capital of
+# France" does not reuse the verdict of "Paris is the capital of France"
+_PAST_TENSE = {'was', 'were', 'had', 'did', 'formerly', 'former', 'once'}
+
+# Agreement markers; neither can collide with a number or a comparison
+_NEGATED = 'not'
+_PAST = 'past'
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|[a-z]+(?:'[a-z]+)?|%")
+
+# Bucket values hold a single entry id until a second entry shares the band
+_Bucket = Union[int, Set[int]]
+
+
+class ClaimFeatures:
+    """
+    Canonical features of a claim: MinHash input plus the agreement guards
+
+    The guards are kept as small interned tuples, since one is stored for
+    every indexed claim. Besides quantities and comparison, the agreement
+    tuple carries the negation and past-tense markers.
+    """
+
+    __slots__ = ('shingles', 'subjects', 'agreement')
+
+    def __init__(self, shingles: Set[str], subjects: Set[str], quantities: Set[str], comparison: Set[str], markers: Set[str]):
+        self.shingles = shingles
+        self.subjects = tuple(sorted(sys.intern(term) for term in subjects))
+        self.agreement = tuple(sorted(sys.intern(term) for term in quantities | comparison | markers))
+
+    def agrees_with(self, other: "ClaimFeatures") -> bool:
+        """Same subject terms, quantities, comparison, negation and tense"""
+        return self.agreement == other.agreement and self.subjects == other.subjects
+
+
+class MinHashLSHIndex:
+    """
+    Incremental MinHash/LSH index over canonical claim features
+
+    Each indexed claim stores its signature and a payload (the analysis
+    result to reuse). Entries expire after a caller-supplied TTL and the
+    index is bounded by NEAR_DUP_MAX_ENTRIES, dropping the oldest first.
+    """
+
+    def __init__(self):
+        """Initialize the index from environment configuration"""
+        self.enabled = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+        self.threshold = float(os.getenv("NEAR_DUP_THRESHOLD", "0.7"))
+        self.num_bands = int(os.getenv("NEAR_DUP_BANDS", "16"))
+        self.rows_per_band = int(os.getenv("NEAR_DUP_ROWS", "4"))
+        self.max_entries = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "100000"))
+        self.max_candidates = int(os.getenv("NEAR_DUP_MAX_CANDIDATES", "32"))
+        self.num_perm = self.num_bands * self.rows_per_band
+
+        # entry id -> (key, packed signature, payload, expires_at), oldest first
+        self._entries: "OrderedDict[int, Tuple[str, bytes, Dict[str, Any], float]]" = OrderedDict()
+        self._ids_by_key: Dict[str, int] = {}
+        self._buckets: List[Dict[int, _Bucket]] = [dict() for _ in range(self.num_bands)]
+        self._next_id = 0
+        self._counters = {"lookups": 0, "matches": 0, "rejected": 0, "inserts": 0, "expirations": 0, "evictions": 0}
+        self._lookup_time_total = 0.0
+
+    def features(self, processed_claim: Dict[str, Any]) -> ClaimFeatures:
+        """
+        Build the canonical features of a preprocessed claim
+
+        Everything is read from the normalized claim on whole-word tokens
+        (PathwayProcessor's key terms drop short words and its negation flag
+        matches substrings such as the "no" in "Nobel").
+
+        Args:
+            processed_claim: Output of PathwayProcessor.preprocess_claim
+
+        Returns:
+            ClaimFeatures for similarity and agreement checks
+        """
+        text = processed_claim.get('normalized_claim') or processed_claim.get('original_claim', '')
+        # Drop thousands separators, then split digits from unit suffixes
+        text = re.sub(r'(?<=\d),(?=\d{3}\b)', '', text.lower().replace('\u2019', "'"))
+        tokens = [token[:-2] if token.endswith("'s") else token for token in _TOKEN.findall(text)]
+
+        comparison: Set[str] = set()
+        quantities: Set[str] = set()
+        markers: Set[str] = set()
+        subjects: Set[str] = set()
+        for index, token in enumerate(tokens):
+            word = self._canonical_token(token)
+            if word in _NEGATIONS or word.endswith("n't"):
+                markers.add(_NEGATED)
+                if word.endswith("n't") and word[:-3] in _PAST_TENSE:
+                    markers.add(_PAST)
+            elif word in _PAST_TENSE:
+                markers.add(_PAST)
+            elif word in _COMPARATIVES:
+                direction, dimension = _COMPARATIVES[word]
+                comparison.add(direction)
+                if dimension:
+                    comparison.add(dimension)
+            elif word in _DIMENSIONS:
+                comparison.add(_DIMENSIONS[word])
+            elif _NUMBER.fullmatch(token):
+                number = self._canonical_number(token)
+                unit = self._canonical_token(tokens[index + 1]) if index + 1 < len(tokens) else None
+                quantities.add(f"{number} {unit}" if unit in _UNITS else number)
+            elif word not in _FILLER_WORDS and word not in _UNITS:
+                subjects.add(word)
+
+        subjects.update(date for date in processed_claim.get('entities', {}).get('dates', []))
+
+        shingles = subjects | quantities | comparison
+        return ClaimFeatures(shingles, subjects, quantities, comparison, markers)
+
+    def signature(self, shingles: Set[str]) -> bytes:
+        """Compute the (densified one-permutation) MinHash signature of a shingle set, packed as bytes"""
+        num_bins = self.num_perm
+        bins: List[Optional[int]] = [None] * num_bins
+        for shingle in shingles:
+            # blake2b is stable across processes, unlike the built-in str hash
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+            index, value = h % num_bins, h // num_bins
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+
+        if all(value is None for value in bins):
+            return bytes(8 * num_bins)
+
+        signature = array('Q')
+        for index in range(num_bins):
+            value = bins[index]
+            step = 0
+            while value is None:
+                step += 1
+                value = bins[(index + step) % num_bins]
+            signature.append(value + step * _ROTATION_OFFSET)
+        return signature.tobytes()
+
+    def query(self, processed_claim: Dict[str, Any], model_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar indexed claim above the similarity threshold
+
+        Candidates must also have the same subject terms, quantities and
+        comparison, and agree on negation and tense.
+
+        Args:
+            processed_claim: Output of PathwayProcessor.preprocess_claim
+            model_name: Only results produced by this model are reused
+
+        Returns:
+            Optional[Dict]: {'payload', 'claim', 'similarity'} for the best match, or None
+        """
+        if not self.enabled or not self._entries:
+            return None
+
+        start = time.perf_counter()
+        self._counters["lookups"] += 1
+        features = self.features(processed_claim)
+        signature = self.signature(features.shingles)
+        values = array('Q', signature)
+
+        # Bound the work so crowded buckets cannot make lookups slow. Claims
+        # sharing only common features (a comparison and a unit) crowd the
+        # same bands, so candidates are drawn from the smallest buckets first
+        # and the ones sharing the most bands with the query are compared.
+        buckets = []
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                buckets.append((bucket,) if isinstance(bucket, int) else bucket)
+        seeds: Set[int] = set()
+        for bucket in sorted(buckets, key=len):
+            seeds.update(itertools.islice(bucket, self.max_candidates * 4 - len(seeds)))
+            if len(seeds) >= self.max_candidates * 4:
+                break
+        shared_bands = dict.fromkeys(seeds, 0)
+        for bucket in buckets:
+            for entry_id in seeds.intersection(bucket):
+                shared_bands[entry_id] += 1
+        candidates = heapq.nlargest(self.max_candidates, shared_bands, key=shared_bands.get)
+
+        best = None
+        now = time.monotonic()
+        for entry_id in candidates:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            key, other, payload, expires_at = entry
+            if expires_at <= now:
+                self._remove(entry_id)
+                self._counters["expirations"] += 1
+                continue
+            if payload.get('model_name') != model_name:
+                continue
+            similarity = sum(map(operator.eq, values, array('Q', other))) / self.num_perm
+            if similarity < self.threshold or (best is not None and similarity <= best["similarity"]):
+                continue
+            if not features.agrees_with(payload['features']):
+                self._counters["rejected"] += 1
+                continue
+            best = {"payload": payload["analysis_result"], "claim": payload["claim"], "similarity": round(similarity, 4)}
+
+        if best is not None:
+            self._counters["matches"] += 1
+        self._lookup_time_total += time.perf_counter() - start
+        return best
+
+    def insert(self, key: str, processed_claim: Dict[str, Any], analysis_result: Dict[str, Any], model_name: str, ttl_seconds: float):
+        """
+        Add (or replace) a verified claim in the index
+
+        Args:
+            key: Identity of the claim, e.g. the verdict cache key
+            processed_claim: Output of PathwayProcessor.preprocess_claim
+            analysis_result: The analysis to reuse for near-duplicates
+            model_name: Model that produced the analysis
+            ttl_seconds: How long the analysis may be reused
+        """
+        if not self.enabled:
+            return
+
+        if key in self._ids_by_key:
+            self._remove(self._ids_by_key[key])
+
+        features = self.features(processed_claim)
+        signature = self.signature(features.shingles)
+        entry_id = self._next_id
+        self._next_id += 1
+
+        # The shingle set is only needed to build the signature
+        features.shingles = None
+        payload = {
+            "claim": processed_claim.get('original_claim', ''),
+            "analysis_result": analysis_result,
+            "model_name": model_name,
+            "features": features
+        }
+        self._entries[entry_id] = (key, signature, payload, time.monotonic() + ttl_seconds)
+        self._ids_by_key[key] = entry_id
+        for band, band_key in enumerate(self._band_keys(signature)):
+            buckets = self._buckets[band]
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                buckets[band_key] = entry_id
+            elif isinstance(bucket, int):
+                buckets[band_key] = {bucket, entry_id}
+            else:
+                bucket.add(entry_id)
+        self._counters["inserts"] += 1
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size, match counters and average lookup time"""
+        lookups = self._counters["lookups"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "average_lookup_us": round(self._lookup_time_total / lookups * 1e6, 1) if lookups else 0.0,
+            **self._counters
+        }
+
+    def _band_keys(self, signature: bytes) -> List[int]:
+        """Split a packed signature into its LSH band keys (hashes of each band's bytes)"""
+        width = self.rows_per_band * 8
+        return [hash(signature[band * width:(band + 1) * width]) for band in range(self.num_bands)]
+
+    def _remove(self, entry_id: int):
+        """Remove an entry from the index and its buckets"""
+        key, signature, _, _ = self._entries.pop(entry_id)
+        if self._ids_by_key.get(key) == entry_id:
+            del self._ids_by_key[key]
+        for band, band_key in enumerate(self._band_keys(signature)):
+            buckets = self._buckets[band]
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, int):
+                if bucket == entry_id:
+                    del buckets[band_key]
+                continue
+            bucket.discard(entry_id)
+            if len(bucket) == 1:
+                buckets[band_key] = next(iter(bucket))
+            elif not bucket:
+                del buckets[band_key]
+
+    @staticmethod
+    def _canonical_number(token: str) -> str:
+        """Write numbers one way, so "400.0" and "400" agree"""
+        whole, _, fraction = token.partition('.')
+        whole = whole.lstrip('0') or '0'
+        fraction = fraction.rstrip('0')
+        return f"{whole}.{fraction}" if fraction else whole
+
+    @staticmethod
+    def _canonical_token(token: str) -> str:
+        """Collapse unit spellings and simple plurals"""
+        token = _UNIT_ALIASES.get(token, token)
+        if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        return token
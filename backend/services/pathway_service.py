@@ -9,9 +9,12 @@ structure data for the LLaMA model.
 import pathway as pw
 from typing import Dict, List, Optional, Any
 import json
+import logging
 import re
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 
 class PathwayProcessor:
     """
@@ -63,7 +66,7 @@ class PathwayProcessor:
             return processed_data
             
         except Exception as e:
-            print(f"⚠️ Pathway preprocessing error: {str(e)}")
+            logger.warning("⚠️ Pathway preprocessing error: %s", e)
             # Return basic preprocessing if Pathway fails
             return self._basic_preprocessing(claim)
     
@@ -0,0 +1,308 @@
+"""
+Prompt Builder
+
+The analysis prompts used to embed pretty-printed JSON of the claim's
+entities and structure (json.dumps(..., indent=2)) and the Python repr of
+the category configuration, so every request paid prompt evaluation for
+indentation, quotes, empty lists and False flags. This module renders that
+context compactly (empty values and False flags dropped, repeated values
+listed once), counts prompt tokens with a pluggable local tokenizer and
+keeps each prompt within its category's token budget by trimming optional
+sections first.
+
+It also sizes Ollama's context window (num_ctx) to the prompt plus the
+tokens to generate. Ollama reloads the model whenever num_ctx changes, so
+the size is rounded up to a power of two and never goes below
+LLAMA_NUM_CTX_MIN: in practice every request uses the same window, and only
+an unusually long prompt gets a larger one.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .metrics import metrics
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+# Sections below this many tokens are dropped rather than cut off mid-sentence
+MIN_SECTION_TOKENS = 8
+
+
+class HeuristicTokenizer:
+    """
+    Approximate LLaMA token counts without a vocabulary
+
+    Words count one token per five characters (at least one), digits one
+    token each (LLaMA splits numbers into digits) and punctuation one token
+    per character. This is an estimate: /stats compares it with the counts
+    Ollama reports, and PROMPT_TOKENIZER can point at the model's own
+    tokenizer for exact counts.
+    """
+
+    name = "heuristic"
+    _PIECES = re.compile(r"\d|[^\W\d]+|[^\w\s]")
+
+    def _piece_tokens(self, piece: str) -> int:
+        if piece.isalpha():
+            return (len(piece) + 4) // 5
+        return 1
+
+    def count(self, text: str) -> int:
+        """Number of tokens in a text"""
+        return sum(self._piece_tokens(match.group()) for match in self._PIECES.finditer(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of a text that fits in max_tokens"""
+        used = 0
+        for match in self._PIECES.finditer(text):
+            used += self._piece_tokens(match.group())
+            if used > max_tokens:
+                return text[:match.start()].rstrip()
+        return text
+
+
+class HFTokenizer:
+    """Exact token counts from a local Hugging Face tokenizer.json (needs the tokenizers package)"""
+
+    def __init__(self, path: str):
+        self.name = f"tokenizers:{path}"
+        self._tokenizer = Tokenizer.from_file(path)
+
+    def count(self, text: str) -> int:
+        """Number of tokens in a text"""
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of a text that fits in max_tokens"""
+        encoding = self._tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+        return text[:encoding.offsets[max_tokens - 1][1]].rstrip()
+
+
+def load_tokenizer(spec: str):
+    """
+    Tokenizer for a PROMPT_TOKENIZER value
+
+    Args:
+        spec: "heuristic", or "tokenizers:<path to tokenizer.json>" for the
+            model's own tokenizer
+
+    Returns:
+        The tokenizer; the heuristic one if the spec cannot be loaded
+    """
+    if spec.startswith("tokenizers:"):
+        path = spec.split(":", 1)[1]
+        if Tokenizer is None:
+            logger.warning("⚠️ PROMPT_TOKENIZER=%s needs the tokenizers package, using the heuristic tokenizer", spec)
+        else:
+            try:
+                return HFTokenizer(path)
+            except Exception as e:
+                logger.warning("⚠️ Could not load tokenizer %s (%s), using the heuristic tokenizer", path, e)
+    elif spec != "heuristic":
+        logger.warning("⚠️ Unknown PROMPT_TOKENIZER %r, using the heuristic tokenizer", spec)
+    return HeuristicTokenizer()
+
+
+def parse_budgets(raw: str) -> Dict[str, int]:
+    """Per-category token budgets from "category=tokens,..." (malformed entries are ignored)"""
+    budgets = {}
+    for entry in raw.split(","):
+        category, _, tokens = entry.partition("=")
+        if category.strip() and tokens.strip().isdigit():
+            budgets[category.strip()] = int(tokens)
+    return budgets
+
+
+def _unique(values: Iterable[Any], seen: set) -> List[str]:
+    """Values as strings, skipping empty ones and any seen before (case-insensitive)"""
+    unique = []
+    for value in values:
+        text = str(value).strip()
+        if text and text.lower() not in seen:
+            seen.add(text.lower())
+            unique.append(text)
+    return unique
+
+
+def render_entities(entities: Dict[str, Iterable[Any]], claim: str = "") -> str:
+    """Entities as "type: a, b; type: c", without empty types, values repeated across types or the whole claim again"""
+    seen = {claim.strip().lower()}
+    parts = []
+    for entity_type, values in entities.items():
+        unique = _unique(sorted(values, key=str), seen)
+        if unique:
+            parts.append(f"{entity_type}: {', '.join(unique)}")
+    return "; ".join(parts)
+
+
+def render_settings(settings: Dict[str, Any]) -> str:
+    """
+    A flat settings dict as compact text
+
+    True flags are listed by name, False and empty values are dropped and
+    other values are rendered as "name value":
+    {"evidence_weight": 0.9, "peer_review": True, "is_question": False}
+    becomes "evidence weight 0.9; peer review".
+    """
+    parts = []
+    for name, value in settings.items():
+        label = name.replace("_", " ")
+        if value is True:
+            parts.append(label)
+        elif value is not False and value not in (None, "", [], {}):
+            parts.append(f"{label} {round(value, 2) if isinstance(value, float) else value}")
+    return "; ".join(parts)
+
+
+class Prompt:
+    """A rendered prompt with its token count and context window"""
+
+    __slots__ = ("text", "tokens", "budget", "num_ctx", "trimmed")
+
+    def __init__(self, text: str, tokens: int, budget: int, num_ctx: int, trimmed: List[str]):
+        self.text = text
+        self.tokens = tokens
+        self.budget = budget
+        self.num_ctx = num_ctx
+        # Optional sections that were shortened or dropped to meet the budget
+        self.trimmed = trimmed
+
+
+class PromptBuilder:
+    """
+    Assembles prompts from sections within a per-category token budget
+
+    A section is (name, text, required). Required sections are always kept;
+    optional ones are kept in order while they fit, the first that does not
+    fit is cut to the remaining budget (at a line boundary if possible) and
+    the rest are dropped. The
+    tokenizer is any object with count(text) and truncate(text, max_tokens).
+    """
+
+    def __init__(self, tokenizer=None):
+        """Initialize the builder from environment configuration"""
+        # Configuration - can be set via environment variables
+        self.tokenizer = tokenizer or load_tokenizer(os.getenv("PROMPT_TOKENIZER", "heuristic"))
+        self.default_budget = int(os.getenv("PROMPT_TOKEN_BUDGET", "384"))
+        self.budgets = parse_budgets(os.getenv("PROMPT_TOKEN_BUDGETS", ""))
+        self.min_num_ctx = int(os.getenv("LLAMA_NUM_CTX_MIN", "2048"))
+        self.max_num_ctx = int(os.getenv("LLAMA_NUM_CTX_MAX", "8192"))
+
+        # category -> [prompts, prompt tokens, trimmed prompts, tokens Ollama reported, prompts it reported them for]
+        self._stats: Dict[str, List[int]] = {}
+
+    def count(self, text: str) -> int:
+        """Number of tokens in a text"""
+        return self.tokenizer.count(text)
+
+    def budget_for(self, category: str) -> int:
+        """Prompt token budget of a category (PROMPT_TOKEN_BUDGETS, else PROMPT_TOKEN_BUDGET)"""
+        return self.budgets.get(category, self.default_budget)
+
+    def num_ctx(self, prompt_tokens: int, num_predict: int) -> int:
+        """Context window for a prompt and generation: a power of two between LLAMA_NUM_CTX_MIN and LLAMA_NUM_CTX_MAX"""
+        needed = prompt_tokens + num_predict
+        size = self.min_num_ctx
+        while size < needed and size < self.max_num_ctx:
+            size *= 2
+        return min(size, self.max_num_ctx)
+
+    def build(self, sections: List[Tuple[str, str, bool]], category: str, num_predict: int) -> Prompt:
+        """
+        Render sections into a prompt within the category's token budget
+
+        Args:
+            sections: (name, text, required) in prompt order; empty texts are skipped
+            category: Budget and statistics key (the ClaimCategory value)
+            num_predict: Tokens the model may generate, for sizing num_ctx
+
+        Returns:
+            The prompt; if the required sections alone exceed the budget it
+            is returned over budget rather than losing the claim
+        """
+        budget = self.budget_for(category)
+        counted = [(name, text, required, self.count(text)) for name, text, required in sections if text]
+        remaining = budget - sum(tokens for _, _, required, tokens in counted if required)
+
+        parts = []
+        trimmed = []
+        for name, text, required, tokens in counted:
+            if not required:
+                if tokens > remaining:
+                    trimmed.append(name)
+                    if remaining < MIN_SECTION_TOKENS:
+                        continue
+                    text = self._fit(text, remaining)
+                    tokens = self.count(text)
+                remaining -= tokens
+            parts.append(text)
+
+        text = "\n".join(parts)
+        tokens = self.count(text)
+        if trimmed:
+            logger.debug("✂️ Prompt for %s claim trimmed to its %d-token budget (%s)", category, budget, ", ".join(trimmed))
+        return Prompt(text, tokens, budget, self.num_ctx(tokens, num_predict), trimmed)
+
+    def _fit(self, text: str, max_tokens: int) -> str:
+        """Cut a section to max_tokens, at a line boundary when at least one whole line fits"""
+        kept = []
+        for line in text.split("\n"):
+            if self.count("\n".join(kept + [line])) > max_tokens:
+                break
+            kept.append(line)
+        return "\n".join(kept) if kept else self.tokenizer.truncate(text, max_tokens)
+
+    def record(self, category: str, prompt: Prompt, reported_tokens: Optional[int] = None):
+        """
+        Count a prompt sent to the LLM
+
+        Args:
+            category: The claim's ClaimCategory value
+            prompt: The prompt that was sent
+            reported_tokens: prompt_eval_count from Ollama's response, if known
+                (0 when Ollama reused a cached prompt prefix, which is not counted)
+        """
+        stats = self._stats.get(category)
+        if stats is None:
+            stats = self._stats[category] = [0, 0, 0, 0, 0]
+        stats[0] += 1
+        stats[1] += prompt.tokens
+        stats[2] += bool(prompt.trimmed)
+        if reported_tokens:
+            stats[3] += reported_tokens
+            stats[4] += 1
+        metrics.llm_prompt_tokens.observe(prompt.tokens, category)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tokenizer, budgets and, per category, prompt sizes and how they compare with Ollama's counts"""
+        categories = {}
+        for category, (prompts, tokens, trimmed, reported, reported_prompts) in sorted(self._stats.items()):
+            categories[category] = {
+                "prompts": prompts,
+                "budget": self.budget_for(category),
+                "avg_tokens": round(tokens / prompts, 1),
+                "trimmed": trimmed,
+                "avg_reported_tokens": round(reported / reported_prompts, 1) if reported_prompts else None
+            }
+        return {
+            "tokenizer": self.tokenizer.name,
+            "default_budget": self.default_budget,
+            "num_ctx_min": self.min_num_ctx,
+            "num_ctx_max": self.max_num_ctx,
+            "categories": categories
+        }
+
+
+# Global builder shared by all LLM prompts
+prompt_builder = PromptBuilder()
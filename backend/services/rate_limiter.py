@@ -0,0 +1,325 @@
+"""
+Rate Limiting and Fair Queuing
+
+This module keeps one noisy client from monopolizing the LLM. Incoming
+requests are limited per client (session ID, falling back to IP address) with
+token buckets, and LLM-bound work is dispatched through a deficit round-robin
+queue so that, once the LLM is saturated, waiting clients are served in turn
+rather than in arrival order.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Any, Tuple
+
+from .metrics import metrics
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a fixed rate"""
+
+    def __init__(self, rate_per_second: float, burst: float):
+        """Start with a full bucket"""
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def refill(self) -> float:
+        """Top the bucket up for the time elapsed and return the available tokens"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return self.tokens
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until cost tokens are available (call after refill)"""
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def try_acquire(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take tokens if available
+
+        Returns:
+            Tuple of (allowed, seconds until enough tokens are available)
+        """
+        if self.refill() >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, self.wait_time(cost)
+
+
+class RateLimiter:
+    """
+    Per-client token-bucket rate limiter
+
+    Buckets are kept for the most recently seen RATE_LIMIT_MAX_CLIENTS clients.
+    """
+
+    def __init__(self, per_minute: Optional[float] = None, burst: Optional[float] = None):
+        """
+        Initialize the limiter from environment configuration
+
+        Args:
+            per_minute: Refill rate (default: RATE_LIMIT_PER_MINUTE)
+            burst: Bucket size (default: RATE_LIMIT_BURST)
+        """
+        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        if per_minute is None:
+            per_minute = float(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+        self.rate_per_second = per_minute / 60.0
+        self.burst = burst if burst is not None else float(os.getenv("RATE_LIMIT_BURST", "20"))
+        self.max_clients = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._limit_hits: "OrderedDict[str, int]" = OrderedDict()
+        self._total_limited = 0
+
+    @staticmethod
+    def client_key(session_id: Optional[str], client_ip: Optional[str]) -> str:
+        """Identify a client by session ID, falling back to IP address"""
+        if session_id:
+            return f"session:{session_id}"
+        return f"ip:{client_ip or 'unknown'}"
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Charge a request to a client's bucket
+
+        Args:
+            key: Client key from client_key
+            cost: Tokens to take
+
+        Returns:
+            Tuple of (allowed, retry-after seconds)
+        """
+        if not self.enabled:
+            return True, 0.0
+
+        allowed, retry_after = self._bucket(key).try_acquire(cost)
+        if not allowed:
+            self._record_limited(key)
+        return allowed, retry_after
+
+    def check_all(self, costs: Dict[str, float]) -> Tuple[bool, float, Optional[str]]:
+        """
+        Charge several clients at once, all or nothing
+
+        Used for batches whose items belong to different sessions: either
+        every client can pay its share and all buckets are charged, or none
+        are.
+
+        Args:
+            costs: Tokens to take per client key
+
+        Returns:
+            Tuple of (allowed, retry-after seconds, first client that was limited)
+        """
+        if not self.enabled:
+            return True, 0.0, None
+
+        buckets = {key: self._bucket(key) for key in costs}
+        limited = [key for key, bucket in buckets.items() if bucket.refill() < costs[key]]
+        if limited:
+            for key in limited:
+                self._record_limited(key)
+            return False, max(buckets[key].wait_time(costs[key]) for key in limited), limited[0]
+
+        for key, bucket in buckets.items():
+            bucket.tokens -= costs[key]
+        return True, 0.0, None
+
+    def _bucket(self, key: str) -> TokenBucket:
+        """Get (or create) a client's bucket, keeping the LRU order current"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _record_limited(self, key: str):
+        """Count a refused request against its client"""
+        self._total_limited += 1
+        self._limit_hits[key] = self._limit_hits.pop(key, 0) + 1
+        if len(self._limit_hits) > self.max_clients:
+            self._limit_hits.popitem(last=False)
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Get limit-hit counters, including the most limited clients"""
+        most_limited = sorted(self._limit_hits.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            "enabled": self.enabled,
+            "requests_per_minute": round(self.rate_per_second * 60, 2),
+            "burst": self.burst,
+            "tracked_clients": len(self._buckets),
+            "total_limited": self._total_limited,
+            "most_limited": [{"client": key, "limited": hits} for key, hits in most_limited]
+        }
+
+
+class FairQueue:
+    """
+    Deficit round-robin dispatcher for LLM-bound work
+
+    At most LLM_MAX_CONCURRENCY calls run at once. Further callers wait in a
+    per-client queue; when a slot frees up, clients are visited in turn and
+    each visit adds FAIR_QUEUE_QUANTUM credit, so a client with many queued
+    calls gets the same share as a client with one.
+    """
+
+    def __init__(self):
+        """Initialize the dispatcher from environment configuration"""
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+        self.quantum = float(os.getenv("FAIR_QUEUE_QUANTUM", "1"))
+        self.max_tracked_clients = int(os.getenv("FAIR_QUEUE_MAX_CLIENTS", "1000"))
+
+        self._active = 0
+        self._flows: Dict[str, Deque[Tuple[asyncio.Future, float]]] = {}
+        self._deficits: Dict[str, float] = {}
+        self._round: Deque[str] = deque()
+        self._turn_started = False
+        self._waits: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, key: str, cost: float = 1.0):
+        """
+        Hold an LLM slot for the duration of the block
+
+        Args:
+            key: Client key the work is charged to
+            cost: Relative cost of the work (default one call)
+        """
+        await self._acquire(key, cost)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, key: str, cost: float):
+        """Wait for this client's turn and a free slot"""
+        start = time.monotonic()
+        if self._active < self.max_concurrency and not self._round:
+            self._active += 1
+            self._record_wait(key, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        if key not in self._flows:
+            self._flows[key] = deque()
+            self._deficits[key] = 0.0
+            self._round.append(key)
+        self._flows[key].append((future, cost))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as we were cancelled; pass it on
+                self._release()
+            else:
+                self._forget(key, future)
+            raise
+
+        self._record_wait(key, time.monotonic() - start)
+
+    def _release(self):
+        """Free a slot and hand it to the next client in the round"""
+        self._active -= 1
+        while self._active < self.max_concurrency:
+            future = self._next_waiter()
+            if future is None:
+                break
+            self._active += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pick the next waiter in deficit round-robin order"""
+        while self._round:
+            key = self._round[0]
+            if not self._turn_started:
+                self._deficits[key] += self.quantum
+                self._turn_started = True
+
+            flow = self._flows[key]
+            future, cost = flow[0]
+            if self._deficits[key] >= cost:
+                flow.popleft()
+                self._deficits[key] -= cost
+                if not flow:
+                    self._drop_flow(key)
+                return future
+
+            # Not enough credit for this round; move on to the next client
+            self._round.rotate(-1)
+            self._turn_started = False
+        return None
+
+    def _forget(self, key: str, future: asyncio.Future):
+        """Remove a cancelled waiter from its client's queue"""
+        flow = self._flows.get(key)
+        if flow is None:
+            return
+        for index, (waiting, _) in enumerate(flow):
+            if waiting is future:
+                del flow[index]
+                break
+        if not flow:
+            self._drop_flow(key)
+
+    def _drop_flow(self, key: str):
+        """Remove a client with no more waiters from the round"""
+        if self._round and self._round[0] == key:
+            self._turn_started = False
+        self._round.remove(key)
+        del self._flows[key]
+        del self._deficits[key]
+
+    def _record_wait(self, key: str, wait_seconds: float):
+        """Accumulate per-client queue wait statistics"""
+        metrics.observe_stage("queue_wait", wait_seconds)
+        stats = self._waits.pop(key, None) or {"requests": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+        wait_ms = wait_seconds * 1000
+        stats["requests"] += 1
+        stats["total_wait_ms"] += wait_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+        self._waits[key] = stats
+        if len(self._waits) > self.max_tracked_clients:
+            self._waits.popitem(last=False)
+
+    @property
+    def active(self) -> int:
+        """Number of calls currently holding a slot"""
+        return self._active
+    
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a slot"""
+        return sum(len(flow) for flow in self._flows.values())
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Get slot usage, queue length and the clients that waited longest"""
+        longest = sorted(self._waits.items(), key=lambda item: item[1]["total_wait_ms"], reverse=True)[:top]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queued": self.queued,
+            "queued_clients": len(self._flows),
+            "clients": [
+                {
+                    "client": key,
+                    "requests": int(stats["requests"]),
+                    "average_wait_ms": round(stats["total_wait_ms"] / stats["requests"], 2),
+                    "max_wait_ms": round(stats["max_wait_ms"], 2)
+                }
+                for key, stats in longest
+            ]
+        }
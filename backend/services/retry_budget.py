@@ -0,0 +1,67 @@
+"""
+Retry Budget
+
+Retrying failed calls hides transient errors, but during an outage every
+caller retrying multiplies the load on a backend that is already failing.
+A retry budget caps retries at a fraction of recent requests (plus a small
+floor, so a quiet instance can still retry), and retries are spread out with
+jittered exponential backoff so they do not arrive in synchronized waves.
+"""
+
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+
+def jittered_backoff(attempt: int, base: float, cap: float) -> float:
+    """Seconds to wait before retry number attempt (1-based): "full jitter" exponential backoff"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """Allows retries up to a ratio of the requests made within a sliding window"""
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, window: float = 10.0):
+        """
+        Initialize an empty budget
+
+        Args:
+            ratio: Retries allowed per request in the window
+            min_per_second: Retries always allowed per second of window, however few requests there were
+            window: Seconds of history the budget is computed over
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._counters = {"retries": 0, "denied": 0}
+
+    def record_request(self):
+        """Count a request (not a retry) towards the budget"""
+        self._requests.append(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        """Take one retry from the budget, if any is left"""
+        now = time.monotonic()
+        for times in (self._requests, self._retries):
+            while times and times[0] < now - self.window:
+                times.popleft()
+
+        if len(self._retries) >= self.ratio * len(self._requests) + self.min_per_second * self.window:
+            self._counters["denied"] += 1
+            return False
+        self._retries.append(now)
+        self._counters["retries"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Budget configuration and retry counters"""
+        return {
+            "ratio": self.ratio,
+            "min_per_second": self.min_per_second,
+            "window_s": self.window,
+            **self._counters
+        }
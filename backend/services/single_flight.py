@@ -0,0 +1,78 @@
+"""
+Single-Flight Request Coalescing
+
+This module collapses concurrent calls that share a key into a single
+execution. The first caller starts the work; callers arriving while it is
+still in flight await the same result instead of repeating it. When every
+caller has been cancelled (e.g. their clients disconnected), the work itself
+is cancelled too, so no LLM generation runs for a result nobody will read.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls keyed by a string
+
+    The shared work runs in its own task, so a caller that goes away does not
+    take the result away from the others still waiting on it; the task is
+    only cancelled once its last caller is.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._counters = {"executions": 0, "coalesced": 0, "cancelled": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Identity of the work; concurrent calls with the same key share one run
+            fn: Zero-argument coroutine function performing the work
+
+        Returns:
+            The result of fn (exceptions are re-raised to every caller)
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._in_flight[key] = task
+            self._counters["executions"] += 1
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        else:
+            self._counters["coalesced"] += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Last caller gone: stop the work, and let the next caller start over
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                task.cancel()
+                self._counters["cancelled"] += 1
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        """Forget a finished call so the next one starts fresh"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every caller went away
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get execution and coalescing counters"""
+        return {
+            "in_flight": len(self._in_flight),
+            **self._counters
+        }
@@ -0,0 +1,43 @@
+"""
+Per-Request Timing Spans
+
+This module collects the duration of each pipeline stage for the request
+currently being processed, so a single check can explain where its time went.
+The active recorder is held in a context variable; metrics.time_stage feeds
+it alongside the aggregate histograms, so stages are only instrumented once.
+"""
+
+import contextvars
+from typing import Dict, Optional
+
+# Recorder for the fact-check running in the current context, if any
+current_timings: "contextvars.ContextVar[Optional[RequestTimings]]" = contextvars.ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    """Ordered stage -> duration spans for one fact-check"""
+
+    __slots__ = ("_spans",)
+
+    def __init__(self):
+        self._spans: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        """Record a span; repeated stages are summed"""
+        self._spans[stage] = self._spans.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        """Spans in milliseconds, in the order the stages first ran"""
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self._spans.items()}
+
+
+def record_span(stage: str, seconds: float):
+    """Add a span to the current request's recorder, if there is one"""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def format_server_timing(timings_ms: Dict[str, float]) -> str:
+    """Render spans as a Server-Timing header value"""
+    return ", ".join(f"{stage};dur={duration}" for stage, duration in timings_ms.items())
@@ -0,0 +1,153 @@
+"""
+Verdict Cache
+
+This module caches LLM analysis results so repeated claims do not go back to
+Ollama. Entries are keyed on the normalized claim text plus the model name,
+evicted in LRU order when the entry or byte budget is exceeded, and expire
+after a per-category TTL so time-sensitive verdicts are refreshed sooner.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple
+
+from .llama_service import ClaimCategory
+
+
+# Default TTLs in seconds; categories not listed use VERDICT_CACHE_TTL_SECONDS
+DEFAULT_CATEGORY_TTLS = {
+    ClaimCategory.TEMPORAL: 15 * 60,
+    ClaimCategory.POLITICAL: 15 * 60,
+    ClaimCategory.PREDICTIVE: 15 * 60,
+    ClaimCategory.ECONOMIC: 60 * 60,
+    ClaimCategory.STATISTICAL: 60 * 60,
+    ClaimCategory.MEDICAL: 6 * 60 * 60,
+    ClaimCategory.SCIENTIFIC: 7 * 24 * 60 * 60,
+    ClaimCategory.HISTORICAL: 7 * 24 * 60 * 60,
+    ClaimCategory.DEFINITIONAL: 7 * 24 * 60 * 60,
+    ClaimCategory.MATHEMATICAL: 30 * 24 * 60 * 60,
+}
+
+
+class VerdictCache:
+    """
+    LRU + TTL cache for analysis results
+
+    Bounded both by entry count and by the approximate JSON size of the
+    cached values.
+    """
+
+    def __init__(self):
+        """Initialize the cache from environment configuration"""
+        self.enabled = os.getenv("VERDICT_CACHE_ENABLED", "true").lower() == "true"
+        self.max_entries = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+        self.max_bytes = int(os.getenv("VERDICT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.default_ttl = float(os.getenv("VERDICT_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+        self.category_ttls = {category.value: ttl for category, ttl in DEFAULT_CATEGORY_TTLS.items()}
+        self.category_ttls.update(self._parse_ttl_overrides(os.getenv("VERDICT_CACHE_CATEGORY_TTLS", "")))
+
+        # key -> (value, expires_at, size_bytes), oldest first
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def make_key(normalized_claim: str, model_name: str) -> str:
+        """Build the cache key for a claim analyzed by a given model"""
+        return f"{model_name}\x00{normalized_claim}"
+
+    def ttl_for(self, category: Optional[str]) -> float:
+        """Get the TTL in seconds for a claim category value"""
+        return self.category_ttls.get(category, self.default_ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis result
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Optional[Dict]: The cached result, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters["misses"] += 1
+            return None
+
+        value, expires_at, size = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], category: Optional[str] = None):
+        """
+        Store an analysis result
+
+        Args:
+            key: Key from make_key
+            value: The analysis result to cache
+            category: ClaimCategory value used to pick the TTL
+        """
+        if not self.enabled:
+            return
+
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_for(category), size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._counters["evictions"] += 1
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size and hit/miss/eviction counters"""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self._counters["hits"] / lookups * 100, 2) if lookups else 0.0,
+            **self._counters
+        }
+
+    def _remove(self, key: str):
+        """Remove an entry and release its bytes"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _parse_ttl_overrides(raw: str) -> Dict[str, float]:
+        """Parse 'temporal=600,political=900' into a category -> TTL mapping"""
+        overrides = {}
+        for item in raw.split(","):
+            if "=" not in item:
+                continue
+            category, ttl = item.split("=", 1)
+            overrides[category.strip().lower()] = float(ttl)
+        return overrides
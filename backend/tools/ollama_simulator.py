@@ -0,0 +1,438 @@
+"""
+Ollama-Compatible Local Simulator
+
+A standalone asyncio HTTP server implementing Ollama's /api/generate endpoint
+(streaming and non-streaming) so the backend's real network path, timeouts and
+parsing can be load-tested on a CPU-only machine. Point the backend at it with
+OLLAMA_API_URL=http://localhost:11435 and DEMO_MODE=false.
+
+Usage:
+    python tools/ollama_simulator.py --port 11435 --ttft-ms 300 --tokens-per-sec 40 --slots 2
+
+Only the standard library is used so it runs anywhere the backend runs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+
+DEFAULT_TEMPLATES = [
+    {
+        "verdict": "True",
+        "confidence_score": 88,
+        "explanation": "The claim \"{claim}\" is consistent with well-established reference sources. Multiple independent sources agree on the key facts stated.",
+        "key_evidence": ["Consistent with reference data", "Independent sources agree"],
+        "sources_needed": ["Encyclopedias", "Official statistics"],
+        "reasoning_steps": ["Identified the factual core of the claim", "Compared it with reference data"],
+        "caveats": ["Simulated response"]
+    },
+    {
+        "verdict": "False",
+        "confidence_score": 91,
+        "explanation": "The claim \"{claim}\" contradicts well-established reference sources. The figures stated do not match published measurements.",
+        "key_evidence": ["Published measurements differ", "No credible source supports the claim"],
+        "sources_needed": ["Official measurements", "Peer-reviewed sources"],
+        "reasoning_steps": ["Extracted the quantities in the claim", "Compared them with published values"],
+        "caveats": ["Simulated response"]
+    },
+    {
+        "verdict": "Unverified",
+        "confidence_score": 45,
+        "explanation": "There is not enough reliable information to verify the claim \"{claim}\" with confidence.",
+        "key_evidence": ["Sources are inconclusive"],
+        "sources_needed": ["Primary sources"],
+        "reasoning_steps": ["Searched for corroborating evidence", "Found no conclusive source"],
+        "caveats": ["Simulated response", "Manual verification recommended"]
+    }
+]
+
+RAMBLE_TEXT = (
+    " Note that this analysis is based on general knowledge and additional context may change"
+    " the assessment. Readers are encouraged to consult primary sources for further detail."
+)
+
+
+class SimulatorConfig:
+    """Tunable behaviour of the simulated model server"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.ttft_ms = args.ttft_ms
+        self.tokens_per_sec = args.tokens_per_sec
+        self.jitter = args.jitter
+        self.slots = args.slots
+        self.max_queue = args.max_queue
+        self.error_rate = args.error_rate
+        self.hang_rate = args.hang_rate
+        self.load_ms = args.load_ms
+        self.ramble_tokens = args.ramble_tokens
+        self.templates = self._load_templates(args.templates)
+
+    @staticmethod
+    def _load_templates(path: Optional[str]) -> List[Any]:
+        """Load response templates from a JSON file (list of objects or strings)"""
+        if not path:
+            return DEFAULT_TEMPLATES
+        with open(path, "r", encoding="utf-8") as handle:
+            templates = json.load(handle)
+        if not isinstance(templates, list) or not templates:
+            raise ValueError("Templates file must contain a non-empty JSON list")
+        return templates
+
+
+class OllamaSimulator:
+    """
+    Minimal HTTP/1.1 server speaking the Ollama generate API
+
+    Requests beyond the configured number of slots wait for a free slot, like
+    Ollama's request queue; beyond max_queue waiting requests get a 503.
+    """
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self._slots = asyncio.Semaphore(config.slots)
+        self._waiting = 0
+        # model -> time.time() at which it is unloaded (keep_alive expiry)
+        self._loaded_models: Dict[str, float] = {}
+        self._known_models: List[str] = []
+        self.stats = {
+            "requests": 0,
+            "active": 0,
+            "queued": 0,
+            "completed": 0,
+            "errors": 0,
+            "rejected": 0,
+            "disconnects": 0,
+            "tokens_generated": 0
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                if method == "POST" and path == "/api/generate":
+                    await self._handle_generate(reader, writer, body)
+                elif method == "GET" and path == "/api/tags":
+                    await self._send_json(writer, 200, {"models": [
+                        {"name": name, "model": name} for name in self._known_models
+                    ]})
+                elif method == "GET" and path == "/api/ps":
+                    self._unload_expired()
+                    await self._send_json(writer, 200, {"models": [
+                        {"name": name, "model": name, "expires_at": _format_expiry(expires_at)}
+                        for name, expires_at in self._loaded_models.items()
+                    ]})
+                elif method == "GET" and path == "/api/version":
+                    await self._send_json(writer, 200, {"version": "0.0.0-simulator"})
+                elif method == "GET" and path == "/sim/stats":
+                    await self._send_json(writer, 200, self.stats)
+                elif method in ("GET", "HEAD") and path == "/":
+                    await self._send_raw(writer, 200, b"Ollama is running", "text/plain")
+                else:
+                    await self._send_json(writer, 404, {"error": f"unknown endpoint {method} {path}"})
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_generate(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, body: bytes):
+        """Simulate /api/generate with queueing, latency and failures"""
+        self.stats["requests"] += 1
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            await self._send_json(writer, 400, {"error": "invalid JSON body"})
+            return
+
+        if self._waiting >= self.config.max_queue and self._slots.locked():
+            self.stats["rejected"] += 1
+            await self._send_json(writer, 503, {"error": "server busy, please try again"})
+            return
+
+        # Like Ollama, stop queueing or generating as soon as the client closes the connection
+        task = asyncio.ensure_future(self._queue_and_generate(writer, payload))
+        while not task.done():
+            if reader.at_eof():
+                task.cancel()
+                self.stats["disconnects"] += 1
+                await asyncio.gather(task, return_exceptions=True)
+                raise ConnectionResetError("client closed the connection")
+            await asyncio.wait({task}, timeout=0.05)
+        task.result()
+
+    async def _queue_and_generate(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]):
+        """Wait for a generation slot, then generate"""
+        self._waiting += 1
+        self.stats["queued"] = self._waiting
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+            self.stats["queued"] = self._waiting
+
+        self.stats["active"] += 1
+        try:
+            await self._generate(writer, payload)
+        finally:
+            self.stats["active"] -= 1
+            self._slots.release()
+
+    async def _generate(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]):
+        """Produce the response for one generate request holding a slot"""
+        config = self.config
+        model = payload.get("model", "llama2")
+        stream = payload.get("stream", True)
+        started = time.perf_counter()
+
+        load_seconds = 0.0
+        self._unload_expired()
+        if model not in self._loaded_models:
+            load_seconds = config.load_ms / 1000
+            await asyncio.sleep(load_seconds)
+        if model not in self._known_models:
+            self._known_models.append(model)
+        self._loaded_models[model] = time.time() + _keep_alive_seconds(payload.get("keep_alive"))
+
+        if random.random() < config.error_rate:
+            self.stats["errors"] += 1
+            await self._send_json(writer, 500, {"error": "simulated model failure"})
+            return
+
+        tokens = self._render_tokens(payload)
+        num_predict = payload.get("options", {}).get("num_predict")
+        if isinstance(num_predict, int) and num_predict > 0:
+            tokens = tokens[:num_predict]
+
+        hang = random.random() < config.hang_rate
+        await asyncio.sleep(self._jittered(config.ttft_ms / 1000))
+
+        try:
+            if stream:
+                await self._start_chunked(writer)
+                for index, token in enumerate(tokens):
+                    if hang and index == len(tokens) // 2:
+                        await asyncio.sleep(3600)
+                    await self._send_chunk(writer, json.dumps({
+                        "model": model,
+                        "created_at": _now(),
+                        "response": token,
+                        "done": False
+                    }).encode() + b"\n")
+                    self.stats["tokens_generated"] += 1
+                    await asyncio.sleep(self._token_delay())
+                await self._send_chunk(writer, json.dumps(
+                    self._final_chunk(model, "", started, load_seconds, payload, len(tokens))
+                ).encode() + b"\n")
+                await self._send_chunk(writer, b"")
+            else:
+                if hang:
+                    await asyncio.sleep(3600)
+                for _ in tokens:
+                    await asyncio.sleep(self._token_delay())
+                self.stats["tokens_generated"] += len(tokens)
+                await self._send_json(writer, 200, self._final_chunk(
+                    model, "".join(tokens), started, load_seconds, payload, len(tokens)
+                ))
+            self.stats["completed"] += 1
+        except ConnectionError:
+            # Client went away mid-generation; free the slot like Ollama does
+            self.stats["disconnects"] += 1
+            raise
+
+    def _unload_expired(self):
+        """Drop models whose keep_alive has run out, like Ollama's scheduler"""
+        now = time.time()
+        for name in [name for name, expires_at in self._loaded_models.items() if expires_at <= now]:
+            del self._loaded_models[name]
+
+    def _render_tokens(self, payload: Dict[str, Any]) -> List[str]:
+        """Pick a template, fill in the claim and split it into tokens"""
+        prompt = payload.get("prompt", "")
+        match = re.search(r'CLAIM TO ANALYZE: "([^"]*)"', prompt)
+        claim = match.group(1) if match else prompt[:80]
+
+        template = random.choice(self.config.templates)
+        if isinstance(template, str):
+            text = template.replace("{claim}", claim)
+        else:
+            text = json.dumps(template).replace("{claim}", claim.replace('"', "'"))
+
+        if self.config.ramble_tokens:
+            ramble = re.findall(r"\S+\s*|\s+", RAMBLE_TEXT * (self.config.ramble_tokens // 20 + 1))
+            text += "".join(ramble[:self.config.ramble_tokens])
+
+        return re.findall(r"\S+\s*|\s+", text)
+
+    def _final_chunk(self, model: str, response: str, started: float, load_seconds: float,
+                     payload: Dict[str, Any], eval_count: int) -> Dict[str, Any]:
+        """Build the closing object with Ollama's timing fields (nanoseconds)"""
+        total_ns = int((time.perf_counter() - started) * 1e9)
+        return {
+            "model": model,
+            "created_at": _now(),
+            "response": response,
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": total_ns,
+            "load_duration": int(load_seconds * 1e9),
+            "prompt_eval_count": len(payload.get("prompt", "").split()),
+            "eval_count": eval_count,
+            "eval_duration": max(0, total_ns - int(load_seconds * 1e9))
+        }
+
+    def _token_delay(self) -> float:
+        """Seconds between tokens for the configured generation speed"""
+        if self.config.tokens_per_sec <= 0:
+            return 0.0
+        return self._jittered(1.0 / self.config.tokens_per_sec)
+
+    def _jittered(self, seconds: float) -> float:
+        """Apply +/- jitter (as a fraction) to a delay"""
+        if not self.config.jitter:
+            return seconds
+        return max(0.0, seconds * (1 + random.uniform(-self.config.jitter, self.config.jitter)))
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Read one HTTP/1.1 request; None when the connection is closed"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", "0"))
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, data: Dict[str, Any]):
+        """Send a complete JSON response"""
+        await self._send_raw(writer, status, json.dumps(data).encode(), "application/json")
+
+    @staticmethod
+    async def _send_raw(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str):
+        """Send a complete response with Content-Length"""
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _start_chunked(writer: asyncio.StreamWriter):
+        """Send headers for a chunked NDJSON stream"""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _send_chunk(writer: asyncio.StreamWriter, data: bytes):
+        """Send one chunk (an empty chunk terminates the stream)"""
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def _now() -> str:
+    """Timestamp in Ollama's created_at format"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _keep_alive_seconds(value: Any) -> float:
+    """Parse Ollama's keep_alive (seconds, or a duration like "30s", "5m", "1h"); negative keeps forever"""
+    if value is None or value == "":
+        return 300.0
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        parts = re.findall(r"(-?[\d.]+)(ms|s|m|h)", str(value))
+        if not parts:
+            return 300.0
+        units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        seconds = sum(float(number) * units[unit] for number, unit in parts)
+    return float("inf") if seconds < 0 else seconds
+
+
+def _format_expiry(expires_at: float) -> str:
+    """Format an unload time the way /api/ps reports it"""
+    if expires_at == float("inf"):
+        expires_at = time.time() + 10 * 365 * 86400
+    return datetime.fromtimestamp(expires_at, timezone.utc).isoformat()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Command-line options (each also settable via an OLLAMA_SIM_* variable)"""
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Ollama-compatible simulator for load testing")
+    parser.add_argument("--host", default=env("OLLAMA_SIM_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(env("OLLAMA_SIM_PORT", "11435")))
+    parser.add_argument("--ttft-ms", type=float, default=float(env("OLLAMA_SIM_TTFT_MS", "300")),
+                        help="time to first token in milliseconds")
+    parser.add_argument("--tokens-per-sec", type=float, default=float(env("OLLAMA_SIM_TOKENS_PER_SEC", "40")),
+                        help="generation speed per request (0 = instant)")
+    parser.add_argument("--jitter", type=float, default=float(env("OLLAMA_SIM_JITTER", "0.1")),
+                        help="relative +/- jitter applied to delays")
+    parser.add_argument("--slots", type=int, default=int(env("OLLAMA_SIM_SLOTS", "1")),
+                        help="concurrent generations (like OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=int(env("OLLAMA_SIM_MAX_QUEUE", "512")),
+                        help="waiting requests before answering 503")
+    parser.add_argument("--error-rate", type=float, default=float(env("OLLAMA_SIM_ERROR_RATE", "0")),
+                        help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--hang-rate", type=float, default=float(env("OLLAMA_SIM_HANG_RATE", "0")),
+                        help="fraction of requests that stall mid-generation")
+    parser.add_argument("--load-ms", type=float, default=float(env("OLLAMA_SIM_LOAD_MS", "0")),
+                        help="model load time, paid again after keep_alive expires")
+    parser.add_argument("--ramble-tokens", type=int, default=int(env("OLLAMA_SIM_RAMBLE_TOKENS", "0")),
+                        help="extra tokens generated after the JSON object")
+    parser.add_argument("--templates", default=env("OLLAMA_SIM_TEMPLATES"),
+                        help="JSON file with a list of response templates ({claim} is substituted)")
+    return parser
+
+
+async def serve(config: SimulatorConfig, host: str, port: int):
+    """Run the simulator until cancelled"""
+    simulator = OllamaSimulator(config)
+    server = await asyncio.start_server(simulator.handle_connection, host, port)
+    print(f"🧪 Ollama simulator listening on http://{host}:{port} "
+          f"(ttft {config.ttft_ms}ms, {config.tokens_per_sec} tok/s, {config.slots} slots)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    try:
+        asyncio.run(serve(SimulatorConfig(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()